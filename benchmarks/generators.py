@@ -0,0 +1,88 @@
+# system imports
+import os
+import json
+import numpy as np
+
+# Merchants with their typical amount (EUR) and booking direction, ordered by popularity
+MERCHANTS = [
+    ("REWE Markt GmbH", -35.0), ("EDEKA Center", -28.0), ("ALDI SUED", -22.0), ("LIDL Dienstleistung", -25.0),
+    ("Amazon EU S.a.r.l.", -40.0), ("PayPal Europe", -30.0), ("DB Vertrieb GmbH", -55.0), ("Shell Station", -60.0),
+    ("Netflix International", -12.99), ("Spotify AB", -10.99), ("Stadtwerke Strom Abschlag", -85.0),
+    ("Miete Wohnung Hauptstr.", -950.0), ("Telekom Deutschland", -44.95), ("Apotheke am Markt", -18.0),
+    ("DM Drogerie Markt", -16.0), ("IKEA Deutschland", -120.0), ("Lohn Gehalt Arbeitgeber GmbH", 3200.0),
+    ("Kindergeld Familienkasse", 250.0), ("Erstattung Finanzamt", 400.0), ("Zinsen Tagesgeld", 5.0),
+]
+# Words used to build the long tail of rarely seen descriptions and rule search terms
+WORDS = ["Kauf", "Rechnung", "Abo", "Service", "Markt", "Online", "Versand", "Beitrag", "Gebuehr", "Zahlung",
+         "Hotel", "Restaurant", "Tankstelle", "Buch", "Verein", "Versicherung", "Kino", "Parken", "Bäckerei", "Bio"]
+
+HEADER = ["Buchungstag", "Valutadatum", "Buchungstext", "Verwendungszweck", "Beguenstigter/Zahlungspflichtiger", "Kontonummer", "BLZ", "Betrag", "Waehrung"]
+
+
+def _format_amounts(cents: np.ndarray) -> list[str]:
+    """Formats cents as German decimal amounts ("-1.234,56")."""
+    return [f"{value / 100:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") for value in cents.tolist()]
+
+
+def _format_dates(days: np.ndarray) -> list[str]:
+    """Formats day numbers (days since 1970-01-01) as DD.MM.YYYY."""
+    iso = np.datetime_as_string(days.astype("datetime64[D]"))
+    return [f"{d[8:10]}.{d[5:7]}.{d[0:4]}" for d in iso.tolist()]
+
+
+def generate_transactions(path: str, rows: int, seed: int = 0, start: str = "2020-01-01", years: int = 4, block_size: int = 100_000) -> str:
+    """Writes a synthetic ';'-delimited bank export with a Zipf-skewed merchant distribution."""
+    rng = np.random.default_rng(seed)
+    first_day = np.datetime64(start, "D").astype(np.int64)
+    span = years * 365
+    tail_descriptions = [f"{a} {b} {i}" for i, (a, b) in enumerate(zip(np.repeat(WORDS, len(WORDS)), np.tile(WORDS, len(WORDS))))]
+    descriptions = np.array([name for name, _ in MERCHANTS] + tail_descriptions, dtype=object)
+    typical = np.array([amount for _, amount in MERCHANTS] + [-20.0] * len(tail_descriptions))
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(";".join(HEADER) + "\r\n")
+        for offset in range(0, rows, block_size):
+            count = min(block_size, rows - offset)
+            merchant = (rng.zipf(1.3, count) - 1) % len(descriptions)
+            days = first_day + (np.arange(offset, offset + count) * span) // rows  # Chronological like a real export
+            cents = np.round(typical[merchant] * rng.lognormal(0.0, 0.35, count) * 100).astype(np.int64)
+            dates = _format_dates(days)
+            amounts = _format_amounts(cents)
+            references = rng.integers(10_000_000, 99_999_999, count).tolist()
+            text = descriptions[merchant].tolist()
+            f.write("".join(
+                f"{dates[i]};{dates[i]};{'GUTSCHRIFT' if cents[i] >= 0 else 'LASTSCHRIFT'};{text[i]} Ref {references[i]};{text[i]};DE0012345678;10010010;{amounts[i]};EUR\r\n"
+                for i in range(count)
+            ))
+    return path
+
+
+def generate_preset(path: str, rules: int, seed: int = 0, start_year: int = 2020, years: int = 4) -> str:
+    """Writes a preset JSON with `rules` year-scoped rules in the input/output category schema."""
+    rng = np.random.default_rng(seed)
+    terms = [name.split()[0].lower() for name, _ in MERCHANTS] + [f"{a} {b}".lower() for a in WORDS for b in WORDS]
+    input_categories, output_categories = [], []
+    for index in range(rules):
+        _, typical = MERCHANTS[index % len(MERCHANTS)]
+        year = start_year + int(rng.integers(0, years))
+        term = terms[index % len(terms)]
+        row = {
+            "category": f"Kategorie {index % 50}",
+            "filters": term,
+            "dateFrom": f"01.01.{year}",
+            "dateTo": f"31.12.{year}",
+            "minValue": 0.0,
+            "maxValue": float(round(abs(typical) * 4, 2)),
+        }
+        (input_categories if typical > 0 else output_categories).append(row)
+
+    preset = {"paths": {"input_path": "", "output_path": ""}, "input_categories": input_categories, "output_categories": output_categories}
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(preset, f, indent=4)
+    return path
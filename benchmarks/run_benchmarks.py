@@ -0,0 +1,185 @@
+# system imports
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import multiprocessing
+from datetime import datetime
+
+# local imports
+from .generators import generate_transactions, generate_preset
+
+# Metrics where larger is better, all other compared metrics are better when smaller
+THROUGHPUT_METRICS = ("parse_rows_per_sec", "match_rows_per_sec", "write_rows_per_sec", "total_rows_per_sec")
+COST_METRICS = ("compile_seconds", "first_output_latency_seconds", "chunk_latency_p95_seconds", "peak_rss_mb")
+
+
+def _peak_rss_mb() -> float | None:
+    """Returns the peak resident memory of this process in MB (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)  # Bytes on macOS, KB elsewhere
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    """Returns a percentile of the values (nearest rank)."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+def _run_case(input_path: str, preset_path: str, output_path: str, chunk_size: int, results) -> None:
+    """Runs one benchmark case in a fresh process and reports its metrics."""
+    from src.engine import Categorizer, CsvStreamReader, CsvStreamWriter, RuleSet
+
+    started = time.perf_counter()
+    with open(preset_path, "r") as f:
+        rule_set = RuleSet.from_preset(json.load(f))
+    compile_seconds = time.perf_counter() - started
+    categorizer = Categorizer(rule_set)
+
+    parse_seconds = match_seconds = write_seconds = 0.0
+    chunk_latencies = []
+    first_output = None
+    rows = 0
+    run_started = time.perf_counter()
+    reader = CsvStreamReader(input_path, chunk_size)
+    with CsvStreamWriter(output_path) as writer:
+        chunks = iter(reader)
+        while True:
+            t0 = time.perf_counter()
+            chunk = next(chunks, None)
+            t1 = time.perf_counter()
+            if chunk is None:
+                break
+            if not rows:
+                writer.write_header(reader.header)
+            labels = rule_set.labels(categorizer.categorize(chunk.transactions))
+            t2 = time.perf_counter()
+            writer.write_records(chunk.records, labels)
+            t3 = time.perf_counter()
+
+            parse_seconds += t1 - t0
+            match_seconds += t2 - t1
+            write_seconds += t3 - t2
+            chunk_latencies.append(t3 - t0)
+            rows += len(chunk)
+            if first_output is None:
+                first_output = t3 - run_started
+    total_seconds = time.perf_counter() - run_started
+
+    def rate(seconds):
+        return round(rows / seconds) if seconds > 0 else None
+
+    results.put({
+        "rows": rows,
+        "compile_seconds": round(compile_seconds, 4),
+        "parse_rows_per_sec": rate(parse_seconds),
+        "match_rows_per_sec": rate(match_seconds),
+        "write_rows_per_sec": rate(write_seconds),
+        "total_rows_per_sec": rate(total_seconds),
+        "first_output_latency_seconds": round(first_output or 0.0, 4),
+        "chunk_latency_p50_seconds": round(_percentile(chunk_latencies, 0.5), 4),
+        "chunk_latency_p95_seconds": round(_percentile(chunk_latencies, 0.95), 4),
+        "peak_rss_mb": _peak_rss_mb(),
+    })
+
+
+def run_case(input_path: str, preset_path: str, output_path: str, chunk_size: int) -> dict:
+    """Runs a case in a separate process, so peak memory and imports are measured per case."""
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_run_case, args=(input_path, preset_path, output_path, chunk_size, results))
+    process.start()
+    metrics = results.get()
+    process.join()
+    return metrics
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Returns a description of every metric that regressed beyond the tolerance."""
+    baseline_cases = {case["name"]: case for case in baseline.get("cases", [])}
+    regressions = []
+    for case in results["cases"]:
+        reference = baseline_cases.get(case["name"])
+        if reference is None:
+            continue
+        for metric in THROUGHPUT_METRICS:
+            if case.get(metric) and reference.get(metric) and case[metric] < reference[metric] * (1 - tolerance):
+                regressions.append(f"{case['name']}: {metric} {case[metric]} < baseline {reference[metric]}")
+        for metric in COST_METRICS:
+            if case.get(metric) and reference.get(metric) and case[metric] > reference[metric] * (1 + tolerance):
+                regressions.append(f"{case['name']}: {metric} {case[metric]} > baseline {reference[metric]}")
+    return regressions
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parses the command line arguments."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Benchmarks for parsing, matching and writing bank exports")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                        help="Transaction counts to benchmark (default: 1000 10000 100000, up to 10000000)")
+    parser.add_argument("--rules", type=int, nargs="+", default=[10, 100, 1_000],
+                        help="Rule counts to benchmark (default: 10 100 1000, up to 5000)")
+    parser.add_argument("--chunk-size", type=int, default=50_000, help="Rows per chunk (default: 50000)")
+    parser.add_argument("--data-dir", default=os.path.join(here, "data"), help="Directory for generated inputs and outputs")
+    parser.add_argument("--output", default=os.path.join(here, "results.json"), help="Machine-readable results file")
+    parser.add_argument("--baseline", default=os.path.join(here, "baseline.json"), help="Baseline to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression (default: 0.25)")
+    parser.add_argument("--update-baseline", action="store_true", help="Store the results as the new baseline")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """Generates the synthetic data, runs all cases and compares them against the baseline."""
+    args = parse_args(argv)
+    os.makedirs(args.data_dir, exist_ok=True)
+
+    results = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "chunk_size": args.chunk_size,
+        },
+        "cases": [],
+    }
+    for rows in args.rows:
+        input_path = os.path.join(args.data_dir, f"transactions_{rows}.csv")
+        if not os.path.exists(input_path):
+            generate_transactions(input_path, rows)
+        for rules in args.rules:
+            preset_path = os.path.join(args.data_dir, f"preset_{rules}.json")
+            if not os.path.exists(preset_path):
+                generate_preset(preset_path, rules)
+
+            name = f"rows={rows},rules={rules}"
+            metrics = run_case(input_path, preset_path, os.path.join(args.data_dir, "output.csv"), args.chunk_size)
+            results["cases"].append({"name": name, "rules": rules, **metrics})
+            print(f"{name}: {metrics['total_rows_per_sec']} rows/s total, match {metrics['match_rows_per_sec']} rows/s, peak {metrics['peak_rss_mb']} MB")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=4)
+    print(f"Results written to '{args.output}'.")
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=4)
+        print(f"Baseline updated: '{args.baseline}'.")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline found, skipping the comparison.")
+        return 0
+    with open(args.baseline, "r") as f:
+        regressions = compare(results, json.load(f), args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
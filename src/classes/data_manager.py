@@ -1,24 +1,30 @@
 # system imports
 import os
-import json
 from tkinter import ttk
 from tkinter import messagebox
 
 # local imports
 from ..utils import Helper
 from ..utils.logging import logger
+from ..engine import RuleSet
+from ..engine.german_parser import parse_date_days, format_date_days, parse_amount_cents, NAT_DAYS
+from ..engine.transactions import MISSING_AMOUNT
+
+# Rows inserted into the Treeviews per idle callback while loading the categories
+TREEVIEW_BATCH_SIZE = 200
 
 class DataManager:
     """Handles loading, saving, and managing settings."""
-    def __init__(self, app, data_path="./data/data.json"):
+    def __init__(self, app, data_path="./data/data.json", on_loaded=None):
         self.app = app  # Store the App instance
         self.data_path = data_path
         self.data_data = {}
+        self.on_loaded = on_loaded  # Called once both Treeviews are filled
 
         # Ensure the data is loaded at the start
         self.load_categories()
     
-        logger.debug(f"{self.__str__()}")
+        logger.debug("%s", self)
 
     def __str__(self) -> str:
         """Returns a string representation of the DataManager instance."""
@@ -36,6 +42,7 @@ class DataManager:
         """Saves both input and output categories."""
         self.save_treeview_data(treeInput, "input")
         self.save_treeview_data(treeOutput, "output")
+        self.app.preset_manager.invalidate_category_memo()  # Remembered categories may be wrong for the edited rules
         logger.info("Saved treeview data to current preset.")
 
     def save_treeview_data(self, treeview: ttk.Treeview, switch: str = "input" or "output") -> None:
@@ -48,17 +55,18 @@ class DataManager:
         
         # Iterate through all items in the Treeview
         for item_id in treeview.get_children():
-            # Get the values of the current item
-            row_list = treeview.item(item_id)["values"]
-            
+            # Get the normalized values of the current item and show them in the Treeview
+            row_list = self.normalize_rule_values(treeview.item(item_id)["values"])
+            treeview.item(item_id, values=row_list)
+
             # Create a dictionary for the data
             row_dict = {
                 str(treeview["columns"][0]): row_list[0],
                 str(treeview["columns"][1]): row_list[1],
                 str(treeview["columns"][2]): row_list[2],
                 str(treeview["columns"][3]): row_list[3],
-                str(treeview["columns"][4]): float(row_list[4]),
-                str(treeview["columns"][5]): float(row_list[5])
+                str(treeview["columns"][4]): row_list[4],
+                str(treeview["columns"][5]): row_list[5]
             }
             # Append the dictionary to the list
             data_list.append(row_dict)
@@ -73,13 +81,36 @@ class DataManager:
         if switch == "output":
             self.data_data["output_categories"] = data_list
 
-        # Save the data to the current Preset JSON file
-        preset_path = self.app.preset_manager.get_preset_path()
-        Helper.update_json_file(preset_path, self.data_data)
+        # Save the data to the current preset (JSON file or preset store)
+        self.app.preset_manager.update_preset_data(self.data_data)
 
         # * DEBUGGING
         # print(json.dumps(self.data_data, indent=4))
     
+    def normalize_rule_values(self, row_list: list) -> list:
+        """Normalizes the dates of a rule row to DD.MM.YYYY and its amounts to euros, malformed values are kept."""
+        values = list(row_list)
+        for col in (2, 3):
+            text = str(values[col]).strip()
+            if not text:
+                continue
+            days = parse_date_days(text)
+            if days == NAT_DAYS:
+                logger.warning("Malformed date '%s' in category '%s', expected DD.MM.YYYY.", text, values[0])
+            else:
+                values[col] = format_date_days(days)
+        for col in (4, 5):
+            cents = parse_amount_cents(values[col])
+            if cents == MISSING_AMOUNT:
+                logger.warning("Malformed amount '%s' in category '%s'.", values[col], values[0])
+            else:
+                values[col] = cents / 100
+        return values
+
+    def get_rule_set(self) -> RuleSet:
+        """Returns the compiled categories of the current preset for the categorization engine."""
+        return self.app.preset_manager.get_rule_set()
+
     def add_category(self, table_name: ttk.Treeview) -> None:
         """Adds a new category to the list with default values."""
         table_name.insert("", 0, values=("Kategorie", "", "01.01.2023", "31.12.2023", 0.0, 1000.0))
@@ -117,8 +148,7 @@ class DataManager:
         """Loads categories from the JSON file."""
         if os.path.exists(self.data_path):
             logger.debug("Loading treeview data from file...")
-            with open(self.data_path, "r") as f:
-                self.data_data = json.load(f)
+            self.data_data = Helper.load_file(self.data_path)
             
             # Clear the treeview before loading new data
             logger.debug("Clearing data from the treeviews...")
@@ -127,11 +157,24 @@ class DataManager:
 
             # Load categories into both treeviews
             logger.debug("Loading data into treeviews...")
-            for catItem in self.data_data.get("input_categories", []):
-                self.app.treeInput.insert("", 0, values=(catItem["category"], catItem["filters"], catItem["dateFrom"], catItem["dateTo"], catItem["minValue"], catItem["maxValue"]))
-
-            for catItem in self.data_data.get("output_categories", []):
-                self.app.treeOutput.insert("", 0, values=(catItem["category"], catItem["filters"], catItem["dateFrom"], catItem["dateTo"], catItem["minValue"], catItem["maxValue"]))
-            logger.debug("Treeviews updated!")
+            rows = [(self.app.treeInput, catItem) for catItem in self.data_data.get("input_categories", [])]
+            rows += [(self.app.treeOutput, catItem) for catItem in self.data_data.get("output_categories", [])]
+            self.fill_treeviews(rows)
         else:
-            self.create_data_file()
\ No newline at end of file
+            self.create_data_file()
+            self.categories_loaded()
+
+    def fill_treeviews(self, rows: list, start: int = 0) -> None:
+        """Inserts the next batch of rows, the rest follows in later idle callbacks so the window stays responsive."""
+        for treeview, catItem in rows[start:start + TREEVIEW_BATCH_SIZE]:
+            treeview.insert("", 0, values=(catItem["category"], catItem["filters"], catItem["dateFrom"], catItem["dateTo"], catItem["minValue"], catItem["maxValue"]))
+        if start + TREEVIEW_BATCH_SIZE < len(rows):
+            self.app.main.after_idle(self.fill_treeviews, rows, start + TREEVIEW_BATCH_SIZE)
+            return
+        logger.debug("Treeviews updated!")
+        self.categories_loaded()
+
+    def categories_loaded(self) -> None:
+        """Notifies the app that the categories are shown."""
+        if self.on_loaded is not None:
+            self.on_loaded()
\ No newline at end of file
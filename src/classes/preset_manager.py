@@ -1,6 +1,6 @@
 # system imports
 import os
-import json
+import copy
 import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox
@@ -8,8 +8,13 @@ from tkinter import messagebox
 # local imports
 from ..utils import Helper
 from ..utils.logging import logger
+from ..engine import CategoryMemo, PresetStore, RuleSet, RuleSetCache, RuleStats
+from ..engine.bank_formats import AUTO_FORMAT
 from .settings_manager import SettingsManager
 
+# Label of the automatic bank format detection in the bank menu
+AUTO_LABEL = "Automatisch"
+
 
 class PresetManager(SettingsManager):
     """Handles loading, saving, and managing presets."""
@@ -20,17 +25,28 @@ class PresetManager(SettingsManager):
         if not settings_path:
             raise ValueError("settings_path cannot be empty.")
 
+        # Optional SQLite store of all presets ('preset_store' in the settings, relative to the settings file)
+        store_file = self.settings_data.get("preset_store")
+        self.store = PresetStore(os.path.join(os.path.dirname(settings_path), store_file)) if store_file else None
+        if self.store is not None and not self.store.presets():
+            self.store.import_json(settings_path)  # First start with the store: take over the JSON presets
+
         # Define preset properties
-        self.presets = self.settings_data.get("preset_menu", {}).get("presets", [])
+        if self.store is not None:
+            self.presets = self.store.presets()
+            selected = self.store.get_setting("selected_preset")
+        else:
+            self.presets = self.settings_data.get("preset_menu", {}).get("presets", [])
+            selected = self.settings_data.get("preset_menu", {}).get("selected_preset")
         # If no presets are found, create one default preset
         if not self.presets:
             self.presets = ["Default Preset"]  # Default preset
 
         # Set the default preset if none is found in settings
-        self.selected_preset = tk.StringVar(value=self.settings_data.get("preset_menu", {}).get("selected_preset") or self.presets[0])
+        self.selected_preset = tk.StringVar(value=selected or self.presets[0])
 
         # If we're using the default value, save it to ensure it's properly stored
-        if not self.settings_data.get("preset_menu", {}).get("selected_preset"):
+        if not selected:
             self.set_presets()  # Save the default preset
         
         # Preset variables
@@ -38,6 +54,17 @@ class PresetManager(SettingsManager):
         self.preset_path = self.get_preset_path()  # Get the full preset path
         self.preset_data = {}
 
+        # Cache of parsed presets and compiled rule sets, so switching presets skips unchanged files
+        self.rule_cache = RuleSetCache(self.settings_data.get("rule_cache_size", 16), self.store)
+
+        # Remembered categories of recurring transactions per preset (a size of 0 turns the memo off)
+        self.category_memo_size = self.settings_data.get("category_memo_size", 100_000)
+        self.category_memos = {}
+
+        # Hit counts per preset that let the most frequently hit rules be evaluated first
+        self.adaptive_rule_order = self.settings_data.get("adaptive_rule_order", True)
+        self.rule_stats = {}
+
         # Create preset file if it doesn't exist
         self.create_presets_file(self.get_preset_path())
 
@@ -45,7 +72,7 @@ class PresetManager(SettingsManager):
         self.load_presets()
 
         # * DEBUGGING
-        logger.debug(f"{self.__str__()}")
+        logger.debug("%s", self)
 
 
     # def __str__(self) -> str:
@@ -63,7 +90,14 @@ class PresetManager(SettingsManager):
         return preset_full_path
 
     def create_presets_file(self, path: str) -> None:
-        """Creates and saves a presets file."""
+        """Creates and saves a presets file (or the preset in the store)."""
+        if self.store is not None:
+            name = os.path.splitext(os.path.basename(path))[0]
+            if name not in self.store:
+                self.preset_data = {"paths": {"input_path": "", "output_path": ""}}
+                self.store.save(name, self.preset_data)
+                logger.info("There was no preset '%s' in the preset store. A default config is now saved.", name)
+            return
         # Check if the preset directory exists
         if not os.path.exists(self.preset_dir_path):
             Helper.create_dir(self.preset_dir_path)
@@ -78,20 +112,79 @@ class PresetManager(SettingsManager):
             }
             
             Helper.save_file(path, self.preset_data)
-            logger.info(f"There was no preset config found. A default config is now saved at: {path}")
+            logger.info("There was no preset config found. A default config is now saved at: %s", path)
 
 
+    def preset_exists(self) -> bool:
+        """Checks whether the selected preset has a file (or an entry in the store)."""
+        if self.store is not None:
+            return self.get_selected_preset() in self.store
+        return os.path.exists(self.get_preset_path())
+
+    def update_preset_data(self, new_data: dict) -> None:
+        """Merges new top-level keys into the selected preset file (or the preset in the store)."""
+        if self.store is not None:
+            self.store.update(self.get_selected_preset(), new_data)
+        else:
+            Helper.update_json_file(self.get_preset_path(), new_data)
+
     def load_presets(self) -> None:
         """Loads the presets from the file."""
-        if os.path.exists(self.get_preset_path()):
-            # Load the preset data from the currently selected preset file
-            with open(os.path.join(self.preset_dir_path, f"{self.get_selected_preset()}.json"), "r") as f:
-                self.preset_data = json.load(f)
-                logger.debug(f"Load the preset data from the selected preset file: '{self.get_selected_preset()}.json'")
+        if self.preset_exists():
+            # Load the preset data from the currently selected preset file (re-read only if it changed)
+            Helper.flush_file(self.get_preset_path())  # Pending changes have to reach the file first
+            cached_data = self.rule_cache.get_preset_data(self.get_selected_preset(), self.get_preset_path())
+            self.preset_data = copy.deepcopy(cached_data)
+            logger.debug("Load the preset data from the selected preset file: '%s.json'", self.get_selected_preset())
         else:
             # If the preset file doesn't exist, create it
             self.create_presets_file(self.get_preset_path())
 
+    def get_rule_set(self) -> RuleSet:
+        """Returns the compiled rule set of the selected preset, compiled only if the file changed."""
+        Helper.flush_file(self.get_preset_path())  # Saved categories may still be pending
+        return self.rule_cache.get_rule_set(self.get_selected_preset(), self.get_preset_path())
+
+    def get_category_memo_path(self, preset: str | None = None) -> str:
+        """Returns the path of the category memo file next to a preset file."""
+        return self.get_preset_path(f"{preset or self.get_selected_preset()}.category_memo.json")
+
+    def get_category_memo(self) -> CategoryMemo | None:
+        """Returns the category memo of the selected preset, None if the memo is turned off."""
+        if not self.category_memo_size or self.category_memo_size <= 0:
+            return None
+        preset = self.get_selected_preset()
+        if preset not in self.category_memos:
+            self.category_memos[preset] = CategoryMemo(self.get_category_memo_path(preset), self.category_memo_size)
+        return self.category_memos[preset]
+
+    def invalidate_category_memo(self, preset: str | None = None) -> None:
+        """Forgets the remembered categories of a preset, e.g. after its rules were edited."""
+        preset = preset or self.get_selected_preset()
+        memo = self.category_memos.pop(preset, None) or CategoryMemo(self.get_category_memo_path(preset))
+        memo.invalidate()
+        logger.debug("Invalidated the category memo of preset '%s'.", preset)
+
+    def get_rule_stats_path(self, preset: str | None = None) -> str:
+        """Returns the path of the rule statistics file next to a preset file."""
+        return self.get_preset_path(f"{preset or self.get_selected_preset()}.rule_stats.json")
+
+    def get_rule_stats(self) -> RuleStats | None:
+        """Returns the rule statistics of the selected preset, None if the adaptive rule order is turned off."""
+        if not self.adaptive_rule_order:
+            return None
+        preset = self.get_selected_preset()
+        if preset not in self.rule_stats:
+            self.rule_stats[preset] = RuleStats(self.get_rule_stats_path(preset))
+        return self.rule_stats[preset]
+
+    def invalidate_rule_stats(self, preset: str | None = None) -> None:
+        """Forgets the rule hit counts of a preset, e.g. when it is deleted."""
+        preset = preset or self.get_selected_preset()
+        rule_stats = self.rule_stats.pop(preset, None) or RuleStats(self.get_rule_stats_path(preset))
+        rule_stats.invalidate()
+        logger.debug("Invalidated the rule statistics of preset '%s'.", preset)
+
     def get_paths(self):
         """Gets the filepaths to the corresponding entryfields."""
         # Deletes the entry fields
@@ -100,26 +193,39 @@ class PresetManager(SettingsManager):
         # Get the paths from the preset data
         self.app.InputEntry.insert(0, self.preset_data["paths"]["input_path"])
         self.app.OutputEntry.insert(0, self.preset_data["paths"]["output_path"])
-        logger.debug(f"Getting filepaths from the current preset data. Current preset: '{self.get_selected_preset()}'")
+        logger.debug("Getting filepaths from the current preset data. Current preset: '%s'", self.get_selected_preset())
 
     def set_paths(self, input_path: str, output_path: str) -> None:
         """Sets and saves the input and output paths."""
         self.preset_data["paths"]["input_path"] = input_path
         self.preset_data["paths"]["output_path"] = output_path
-        Helper.update_json_file(self.get_preset_path(), self.preset_data)
+        self.update_preset_data(self.preset_data)
         logger.info("Save input and output paths...")
 
+    def get_bank_format(self) -> None:
+        """Shows the bank format of the current preset in the bank menu."""
+        bank_format = self.preset_data.get("bank_format", AUTO_FORMAT)
+        self.app.bankMenu.set(AUTO_LABEL if bank_format == AUTO_FORMAT else bank_format)
+        logger.debug("Getting the bank format from the current preset data: '%s'", bank_format)
+
+    def set_bank_format(self, label: str) -> None:
+        """Sets and saves the bank format chosen in the bank menu."""
+        self.preset_data["bank_format"] = AUTO_FORMAT if label == AUTO_LABEL else label
+        self.update_preset_data(self.preset_data)
+        logger.info("Save bank format '%s'...", self.preset_data['bank_format'])
+
     def on_preset_change(self, sel_preset) -> None:
         """Handles the event when the preset is changed."""
         # Try update the selected preset variable and save
         try:
             self.selected_preset.set(sel_preset)
             self.set_presets()  # Update the presets
-            logger.info(f"Current preset changed to: {sel_preset}")
+            logger.info("Current preset changed to: %s", sel_preset)
             # Load the current preset file
             self.load_presets()
-            # Load the paths from the preset file
+            # Load the paths and the bank format from the preset file
             self.get_paths()
+            self.get_bank_format()
         except ValueError as e:
             msg_error = f"Error: {e}"
             logger.error(msg_error)
@@ -138,12 +244,18 @@ class PresetManager(SettingsManager):
                 "selected_preset": self.get_selected_preset(), # Get selected preset as a string
                 "presets": self.presets
             }
-            logger.debug(f"Save 'presets' and 'selected preset' to the settings var.")
+            logger.debug("Save 'presets' and 'selected preset' to the settings var.")
         else:
             msg = f"Preset '{self.get_selected_preset()}' is already known."
             logger.error(msg)
             raise ValueError(msg)
-        
+
+        # With the store only the order and the selection change, settings.json stays untouched
+        if self.store is not None:
+            self.store.set_order(self.presets)
+            self.store.set_setting("selected_preset", self.get_selected_preset())
+            return
+
         # Save the presets to the settings file
         Helper.save_file(self.settings_path, self.settings_data)
 
@@ -157,7 +269,7 @@ class PresetManager(SettingsManager):
         else:
             if preset not in self.presets:
                 self.presets.append(preset)
-                logger.info(f"Added '{preset}' to the presets.")
+                logger.info("Added '%s' to the presets.", preset)
                 # Save the updated presets
                 self.set_presets()
                 # Delete the entry field
@@ -169,7 +281,7 @@ class PresetManager(SettingsManager):
                 # Load the new preset file
                 self.on_preset_change(preset)
             else:
-                logger.warning(f"Preset '{preset}' already exists.")
+                logger.warning("Preset '%s' already exists.", preset)
                 messagebox.showwarning("Warning", f"Preset '{preset}' already exists.")
                 raise UserWarning(f"Preset '{preset}' already exists.")
 
@@ -200,15 +312,22 @@ class PresetManager(SettingsManager):
                 self.app.update_preset_menu()
                 # Delete the old preset file
                 try:
-                    os.remove(self.get_preset_path(f"{preset}.json"))
-                    logger.info(f"Delete preset: {preset} & file: '{preset}.json'.")
+                    if self.store is not None:
+                        self.store.delete(preset)
+                    else:
+                        Helper.discard_file(self.get_preset_path(f"{preset}.json"))
+                        os.remove(self.get_preset_path(f"{preset}.json"))
+                    self.rule_cache.invalidate(preset)
+                    self.invalidate_category_memo(preset)
+                    self.invalidate_rule_stats(preset)
+                    logger.info("Delete preset: %s & file: '%s.json'.", preset, preset)
                 except ValueError as e:
-                    logger.error(f"Can't delete '{preset}.json'.")
+                    logger.error("Can't delete '%s.json'.", preset)
                     raise ValueError(f"Error: {e}")
                 print(f"Deleted preset:  {preset} & file: '{preset}.json'.")
                 # Load the new preset file
                 self.on_preset_change(self.get_selected_preset())
             else:
-                logger.warning(f"Preset '{preset}' doesn't exist.")
+                logger.warning("Preset '%s' doesn't exist.", preset)
                 messagebox.showwarning("Warning", f"Preset '{preset}' doesn't exist.")
                 raise UserWarning(f"Preset '{preset}' doesn't exist.")
@@ -1,6 +1,5 @@
 # system imports
 import os
-import json
 import tkinter as tk
 from tkinter import ttk
 
@@ -18,7 +17,7 @@ class SettingsManager:
         # Ensure the settings are loaded at the beginning
         self.load_settings()
 
-        logger.debug(f"{self.__str__()}")
+        logger.debug("%s", self)
 
     
     def __str__(self) -> str:
@@ -39,13 +38,12 @@ class SettingsManager:
             logger.debug("Create default config to settings file...")
             Helper.save_file(self.settings_path, self.settings_data)
         else:
-            logger.warning(f"The following path is already existing: '{self.settings_path}'")
+            logger.warning("The following path is already existing: '%s'", self.settings_path)
 
     def load_settings(self) -> None:
         """Loads settings from the JSON file."""
         if os.path.exists(self.settings_path):
-            with open(self.settings_path, "r") as f:
-                self.settings_data = json.load(f)
+            self.settings_data = Helper.load_file(self.settings_path)
             logger.info("Loading settings from JSON file...")
         else:
             self.create_settings_file()
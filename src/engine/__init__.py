@@ -0,0 +1,38 @@
+import importlib
+
+__all__ = ["rule_set", "transactions", "german_parser", "keyword_matcher", "interval_index", "preset_store", "rule_cache", "category_memo", "rule_stats", "profiling", "categorizer", "results", "aggregation", "checkpoint", "bank_formats", "csv_stream", "columnar_cache", "dedup", "export", "pipeline", "batch", "watch", "worker"]
+
+from .rule_set import RuleSet
+from .transactions import Transactions
+from .german_parser import GermanParser, ParseReport
+from .keyword_matcher import KeywordMatcher
+from .interval_index import IntervalIndex
+from .category_memo import CategoryMemo
+from .rule_stats import RuleStats
+from .profiling import RunProfile
+from .categorizer import Categorizer
+from .results import CategorizationResult
+from .aggregation import SummaryAggregator
+from .checkpoint import Checkpoint
+from .bank_formats import BankFormat, FormatDetector
+from .csv_stream import CsvStreamReader, CsvStreamWriter
+from .columnar_cache import ColumnarCache
+from .dedup import FingerprintStore, Deduplicator
+from .export import Exporter
+from .pipeline import Pipeline, CancelledError
+
+# Classes of a single mode (preset database, GUI cache and worker, batch, watch) and their modules
+_LAZY_CLASSES = {
+    "PresetStore": "preset_store",
+    "RuleSetCache": "rule_cache",
+    "BatchProcessor": "batch",
+    "FolderWatcher": "watch",
+    "CategorizeWorker": "worker",
+}
+
+
+def __getattr__(name):
+    """Imports the mode-specific classes only on first use, so a single headless run skips sqlite3, multiprocessing and ctypes."""
+    if name in _LAZY_CLASSES:
+        return getattr(importlib.import_module(f".{_LAZY_CLASSES[name]}", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,169 @@
+# system imports
+import os
+import json
+import numpy as np
+
+# local imports
+from .transactions import Transactions
+from ..utils.logging import logger
+
+# Supported summary periods
+PERIODS = ("month", "week")
+
+# Neutral start values of the running minimum and maximum of an empty cell
+_MIN_START = np.iinfo(np.int64).max
+_MAX_START = np.iinfo(np.int64).min
+
+
+def period_codes(dates: np.ndarray, period: str) -> np.ndarray:
+    """Maps dates to integer period codes: months since 1970-01 or ISO weeks since the week of 1970-01-01."""
+    if period == "month":
+        return dates.astype("datetime64[M]").astype(np.int64)
+    if period == "week":
+        return (dates.astype(np.int64) + 3) // 7  # 1970-01-01 was a Thursday, weeks start on Monday
+    msg = f"Unknown summary period '{period}', expected one of {PERIODS}"
+    logger.error(msg)
+    raise ValueError(msg)
+
+
+def period_label(code: int, period: str) -> str:
+    """Returns the label of a period code, e.g. '2024-03' or '2024-W09'."""
+    if period == "month":
+        return str(np.datetime64(int(code), "M"))
+    # The ISO year and week number are those of the Thursday of the week
+    thursday = np.datetime64(int(code) * 7, "D")
+    year = thursday.astype("datetime64[Y]")
+    week = (thursday - year.astype("datetime64[D]")).astype(np.int64) // 7 + 1
+    return f"{year}-W{week:02d}"
+
+
+class _PeriodTable:
+    """Dense (period x category) grids of totals, counts, minimum and maximum in cents."""
+    def __init__(self, width: int) -> None:
+        self.width = width  # Categories plus the trailing 'uncategorized' column
+        self.origin = 0  # Period code of the first grid row
+        self.total = np.zeros((0, width), dtype=np.int64)
+        self.count = np.zeros((0, width), dtype=np.int64)
+        self.minimum = np.full((0, width), _MIN_START, dtype=np.int64)
+        self.maximum = np.full((0, width), _MAX_START, dtype=np.int64)
+
+    def _cover(self, first: int, last: int) -> None:
+        """Grows the grids so they contain the period codes first..last."""
+        before = 0
+        if len(self.total):
+            first, last = min(first, self.origin), max(last, self.origin + len(self.total) - 1)
+            if first == self.origin and last == self.origin + len(self.total) - 1:
+                return
+            before = self.origin - first
+        after = last - first + 1 - before - len(self.total)
+        pad = ((before, after), (0, 0))
+        self.total = np.pad(self.total, pad)
+        self.count = np.pad(self.count, pad)
+        self.minimum = np.pad(self.minimum, pad, constant_values=_MIN_START)
+        self.maximum = np.pad(self.maximum, pad, constant_values=_MAX_START)
+        self.origin = first
+
+    def add(self, codes: np.ndarray, columns: np.ndarray, amounts: np.ndarray) -> None:
+        """Accumulates one chunk of rows given as period codes, category columns and amounts."""
+        if not len(codes):
+            return
+        self._cover(int(codes.min()), int(codes.max()))
+        cells = (codes - self.origin) * self.width + columns
+        size = self.total.size
+        # Float sums are exact while a chunk's cell total stays below 2**53 cents
+        self.total += np.rint(np.bincount(cells, weights=amounts, minlength=size)).astype(np.int64).reshape(self.total.shape)
+        self.count += np.bincount(cells, minlength=size).reshape(self.count.shape)
+
+        # Minimum and maximum per cell: sort the rows by cell and reduce each run of equal cells
+        order = np.argsort(cells, kind="stable")
+        sorted_cells = cells[order]
+        starts = np.flatnonzero(np.r_[True, sorted_cells[1:] != sorted_cells[:-1]])
+        touched = sorted_cells[starts]
+        sorted_amounts = amounts[order]
+        minimum, maximum = self.minimum.reshape(-1), self.maximum.reshape(-1)
+        minimum[touched] = np.minimum(minimum[touched], np.minimum.reduceat(sorted_amounts, starts))
+        maximum[touched] = np.maximum(maximum[touched], np.maximum.reduceat(sorted_amounts, starts))
+
+    def merge(self, other: "_PeriodTable") -> None:
+        """Adds the cells of another table of the same width."""
+        if not len(other.total):
+            return
+        self._cover(other.origin, other.origin + len(other.total) - 1)
+        rows = slice(other.origin - self.origin, other.origin - self.origin + len(other.total))
+        self.total[rows] += other.total
+        self.count[rows] += other.count
+        self.minimum[rows] = np.minimum(self.minimum[rows], other.minimum)
+        self.maximum[rows] = np.maximum(self.maximum[rows], other.maximum)
+
+
+class SummaryAggregator:
+    """Per-category totals, counts, min, max and mean per month and ISO week, built in one streaming pass.
+
+    Chunks are added right after they were categorized, so the summaries are complete when the
+    run finishes. Aggregators of other chunks or files (same categories) can be merged in.
+    """
+    def __init__(self, categories: list[str], periods: tuple = PERIODS, uncategorized: str = "") -> None:
+        for period in periods:
+            period_codes(np.empty(0, dtype="datetime64[D]"), period)  # Rejects unknown periods early
+        self.categories = list(categories)  # Category labels, indexed by category id
+        self.uncategorized = uncategorized  # Label of the rows without category
+        self.periods = tuple(periods)
+        self.tables = {period: _PeriodTable(len(self.categories) + 1) for period in self.periods}
+        self.skipped = 0  # Rows without a valid date or amount
+
+    def __str__(self) -> str:
+        """Returns a string representation of the SummaryAggregator instance."""
+        return f"SummaryAggregator: \n  -> periods= {self.periods},\n  -> categories= {len(self.categories)},\n  -> skipped= {self.skipped}"
+
+    def add(self, transactions: Transactions, category_ids: np.ndarray) -> None:
+        """Accumulates one categorized chunk."""
+        valid = transactions.valid_mask()
+        self.skipped += int(len(valid) - valid.sum())
+        dates = transactions.dates[valid]
+        amounts = transactions.amounts[valid]
+        columns = np.asarray(category_ids, dtype=np.int64)[valid]
+        columns = np.where(columns < 0, len(self.categories), columns)  # -1 goes to the trailing column
+        for period, table in self.tables.items():
+            table.add(period_codes(dates, period), columns, amounts)
+
+    def merge(self, other: "SummaryAggregator") -> "SummaryAggregator":
+        """Adds the partial aggregates of another aggregator (e.g. of another file) and returns self."""
+        if other.categories != self.categories or other.periods != self.periods:
+            msg = "Only summaries with the same categories and periods can be merged."
+            logger.error(msg)
+            raise ValueError(msg)
+        for period, table in self.tables.items():
+            table.merge(other.tables[period])
+        self.skipped += other.skipped
+        return self
+
+    def rows(self, period: str) -> list[dict]:
+        """Returns one entry per period and category with at least one transaction, oldest period first."""
+        table = self.tables[period]
+        labels = self.categories + [self.uncategorized]
+        report = []
+        for row, column in zip(*np.nonzero(table.count)):
+            count = int(table.count[row, column])
+            total = int(table.total[row, column])
+            report.append({
+                "period": period_label(table.origin + row, period),
+                "category": labels[column],
+                "total": total / 100,
+                "count": count,
+                "min": int(table.minimum[row, column]) / 100,
+                "max": int(table.maximum[row, column]) / 100,
+                "mean": round(total / count / 100, 2),
+            })
+        return report
+
+    def to_dict(self) -> dict:
+        """Returns the summaries of all periods as a JSON-serializable dict (amounts in euros)."""
+        return {"skipped_rows": self.skipped, **{period: self.rows(period) for period in self.periods}}
+
+    def save(self, path: str) -> None:
+        """Writes the JSON summary report."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=4)
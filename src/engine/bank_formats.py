@@ -0,0 +1,170 @@
+# system imports
+import os
+import csv
+import copy
+
+# local imports
+from ..utils import Helper
+from ..utils.logging import logger
+
+# Name of the format that is detected from the file itself
+AUTO_FORMAT = "auto"
+
+# Header names (lower-case) that are recognized for the required columns when a format maps none
+DATE_COLUMNS = ("buchungstag", "buchungsdatum", "buchung", "datum", "valutadatum", "wertstellung", "date")
+AMOUNT_COLUMNS = ("betrag", "umsatz", "betrag (eur)", "betrag (€)", "umsatz in eur", "amount")
+DESCRIPTION_COLUMNS = ("verwendungszweck", "buchungstext", "beschreibung", "description")
+
+# Bytes read from the start of a file to detect its format
+SNIFF_BYTES = 8192
+
+# Delimiters and encodings tried while sniffing, most common first
+SNIFF_DELIMITERS = (";", ",", "\t", "|")
+SNIFF_ENCODINGS = ("utf-8-sig", "cp1252")
+
+
+def find_column(header: list[str], candidates: tuple) -> int:
+    """Returns the index of the first header cell matching one of the candidates, -1 if none does."""
+    normalized = [cell.strip().lower() for cell in header]
+    for candidate in candidates:
+        if candidate in normalized:
+            return normalized.index(candidate)
+    return -1
+
+
+class BankFormat:
+    """Layout of the CSV export of one bank: dialect, position of the header and the used columns."""
+    def __init__(self, name: str, delimiter: str = ";", encoding: str = "utf-8-sig", header_row: int = 0, date_column: str | None = None, amount_column: str | None = None, description_column: str | None = None, signature: tuple = ()) -> None:
+        self.name = name
+        self.delimiter = delimiter
+        self.encoding = encoding
+        self.header_row = header_row  # Lines (records) before the header, e.g. account details
+        self.date_column = date_column  # Header names of the used columns, None = generic candidates
+        self.amount_column = amount_column
+        self.description_column = description_column
+        self.signature = tuple(cell.lower() for cell in signature)  # Header cells that identify the bank
+
+    def __str__(self) -> str:
+        """Returns a string representation of the BankFormat instance."""
+        return f"BankFormat: \n  -> name= {self.name},\n  -> delimiter= {self.delimiter!r},\n  -> encoding= {self.encoding},\n  -> header_row= {self.header_row}"
+
+    def to_dict(self) -> dict:
+        """Returns the format as a JSON-serializable dict."""
+        data = dict(self.__dict__)
+        data["signature"] = list(self.signature)
+        return data
+
+    def _find_columns(self, header: list[str]) -> list[int]:
+        """Returns the indexes of the date, amount and description column in a header row, -1 for missing ones."""
+        return [find_column(header, (mapped.lower(),) if mapped else candidates) for mapped, candidates in ((self.date_column, DATE_COLUMNS), (self.amount_column, AMOUNT_COLUMNS), (self.description_column, DESCRIPTION_COLUMNS))]
+
+    def column_indexes(self, header: list[str]) -> tuple[int, int, int]:
+        """Returns the indexes of the date, amount and description column in a header row."""
+        indexes = self._find_columns(header)
+        if -1 in indexes:
+            msg = f"CSV header does not contain the date, amount and description column of the format '{self.name}': {header}"
+            logger.error(msg)
+            raise ValueError(msg)
+        return tuple(indexes)
+
+    def matches(self, header: list[str]) -> bool:
+        """Checks whether a header row has the signature and the required columns of this format."""
+        normalized = {cell.strip().lower() for cell in header}
+        return set(self.signature) <= normalized and -1 not in self._find_columns(header)
+
+
+# Known bank formats, the generic one has to stay last
+BANK_FORMATS = {
+    "Sparkasse": BankFormat("Sparkasse", ";", "cp1252", 0, "Buchungstag", "Betrag", "Verwendungszweck", ("Auftragskonto", "Buchungstag", "Valutadatum", "Beguenstigter/Zahlungspflichtiger")),
+    "DKB": BankFormat("DKB", ";", "utf-8-sig", 4, "Buchungsdatum", "Betrag (€)", "Verwendungszweck", ("Buchungsdatum", "Wertstellung", "Zahlungspflichtige*r", "Zahlungsempfänger*in")),
+    "ING": BankFormat("ING", ";", "cp1252", 13, "Buchung", "Betrag", "Verwendungszweck", ("Buchung", "Valuta", "Auftraggeber/Empfänger")),
+    "comdirect": BankFormat("comdirect", ";", "cp1252", 4, "Buchungstag", "Umsatz in EUR", "Buchungstext", ("Buchungstag", "Wertstellung (Valuta)", "Vorgang")),
+    "Generisch": BankFormat("Generisch"),
+}
+
+
+def register_format(bank_format: BankFormat) -> None:
+    """Adds (or replaces) a bank format, it is tried before the generic format."""
+    generic = BANK_FORMATS.pop("Generisch")
+    BANK_FORMATS[bank_format.name] = bank_format
+    BANK_FORMATS["Generisch"] = generic
+
+
+class FormatDetector:
+    """Detects the bank format of an export from its first few KB.
+
+    Results are cached per file (keyed by path, size and mtime) and optionally persisted in a
+    JSON file, so an unchanged export is not sniffed again.
+    """
+    def __init__(self, cache_path: str | None = None) -> None:
+        self.cache_path = cache_path
+        self.cache = Helper.load_file(cache_path) if cache_path and os.path.exists(cache_path) else {}
+
+    def __str__(self) -> str:
+        """Returns a string representation of the FormatDetector instance."""
+        return f"FormatDetector: \n  -> cache_path= {self.cache_path},\n  -> cached= {len(self.cache)}"
+
+    def resolve(self, path: str, name: str | None = AUTO_FORMAT) -> BankFormat:
+        """Returns the named format, or the detected one for 'auto' (or None)."""
+        if name and name != AUTO_FORMAT:
+            if name not in BANK_FORMATS:
+                msg = f"Unknown bank format '{name}', expected one of {list(BANK_FORMATS)}"
+                logger.error(msg)
+                raise ValueError(msg)
+            return BANK_FORMATS[name]
+        return self.detect(path)
+
+    def detect(self, path: str) -> BankFormat:
+        """Returns the format of a file, from the cache if the file did not change."""
+        stat = os.stat(path)
+        key = os.path.abspath(path)
+        entry = self.cache.get(key)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return BankFormat(**entry["format"])
+
+        bank_format = self.sniff(path)
+        self.cache[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "format": bank_format.to_dict()}
+        if self.cache_path:
+            Helper.save_file(self.cache_path, self.cache)
+        logger.info("Detected bank format '%s' (delimiter %r, %s, header in line %s) for '%s'.", bank_format.name, bank_format.delimiter, bank_format.encoding, bank_format.header_row + 1, path)
+        return bank_format
+
+    @staticmethod
+    def sniff(path: str) -> BankFormat:
+        """Finds the header line, delimiter, encoding and bank of a file from its first bytes."""
+        with open(path, "rb") as f:
+            sample = f.read(SNIFF_BYTES)
+        if len(sample) == SNIFF_BYTES and b"\n" in sample:
+            sample = sample[:sample.rfind(b"\n") + 1]  # Only complete lines, no cut multi-byte characters
+
+        for encoding in SNIFF_ENCODINGS:
+            try:
+                text = sample.decode(encoding)
+            except UnicodeDecodeError:
+                continue
+            for header_row, line in enumerate(text.split("\n")):
+                line = line.rstrip("\r")
+                for delimiter in SNIFF_DELIMITERS:
+                    if delimiter not in line:
+                        continue
+                    header = next(csv.reader([line], delimiter=delimiter))
+                    for bank_format in BANK_FORMATS.values():
+                        if bank_format.name != "Generisch" and bank_format.delimiter == delimiter and bank_format.matches(header):
+                            detected = copy.copy(bank_format)
+                            break
+                    else:
+                        detected = BankFormat("Generisch", delimiter, encoding)
+                        if not detected.matches(header):
+                            continue
+                    detected.header_row = header_row  # Banks change their preamble now and then
+                    if not sample.isascii():
+                        detected.encoding = encoding  # An ASCII sample cannot tell, then the bank's encoding is kept
+                    return detected
+
+        msg = f"Could not detect the format of '{path}', no header with date, amount and description found."
+        logger.error(msg)
+        raise ValueError(msg)
+
+
+# Shared detector of the process, caches the detected formats in memory
+format_detector = FormatDetector()
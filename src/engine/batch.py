@@ -0,0 +1,119 @@
+# system imports
+import os
+import glob
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+# local imports
+from .aggregation import SummaryAggregator
+from .pipeline import Pipeline
+from .rule_set import RuleSet
+from ..utils.logging import logger
+
+# Suffix of the per-file outputs, files with this suffix are never picked up as inputs
+OUTPUT_SUFFIX = "_categorized.csv"
+
+# Pipeline of the current worker process, created once from the shared rule set
+_worker_pipeline = None
+
+
+def _init_worker(rule_set: RuleSet, chunk_size: int, incremental: bool, columnar_cache: bool, bank_format: str | None) -> None:
+    """Receives the compiled rule set once per worker process."""
+    global _worker_pipeline
+    _worker_pipeline = Pipeline(rule_set, chunk_size, incremental, columnar_cache, bank_format=bank_format)
+
+
+def _run_file(input_path: str, output_path: str, summarize: bool) -> tuple[int, SummaryAggregator | None]:
+    """Categorizes one file inside a worker process, optionally with its partial summary."""
+    summary = SummaryAggregator(_worker_pipeline.categorizer.rule_set.categories) if summarize else None
+    return _worker_pipeline.run(input_path, output_path, summary=summary), summary
+
+
+def available_cores() -> int:
+    """Returns the number of CPU cores this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+class BatchProcessor:
+    """Categorizes a directory (or glob) of bank exports in parallel with a process pool."""
+    def __init__(self, rule_set: RuleSet, chunk_size: int = 50_000, workers: int | None = None, incremental: bool = False, columnar_cache: bool = False, bank_format: str | None = None) -> None:
+        self.rule_set = rule_set
+        self.chunk_size = chunk_size
+        self.workers = workers or available_cores()
+        self.incremental = incremental
+        self.columnar_cache = columnar_cache
+        self.bank_format = bank_format  # Same bank format for all files, None detects it per file
+
+    def __str__(self) -> str:
+        """Returns a string representation of the BatchProcessor instance."""
+        return f"BatchProcessor: \n  -> workers= {self.workers},\n  -> chunk_size= {self.chunk_size},\n  -> rules= {len(self.rule_set)}"
+
+    @staticmethod
+    def collect_inputs(source: str) -> list[str]:
+        """Returns the sorted CSV files of a directory or glob pattern."""
+        pattern = os.path.join(source, "*.csv") if os.path.isdir(source) else source
+        files = sorted(path for path in glob.glob(pattern) if os.path.isfile(path) and not path.endswith(OUTPUT_SUFFIX))
+        if not files:
+            msg = f"No CSV files found for '{source}'"
+            logger.error(msg)
+            raise FileNotFoundError(msg)
+        return files
+
+    @staticmethod
+    def output_path_for(input_path: str, output_dir: str) -> str:
+        """Returns the per-file output path of an input file."""
+        stem = os.path.splitext(os.path.basename(input_path))[0]
+        return os.path.join(output_dir, f"{stem}{OUTPUT_SUFFIX}")
+
+    def run(self, source: str, output_dir: str, merged_output: str | None = None, summary: SummaryAggregator | None = None) -> dict[str, int]:
+        """Categorizes every input file into `output_dir` and returns the row count per input file.
+
+        If `summary` is given, the partial summaries of all files are merged into it.
+        """
+        inputs = self.collect_inputs(source)
+        outputs = [self.output_path_for(path, output_dir) for path in inputs]
+        if len(set(outputs)) != len(outputs):
+            msg = "Input files with the same name would overwrite each other's output."
+            logger.error(msg)
+            raise ValueError(msg)
+        os.makedirs(output_dir, exist_ok=True)
+
+        workers = max(1, min(self.workers, len(inputs)))
+        logger.info("Categorizing %s files with %s worker processes...", len(inputs), workers)
+
+        # The rule set is compiled once here and handed to every worker through the initializer
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self.rule_set, self.chunk_size, self.incremental, self.columnar_cache, self.bank_format)) as pool:
+            futures = [pool.submit(_run_file, input_path, output_path, summary is not None) for input_path, output_path in zip(inputs, outputs)]
+            row_counts = {}
+            for input_path, future in zip(inputs, futures):
+                row_counts[input_path], file_summary = future.result()
+                if summary is not None:
+                    summary.merge(file_summary)
+
+        if merged_output:
+            self.merge_outputs(outputs, merged_output)
+
+        logger.info("Categorized %s rows from %s files into '%s'.", sum(row_counts.values()), len(inputs), output_dir)
+        return row_counts
+
+    @staticmethod
+    def merge_outputs(outputs: list[str], merged_output: str) -> None:
+        """Concatenates the per-file outputs in input order, keeping only the first header."""
+        merged_dir = os.path.dirname(merged_output)
+        if merged_dir:
+            os.makedirs(merged_dir, exist_ok=True)
+
+        header = None
+        with open(merged_output, "wb") as merged:
+            for output_path in outputs:
+                with open(output_path, "rb") as f:
+                    file_header = f.readline()
+                    if header is None:
+                        header = file_header
+                        merged.write(header)
+                    elif file_header != header:
+                        logger.warning("Header of '%s' differs from the first file, merging anyway.", output_path)
+                    shutil.copyfileobj(f, merged)
+        logger.info("Merged %s outputs into '%s'.", len(outputs), merged_output)
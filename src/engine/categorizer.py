@@ -0,0 +1,175 @@
+# system imports
+import time
+import logging
+import numpy as np
+
+# local imports
+from .category_memo import CategoryMemo, MISS
+from .profiling import RunProfile
+from .rule_set import RuleSet
+from .rule_stats import RuleStats
+from .transactions import Transactions
+from ..utils.logging import logger
+
+# Category id for transactions that no rule matched
+UNCATEGORIZED = -1
+
+
+class Categorizer:
+    """Applies a compiled RuleSet to whole columns of transactions at once."""
+    def __init__(self, rule_set: RuleSet, memo: CategoryMemo | None = None, rule_stats: RuleStats | None = None) -> None:
+        self.rule_set = rule_set
+        self.memo = memo  # Resolved categories of recurring transactions, they skip the rule evaluation
+        self.rule_stats = rule_stats  # Hit counts of earlier runs, the most frequently hit rules are evaluated first
+        self.start_run()
+
+    def __str__(self) -> str:
+        """Returns a string representation of the Categorizer instance."""
+        return f"Categorizer: \n  -> rule_set= {len(self.rule_set)} rules,\n  -> adaptive= {self.order is not None}"
+
+    def start_run(self) -> None:
+        """Resets the counters of a run and takes the evaluation order from the rule statistics."""
+        rules = self.rule_set
+        self.order = None  # Evaluation order of the rules, None = declared order
+        if self.rule_stats is not None:
+            order = self.rule_stats.order(rules)
+            if not np.array_equal(order, np.arange(len(rules))):
+                self.order = order
+        self.rule_hits = np.zeros(len(rules), dtype=np.int64)  # Rows assigned by each rule
+        self.transactions = 0  # Transactions categorized
+        self.rules_evaluated = 0  # Rule tests of single transactions
+
+    def avg_rules_evaluated(self) -> float:
+        """Returns the average number of rules a transaction was tested against in this run."""
+        return self.rules_evaluated / self.transactions if self.transactions else 0.0
+
+    def categorize(self, transactions: Transactions, profile: RunProfile | None = None) -> np.ndarray:
+        """Returns the category id of every transaction (UNCATEGORIZED if no rule matches).
+
+        If a RunProfile is given, stage timings and per-rule hits and costs are added to it. With a
+        CategoryMemo, rows whose key was resolved before take the remembered category and the
+        categories of the other rows are remembered afterwards.
+        """
+        rules = self.rule_set
+        clock = time.perf_counter
+        started = clock()
+        result = np.full(len(transactions), UNCATEGORIZED, dtype=np.int32)
+        self.transactions += len(transactions)
+        if profile is not None:
+            profile.count_transactions(len(transactions))
+        unassigned = transactions.valid_mask()
+        if not len(rules) or not unassigned.any():
+            return result
+
+        # Rows outside of every date or amount window are pruned before any keyword is matched
+        date_segments = rules.date_index.segments(transactions.dates.astype(np.int64))
+        amount_segments = rules.amount_index.segments(transactions.amounts)
+        unassigned &= rules.date_index.covered(date_segments) & rules.amount_index.covered(amount_segments)
+        live_rows = np.flatnonzero(unassigned)
+        if profile is not None:
+            profile.add_stage("index_lookup", clock() - started, len(transactions))
+        if not len(live_rows):
+            return result
+        started = clock()
+
+        # Recurring transactions are answered by the memo, only the others go through the rules
+        memo = self.memo
+        if memo is not None:
+            memo.bind(rules)
+            keys, key_ids, normalized, normalized_ids = memo.keys(transactions.descriptions[live_rows].tolist(), date_segments[live_rows], amount_segments[live_rows])
+            remembered = memo.lookup(keys)[key_ids]
+            known = remembered != MISS
+            result[live_rows[known]] = remembered[known]
+            unassigned[live_rows[known]] = False
+            live_rows, key_ids = live_rows[~known], key_ids[~known]
+            if profile is not None:
+                profile.add_stage("memo_lookup", clock() - started, len(known))
+            if not len(live_rows):
+                return result
+            started = clock()
+
+            # Normalized descriptions match the same search terms as the original ones
+            unique_ids, live_description_ids = np.unique(normalized_ids[~known], return_inverse=True)
+            unique_descriptions = [normalized[text_id] for text_id in unique_ids.tolist()]
+        else:
+            # Every distinct description of the remaining rows is scanned once for all search terms
+            unique_descriptions, live_description_ids = np.unique(transactions.descriptions[live_rows].astype(str), return_inverse=True)
+        description_ids = np.zeros(len(transactions), dtype=np.int64)
+        description_ids[live_rows] = live_description_ids
+        text_ids, keyword_ids = rules.matcher.match_many(unique_descriptions)
+        order = np.argsort(keyword_ids, kind="stable")
+        text_ids = text_ids[order]
+        bounds = np.searchsorted(keyword_ids[order], np.arange(len(rules.keywords) + 1))
+        keyword_hits = {}
+        if profile is not None:
+            profile.add_stage("keyword_match", clock() - started, len(live_rows))
+        started = clock()
+
+        def keyword_mask(keyword_id: int) -> np.ndarray:
+            """Returns a mask of the distinct descriptions that contain a search term."""
+            if keyword_id not in keyword_hits:
+                hits = np.zeros(len(unique_descriptions), dtype=bool)
+                hits[text_ids[bounds[keyword_id]:bounds[keyword_id + 1]]] = True
+                keyword_hits[keyword_id] = hits
+            return keyword_hits[keyword_id]
+
+        # Remaining rows sorted by date segment, so the rows inside a date window form one slice
+        sorted_rows = live_rows[np.argsort(date_segments[live_rows], kind="stable")]
+        if self.order is None:
+            self._apply_rules(range(len(rules)), sorted_rows, unassigned, result, date_segments, amount_segments, description_ids, keyword_mask, profile)
+        else:
+            # Rows whose description contains several search terms could match rules the adaptive order swapped
+            ambiguous = np.bincount(text_ids, minlength=len(unique_descriptions))[description_ids[sorted_rows]] > 1
+            deferred = sorted_rows[ambiguous]
+            unassigned[deferred] = False
+            self._apply_rules(self.order, sorted_rows[~ambiguous], unassigned, result, date_segments, amount_segments, description_ids, keyword_mask, profile)
+            if len(deferred):
+                unassigned[deferred] = True
+                self._apply_rules(range(len(rules)), deferred, unassigned, result, date_segments, amount_segments, description_ids, keyword_mask, profile)
+
+        if profile is not None:
+            profile.add_stage("rule_eval", clock() - started, len(live_rows))
+
+        # The first row of every new key stands for all rows with that key
+        if memo is not None:
+            new_key_ids, first_rows = np.unique(key_ids, return_index=True)
+            memo.store([keys[key_id] for key_id in new_key_ids.tolist()], result[live_rows[first_rows]])
+        if logger.isEnabledFor(logging.DEBUG):  # Counting the matches costs a pass over the chunk
+            logger.debug("Categorized %s transactions, %s matched.", len(transactions), int((result != UNCATEGORIZED).sum()), extra={"sample": 10})
+        return result
+
+    def _apply_rules(self, order, sorted_rows: np.ndarray, unassigned: np.ndarray, result: np.ndarray, date_segments: np.ndarray, amount_segments: np.ndarray, description_ids: np.ndarray, keyword_mask, profile: RunProfile | None) -> None:
+        """Applies the rules in the given order to the unassigned rows among `sorted_rows` (sorted by date segment)."""
+        rules = self.rule_set
+        clock = time.perf_counter
+        sorted_segments = date_segments[sorted_rows]
+        remaining = len(sorted_rows)
+
+        # Each rule is only applied to unassigned rows inside its windows
+        for rule in order:
+            rule_started = clock()
+            start = np.searchsorted(sorted_segments, rules.date_index.first_segment[rule], side="left")
+            stop = np.searchsorted(sorted_segments, rules.date_index.last_segment[rule], side="right")
+            candidates = sorted_rows[start:stop]
+            candidates = candidates[unassigned[candidates]]
+            evaluated = len(candidates)
+            candidate_segments = amount_segments[candidates]
+            candidates = candidates[(candidate_segments >= rules.amount_index.first_segment[rule]) & (candidate_segments <= rules.amount_index.last_segment[rule])]
+
+            keyword_id = rules.keyword_ids[rule]
+            if keyword_id >= 0 and len(candidates):
+                candidates = candidates[keyword_mask(keyword_id)[description_ids[candidates]]]
+
+            result[candidates] = rules.category_ids[rule]
+            unassigned[candidates] = False
+            remaining -= len(candidates)
+            self.rule_hits[rule] += len(candidates)
+            self.rules_evaluated += evaluated
+            if profile is not None:
+                profile.record_rule(rule, evaluated, len(candidates), clock() - rule_started)
+            if not remaining:
+                break
+
+    def categorize_labels(self, transactions: Transactions, uncategorized: str = "") -> np.ndarray:
+        """Returns the category label of every transaction."""
+        return self.rule_set.labels(self.categorize(transactions), uncategorized)
@@ -0,0 +1,138 @@
+# system imports
+import os
+import re
+from collections import OrderedDict
+import numpy as np
+
+# local imports
+from .rule_set import RuleSet
+from ..utils import Helper
+from ..utils.logging import logger
+
+# Category id returned for keys the memo does not know
+MISS = -2
+
+# Default number of remembered keys
+DEFAULT_MAX_ENTRIES = 100_000
+
+# Runs of digits (reference numbers, dates) inside a description
+_DIGITS = re.compile(r"\d+")
+
+
+class CategoryMemo:
+    """Persistent LRU memo of resolved categories for recurring transactions.
+
+    A key is the normalized description together with the date and amount segment of the
+    rule set's interval indexes, which is everything the first-match rule evaluation depends
+    on. Descriptions are lower-cased (search terms are case-insensitive) and, as long as no
+    search term contains a digit, every run of digits becomes a single '0', so 'Ref 123' and
+    'Ref 456' share their entry. The memo belongs to one rule-set version and starts over as
+    soon as it is used with another one.
+    """
+    def __init__(self, path: str | None = None, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1.")
+        self.path = path  # JSON file next to the preset, None keeps the memo in memory only
+        self.max_entries = max_entries
+        self.version = None  # Version of the rule set the entries were resolved with
+        self.fold_digits = True
+        self.entries = OrderedDict()  # (description, date segment, amount segment) -> category id, least recently used first
+        self.hits = 0
+        self.misses = 0
+        self.changed = False
+        if path and os.path.exists(path):
+            self._load()
+
+    def __str__(self) -> str:
+        """Returns a string representation of the CategoryMemo instance."""
+        return f"CategoryMemo: \n  -> path= {self.path},\n  -> entries= {len(self.entries)},\n  -> max_entries= {self.max_entries},\n  -> hits= {self.hits},\n  -> misses= {self.misses}"
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _load(self) -> None:
+        """Reads the entries of an earlier run, an unreadable file is ignored."""
+        try:
+            data = Helper.load_file(self.path)
+            self.version = data["version"]
+            self.fold_digits = data["fold_digits"]
+            entries = data["entries"][-self.max_entries:]
+            self.entries = OrderedDict(((text, date_segment, amount_segment), category_id) for text, date_segment, amount_segment, category_id in entries)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("Ignoring unreadable category memo '%s': %s", self.path, e)
+            self.version, self.entries = None, OrderedDict()
+
+    def bind(self, rule_set: RuleSet) -> None:
+        """Prepares the memo for a rule set, the entries of another rule-set version are dropped."""
+        if rule_set.version == self.version:
+            return
+        if self.entries:
+            logger.info("Rules changed, starting the category memo over.")
+        self.entries.clear()
+        self.version = rule_set.version
+        self.fold_digits = not any(_DIGITS.search(keyword) for keyword in rule_set.keywords)
+        self.changed = True
+
+    def keys(self, descriptions: list[str], date_segments: np.ndarray, amount_segments: np.ndarray) -> tuple[list[tuple], np.ndarray, list[str], np.ndarray]:
+        """Returns the distinct keys of the rows, the key index of every row, the distinct
+        normalized descriptions and the description index of every row."""
+        fold = self.fold_digits
+        text_index = {}  # Normalized description -> index
+        raw_index = {}  # Original description -> index of its normalized description
+        text_ids = np.empty(len(descriptions), dtype=np.int64)
+        for row, raw in enumerate(descriptions):
+            text_id = raw_index.get(raw)
+            if text_id is None:
+                text = _DIGITS.sub("0", raw.lower()) if fold else raw.lower()
+                text_id = raw_index[raw] = text_index.setdefault(text, len(text_index))
+            text_ids[row] = text_id
+
+        # One integer code per (description, date segment, amount segment), segments are small non-negative ints
+        date_count = int(date_segments.max()) + 1 if len(date_segments) else 1
+        amount_count = int(amount_segments.max()) + 1 if len(amount_segments) else 1
+        codes = (text_ids * date_count + date_segments) * amount_count + amount_segments
+        unique_codes, key_ids = np.unique(codes, return_inverse=True)
+        texts = list(text_index)
+        keys = [(texts[code // (date_count * amount_count)], code // amount_count % date_count, code % amount_count) for code in unique_codes.tolist()]
+        return keys, key_ids.reshape(-1), texts, text_ids
+
+    def lookup(self, keys: list[tuple]) -> np.ndarray:
+        """Returns the category id of every key, MISS for unknown keys."""
+        entries = self.entries
+        category_ids = np.full(len(keys), MISS, dtype=np.int32)
+        for index, key in enumerate(keys):
+            category_id = entries.get(key)
+            if category_id is not None:
+                category_ids[index] = category_id
+                entries.move_to_end(key)
+        found = int((category_ids != MISS).sum())
+        self.hits += found
+        self.misses += len(keys) - found
+        return category_ids
+
+    def store(self, keys: list[tuple], category_ids: np.ndarray) -> None:
+        """Remembers the resolved category ids, the least recently used keys are evicted."""
+        entries = self.entries
+        for key, category_id in zip(keys, category_ids.tolist()):
+            entries[key] = category_id
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+        self.changed = self.changed or bool(keys)
+
+    def save(self) -> None:
+        """Writes the memo next to the preset (only if it changed)."""
+        if not self.path or not self.changed:
+            return
+        entries = [[text, date_segment, amount_segment, category_id] for (text, date_segment, amount_segment), category_id in self.entries.items()]
+        Helper.save_file(self.path, {"version": self.version, "fold_digits": self.fold_digits, "entries": entries})
+        self.changed = False
+
+    def invalidate(self) -> None:
+        """Forgets all entries and removes the memo file (e.g. after the rules were edited)."""
+        self.entries.clear()
+        self.version = None
+        self.changed = False
+        if self.path:
+            Helper.discard_file(self.path)
+            if os.path.exists(self.path):
+                os.remove(self.path)
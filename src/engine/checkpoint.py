@@ -0,0 +1,77 @@
+# system imports
+import os
+import hashlib
+
+# local imports
+from ..utils import Helper
+from ..utils.logging import logger
+
+
+def _hash_bytes(data: bytes) -> str:
+    """Returns a short content hash."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class Checkpoint:
+    """Position up to which an input file has been categorized into an output file.
+
+    Besides the byte offset it keeps hashes of the header and of the last processed rows. A new
+    export only continues the checkpoint if both are unchanged, i.e. rows were appended.
+    """
+    def __init__(self, input_path: str, offset: int, row_count: int, header_length: int, header_hash: str, tail_offset: int, tail_hash: str) -> None:
+        self.input_path = os.path.abspath(input_path)
+        self.offset = offset  # Byte offset right after the last processed row
+        self.row_count = row_count  # Rows in the output so far
+        self.header_length = header_length
+        self.header_hash = header_hash
+        self.tail_offset = tail_offset  # Start of the last processed rows
+        self.tail_hash = tail_hash  # Hash of the bytes between tail_offset and offset
+
+    def __str__(self) -> str:
+        """Returns a string representation of the Checkpoint instance."""
+        return f"Checkpoint: \n  -> input_path= {self.input_path},\n  -> offset= {self.offset},\n  -> row_count= {self.row_count}"
+
+    @staticmethod
+    def path_for(output_path: str) -> str:
+        """Returns the checkpoint file that belongs to an output file."""
+        return f"{output_path}.checkpoint.json"
+
+    @classmethod
+    def create(cls, input_path: str, header_bytes: bytes, offset: int, tail_offset: int, row_count: int) -> "Checkpoint":
+        """Creates a checkpoint for the processed part of an input file."""
+        with open(input_path, "rb") as f:
+            f.seek(tail_offset)
+            tail = f.read(offset - tail_offset)
+        return cls(input_path, offset, row_count, len(header_bytes), _hash_bytes(header_bytes), tail_offset, _hash_bytes(tail))
+
+    @classmethod
+    def load(cls, output_path: str, input_path: str) -> "Checkpoint | None":
+        """Loads the checkpoint of an output file if it was created for the same input file."""
+        path = cls.path_for(output_path)
+        if not os.path.exists(path) or not os.path.exists(output_path):
+            return None
+        try:
+            data = Helper.load_file(path)
+            checkpoint = cls(**data)
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning("Ignoring unreadable checkpoint '%s': %s", path, e)
+            return None
+        if checkpoint.input_path != os.path.abspath(input_path):
+            return None
+        return checkpoint
+
+    def save(self, output_path: str) -> None:
+        """Writes the checkpoint next to the output file."""
+        path = self.path_for(output_path)
+        Helper.save_file(path, self.__dict__)
+        Helper.flush_file(path)
+
+    def matches(self, input_path: str) -> bool:
+        """Checks whether the input file still starts with the processed rows (appended, not rewritten)."""
+        if os.path.getsize(input_path) < self.offset:
+            return False
+        with open(input_path, "rb") as f:
+            header = f.read(self.header_length)
+            f.seek(self.tail_offset)
+            tail = f.read(self.offset - self.tail_offset)
+        return _hash_bytes(header) == self.header_hash and _hash_bytes(tail) == self.tail_hash
@@ -0,0 +1,249 @@
+# system imports
+import os
+import json
+import time
+import shutil
+import hashlib
+from collections import deque
+import numpy as np
+
+# local imports
+from .bank_formats import BankFormat
+from .csv_stream import CsvChunk, TAIL_ROWS
+from .german_parser import ParseReport
+from .transactions import Transactions
+from ..utils.logging import logger
+
+# Bump whenever the layout of the cache files changes
+CACHE_VERSION = 3
+
+# Bytes hashed at the start and at the end of the source file to detect rewrites
+SAMPLE_BYTES = 1024 * 1024
+
+# Day number stored for dates that could not be parsed
+MISSING_DAY = np.iinfo(np.int32).min
+
+# Column files of the cache: name -> dtype
+COLUMNS = {
+    "dates": np.int32,  # Days since 1970-01-01, MISSING_DAY if unknown
+    "amounts": np.int64,  # Signed amounts in cents
+    "desc_offsets": np.int64,  # Start of every description in desc_bytes, plus the end of the last one
+    "desc_bytes": np.uint8,  # UTF-8 encoded descriptions, concatenated
+    "record_starts": np.int64,  # Byte offset where each row starts in the source file
+    "record_ends": np.int64,  # Byte offset right after each row in the source file
+}
+
+
+def _fingerprint(path: str) -> dict:
+    """Returns size, modification time and a hash of the first and last MiB of a file."""
+    stat = os.stat(path)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        digest.update(f.read(SAMPLE_BYTES))
+        if stat.st_size > SAMPLE_BYTES:
+            f.seek(max(SAMPLE_BYTES, stat.st_size - SAMPLE_BYTES))
+            digest.update(f.read(SAMPLE_BYTES))
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": digest.hexdigest()}
+
+
+class ColumnarCache:
+    """Binary sidecar directory (`<input>.colcache`) with the parsed columns of one input file.
+
+    Every column is a raw little-endian array file that later runs memory-map instead of parsing
+    the CSV text again. The cache is only used while size, mtime and sample hash of the source
+    are unchanged.
+    """
+    def __init__(self, input_path: str, cache_dir: str | None = None) -> None:
+        self.input_path = input_path
+        self.path = cache_dir or f"{input_path}.colcache"
+
+    def __str__(self) -> str:
+        """Returns a string representation of the ColumnarCache instance."""
+        return f"ColumnarCache: \n  -> input_path= {self.input_path},\n  -> path= {self.path}"
+
+    def _load_meta(self) -> dict | None:
+        """Returns the metadata of the cache, None if there is no readable cache."""
+        try:
+            with open(os.path.join(self.path, "meta.json"), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_valid(self, bank_format: BankFormat | None = None) -> bool:
+        """Checks whether the cache exists and was built from the current content of the source (with the same bank format)."""
+        meta = self._load_meta()
+        if meta is None or meta.get("version") != CACHE_VERSION:
+            return False
+        if bank_format is not None and meta.get("bank_format") != bank_format.to_dict():
+            return False
+        try:
+            return meta.get("source") == _fingerprint(self.input_path)
+        except OSError:
+            return False
+
+    def invalidate(self) -> None:
+        """Removes the cache directory."""
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def builder(self, bank_format: BankFormat) -> "ColumnarCacheBuilder":
+        """Returns a builder that fills the cache from the chunks of a full CSV read."""
+        return ColumnarCacheBuilder(self, bank_format)
+
+    def reader(self, chunk_size: int = 50_000, profile=None) -> "ColumnarCacheReader":
+        """Returns a reader that yields the cached rows in chunks, like CsvStreamReader."""
+        meta = self._load_meta()
+        if meta is None:
+            msg = f"No columnar cache found at '{self.path}'"
+            logger.error(msg)
+            raise FileNotFoundError(msg)
+        return ColumnarCacheReader(self, meta, chunk_size, profile)
+
+
+class ColumnarCacheBuilder:
+    """Appends parsed chunks to a temporary cache directory that replaces the old cache on commit."""
+    def __init__(self, cache: ColumnarCache, bank_format: BankFormat) -> None:
+        self.cache = cache
+        self.bank_format = bank_format
+        self.fingerprint = _fingerprint(cache.input_path)  # Taken before reading, a later change invalidates the cache
+        self.tmp_path = f"{cache.path}.tmp"
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+        os.makedirs(self.tmp_path)
+        self.files = {name: open(os.path.join(self.tmp_path, f"{name}.bin"), "wb") for name in COLUMNS}
+        self.row_count = 0
+        self.desc_size = 0  # Bytes written to desc_bytes so far
+
+    def __str__(self) -> str:
+        """Returns a string representation of the ColumnarCacheBuilder instance."""
+        return f"ColumnarCacheBuilder: \n  -> path= {self.tmp_path},\n  -> rows= {self.row_count}"
+
+    def add(self, chunk: CsvChunk) -> None:
+        """Writes the columns of one chunk."""
+        transactions = chunk.transactions
+        nat = np.isnat(transactions.dates)
+        days = np.where(nat, MISSING_DAY, transactions.dates.astype(np.int64)).astype(np.int32)
+        encoded = [description.encode("utf-8") for description in transactions.descriptions]
+        lengths = np.fromiter((len(text) for text in encoded), dtype=np.int64, count=len(encoded))
+        offsets = self.desc_size + np.concatenate(([0], np.cumsum(lengths)[:-1])) if len(encoded) else lengths
+
+        days.tofile(self.files["dates"])
+        transactions.amounts.astype(np.int64).tofile(self.files["amounts"])
+        offsets.astype(np.int64).tofile(self.files["desc_offsets"])
+        self.files["desc_bytes"].write(b"".join(encoded))
+        np.asarray(chunk.record_starts, dtype=np.int64).tofile(self.files["record_starts"])
+        np.asarray(chunk.record_ends, dtype=np.int64).tofile(self.files["record_ends"])
+        self.desc_size += int(lengths.sum())
+        self.row_count += len(transactions)
+
+    def commit(self, header: list[str], header_bytes: bytes, end_offset: int, parse_report: ParseReport | None = None) -> None:
+        """Finishes the column files and atomically replaces the old cache with the new one."""
+        np.array([self.desc_size], dtype=np.int64).tofile(self.files["desc_offsets"])
+        self._close()
+        meta = {
+            "version": CACHE_VERSION,
+            "source": self.fingerprint,
+            "rows": self.row_count,
+            "header": header,
+            "header_bytes": header_bytes.hex(),
+            "end_offset": end_offset,
+            "bank_format": self.bank_format.to_dict(),
+            "parse_report": parse_report.to_dict() if parse_report is not None else None,
+        }
+        with open(os.path.join(self.tmp_path, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=4)
+
+        # Swap the complete directory in, so a reader never sees a half written cache
+        old_path = f"{self.cache.path}.old"
+        shutil.rmtree(old_path, ignore_errors=True)
+        if os.path.exists(self.cache.path):
+            os.replace(self.cache.path, old_path)
+        os.replace(self.tmp_path, self.cache.path)
+        shutil.rmtree(old_path, ignore_errors=True)
+        logger.info("Columnar cache with %s rows written to '%s'.", self.row_count, self.cache.path)
+
+    def abort(self) -> None:
+        """Discards the partially built cache."""
+        self._close()
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+
+    def _close(self) -> None:
+        """Closes all column files."""
+        for f in self.files.values():
+            if not f.closed:
+                f.close()
+
+
+class ColumnarCacheReader:
+    """Yields CsvChunks from the memory-mapped cache columns without parsing the CSV text.
+
+    Offers the same attributes as CsvStreamReader (header, header_bytes, total_bytes, bytes_read),
+    so the pipeline can use either of them.
+    """
+    def __init__(self, cache: ColumnarCache, meta: dict, chunk_size: int = 50_000, profile=None) -> None:
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1.")
+        self.cache = cache
+        self.path = cache.input_path
+        self.chunk_size = chunk_size
+        self.rows = meta["rows"]
+        self.header = meta["header"]
+        self.header_bytes = bytes.fromhex(meta["header_bytes"])
+        self.end_offset = meta["end_offset"]
+        self.bank_format = BankFormat(**meta["bank_format"])
+        self.delimiter = self.bank_format.delimiter
+        self.encoding = self.bank_format.encoding
+        self.total_bytes = meta["source"]["size"]
+        self.bytes_read = 0
+        self.profile = profile  # Optional RunProfile for the 'read' stage
+        self.parse_report = ParseReport(**meta["parse_report"]) if meta.get("parse_report") else ParseReport()  # From the run that built the cache
+
+    def __str__(self) -> str:
+        """Returns a string representation of the ColumnarCacheReader instance."""
+        return f"ColumnarCacheReader: \n  -> path= {self.cache.path},\n  -> rows= {self.rows},\n  -> chunk_size= {self.chunk_size}"
+
+    def _column(self, name: str) -> np.ndarray:
+        """Memory-maps one column file (empty files cannot be mapped)."""
+        path = os.path.join(self.cache.path, f"{name}.bin")
+        if os.path.getsize(path) == 0:
+            return np.zeros(0, dtype=COLUMNS[name])
+        return np.memmap(path, dtype=COLUMNS[name], mode="r")
+
+    def __iter__(self):
+        """Yields CsvChunks with the cached columns and the raw source text of every row."""
+        if not self.rows:
+            self.bytes_read = self.end_offset
+            return
+        columns = {name: self._column(name) for name in COLUMNS}
+        dates, amounts = columns["dates"], columns["amounts"]
+        desc_offsets, desc_bytes = columns["desc_offsets"], columns["desc_bytes"]
+        starts, ends = columns["record_starts"], columns["record_ends"]
+
+        tail = deque(maxlen=TAIL_ROWS)
+        with open(self.path, "rb") as f:
+            for first in range(0, self.rows, self.chunk_size):
+                started = time.perf_counter()
+                last = min(first + self.chunk_size, self.rows)
+
+                days = np.asarray(dates[first:last])
+                chunk_dates = days.astype(np.int64).astype("datetime64[D]")
+                chunk_dates[days == MISSING_DAY] = np.datetime64("NaT")
+
+                desc_start, desc_end = int(desc_offsets[first]), int(desc_offsets[last])
+                buffer = desc_bytes[desc_start:desc_end].tobytes()
+                bounds = (desc_offsets[first:last + 1] - desc_start).tolist()
+                descriptions = [buffer[bounds[i]:bounds[i + 1]].decode("utf-8") for i in range(last - first)]
+
+                # The source rows are copied to the output unchanged, so read their raw text
+                record_starts = starts[first:last].tolist()
+                record_ends = ends[first:last].tolist()
+                f.seek(record_starts[0])
+                source = f.read(record_ends[-1] - record_starts[0])
+                base = record_starts[0]
+                records = [source[start - base:end - base].decode(self.encoding, errors="replace") for start, end in zip(record_starts, record_ends)]
+
+                tail.extend(record_starts[-TAIL_ROWS:])
+                end_offset = self.end_offset if last == self.rows else record_ends[-1]
+                self.bytes_read = end_offset
+                if self.profile is not None:
+                    self.profile.add_stage("read", time.perf_counter() - started, last - first)
+                transactions = Transactions(chunk_dates, np.array(amounts[first:last]), descriptions)
+                yield CsvChunk(transactions, end_offset, tail[0], records, record_starts, record_ends)
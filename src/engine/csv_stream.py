@@ -0,0 +1,206 @@
+# system imports
+import os
+import csv
+import time
+from collections import deque
+import numpy as np
+
+# local imports
+from .bank_formats import BankFormat
+from .german_parser import GermanParser
+from .transactions import Transactions
+
+# Name of the column that is appended to the output file
+CATEGORY_COLUMN = "Kategorie"
+
+# Number of most recent rows whose bytes identify the end of a processed file
+TAIL_ROWS = 16
+
+
+class CsvChunk:
+    """A fixed-size block of raw CSV rows together with their parsed transaction columns."""
+    def __init__(self, transactions: Transactions, end_offset: int = 0, tail_offset: int = 0, records: list[str] | None = None, record_starts: list[int] | None = None, record_ends: list[int] | None = None) -> None:
+        self.transactions = transactions
+        self.end_offset = end_offset  # Byte offset right after the last row of the chunk
+        self.tail_offset = tail_offset  # Byte offset of the first of the last TAIL_ROWS rows read so far
+        self.records = records  # Decoded source text of every row, written unchanged to the output
+        self.record_starts = record_starts  # Byte offset where each row starts in the source file
+        self.record_ends = record_ends  # Byte offset right after each row in the source file
+
+    def __len__(self) -> int:
+        return len(self.transactions)
+
+    def select(self, mask: np.ndarray) -> "CsvChunk":
+        """Returns a chunk with only the rows where the mask is True (the offsets still cover the whole chunk)."""
+        def pick(values):
+            return None if values is None else [value for value, keep in zip(values, mask) if keep]
+        transactions = Transactions(self.transactions.dates[mask], self.transactions.amounts[mask], self.transactions.descriptions[mask])
+        return CsvChunk(transactions, self.end_offset, self.tail_offset, pick(self.records), pick(self.record_starts), pick(self.record_ends))
+
+
+class CsvStreamReader:
+    """Reads a bank export in chunks of at most `chunk_size` rows.
+
+    The file is split into records on the byte level (respecting quoted line breaks), so the
+    exact byte offset of every chunk is known and a later run can resume at `start_offset`.
+    Only the date, amount and description column of the bank format are split out of a row.
+    """
+    def __init__(self, path: str, chunk_size: int = 50_000, delimiter: str = ";", encoding: str = "utf-8-sig", start_offset: int = 0, profile=None, bank_format: BankFormat | None = None) -> None:
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1.")
+        self.path = path
+        self.chunk_size = chunk_size
+        self.bank_format = bank_format or BankFormat("Generisch", delimiter, encoding)
+        self.delimiter = self.bank_format.delimiter
+        self.encoding = self.bank_format.encoding
+        self.start_offset = start_offset  # Resume position, 0 reads all rows after the header
+        self.header = []
+        self.header_bytes = b""  # Raw bytes up to the end of the header, used to recognize the file again
+        self.total_bytes = 0  # Size of the input file
+        self.bytes_read = 0  # Bytes consumed so far, for progress reporting
+        self.profile = profile  # Optional RunProfile for the 'read' and 'parse' stages
+        self.parser = GermanParser()  # Keeps its date memo table across chunks
+        self.rows_read = 0
+
+    @property
+    def parse_report(self):
+        """Malformed dates and amounts found so far."""
+        return self.parser.report
+
+    def __str__(self) -> str:
+        """Returns a string representation of the CsvStreamReader instance."""
+        return f"CsvStreamReader: \n  -> path= {self.path},\n  -> chunk_size= {self.chunk_size},\n  -> start_offset= {self.start_offset}"
+
+    @staticmethod
+    def _records(f, offset: int):
+        """Yields (start offset, end offset, raw bytes) of every record, joining quoted line breaks."""
+        pending = b""
+        start = offset
+        for line in f:
+            offset += len(line)
+            pending += line
+            if pending.count(b'"') % 2:
+                continue  # Line break inside a quoted field
+            yield start, offset, pending
+            start = offset
+            pending = b""
+        if pending:
+            yield start, offset, pending
+
+    def _decode(self, records: list[bytes]) -> list[str]:
+        """Decodes raw records into text."""
+        return [record.decode(self.encoding, errors="replace") for record in records]
+
+    def _parse(self, texts: list[str]) -> list[list[str]]:
+        """Splits decoded records into rows of fields."""
+        return list(csv.reader(texts, delimiter=self.delimiter))
+
+    def _project(self, texts: list[str], indexes: tuple) -> list[list[str]]:
+        """Returns the fields at the given indexes of every record, without splitting the columns behind them.
+
+        Records without quotes are split with str.split, only quoted ones go through the csv module.
+        """
+        width = max(indexes) + 1
+        delimiter = self.delimiter
+        rows = [None if '"' in text else text.rstrip("\r\n").split(delimiter, width) for text in texts]
+        quoted = [i for i, row in enumerate(rows) if row is None]
+        for i, row in zip(quoted, csv.reader([texts[i] for i in quoted], delimiter=delimiter)):
+            rows[i] = row
+        return [[row[index] if index < len(row) else "" for row in rows] for index in indexes]
+
+    def __iter__(self):
+        """Yields CsvChunks until the file is exhausted. The header is available after the first chunk."""
+        self.total_bytes = os.path.getsize(self.path)
+        with open(self.path, "rb") as f:
+            records = self._records(f, 0)
+            # Lines before the header (account details of some banks) are skipped
+            header_end, header_record = 0, b""
+            for _ in range(self.bank_format.header_row + 1):
+                _, header_end, header_record = next(records, (0, header_end, b""))
+            f.seek(0)
+            self.header_bytes = f.read(header_end)
+            f.seek(header_end)
+            records = self._records(f, header_end)
+            self.header = self._parse(self._decode([header_record]))[0] if header_record.strip() else []
+            indexes = self.bank_format.column_indexes(self.header)
+
+            # Jump straight to the resume position
+            if self.start_offset > header_end:
+                f.seek(self.start_offset)
+                records = self._records(f, self.start_offset)
+
+            tail = deque(maxlen=TAIL_ROWS)  # Start offsets of the most recent rows
+            while True:
+                started = time.perf_counter()
+                chunk_records = []
+                chunk_starts = []
+                chunk_ends = []
+                end_offset = self.bytes_read
+                for start, end_offset, record in records:
+                    if not record.strip():
+                        continue  # Skip blank lines
+                    tail.append(start)
+                    chunk_records.append(record)
+                    chunk_starts.append(start)
+                    chunk_ends.append(end_offset)
+                    if len(chunk_records) == self.chunk_size:
+                        break
+                if not chunk_records:
+                    break
+                read_done = time.perf_counter()
+
+                chunk_texts = self._decode(chunk_records)
+                dates, amounts, descriptions = self._project(chunk_texts, indexes)
+                first_row = self.rows_read + 1  # Data rows are numbered from 1 in the parse report
+                transactions = Transactions(
+                    self.parser.parse_dates(dates, first_row),
+                    self.parser.parse_amounts(amounts, first_row),
+                    descriptions,
+                )
+                self.rows_read += len(chunk_texts)
+                self.bytes_read = end_offset
+                if self.profile is not None:
+                    self.profile.add_stage("read", read_done - started, len(chunk_records))
+                    self.profile.add_stage("parse", time.perf_counter() - read_done, len(chunk_records))
+                yield CsvChunk(transactions, end_offset, tail[0], chunk_texts, chunk_starts, chunk_ends)
+
+
+class CsvStreamWriter:
+    """Appends categorized rows to a delimited output file (semicolons unless the input uses another delimiter)."""
+    def __init__(self, path: str, delimiter: str = ";", encoding: str = "utf-8", append: bool = False) -> None:
+        self.path = path
+        self.delimiter = delimiter
+        self.encoding = encoding
+        self.append = append  # Continue an existing output instead of replacing it
+        self.file = None
+        self.writer = None
+
+    def __enter__(self) -> "CsvStreamWriter":
+        self.file = open(self.path, "a" if self.append else "w", encoding=self.encoding, newline="")
+        self.writer = csv.writer(self.file, delimiter=self.delimiter)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.file.close()
+
+    def write_header(self, header: list[str]) -> None:
+        """Writes the input header extended by the category column."""
+        self.writer.writerow(list(header) + [CATEGORY_COLUMN])
+
+    def write_chunk(self, rows: list[list[str]], labels) -> None:
+        """Writes one chunk of rows with their category labels and flushes it to disk."""
+        self.writer.writerows(row + [label] for row, label in zip(rows, labels))
+        self.file.flush()
+
+    def write_records(self, records: list[str], labels) -> None:
+        """Writes the unchanged source text of each row plus its category label and flushes it to disk.
+
+        Skips re-serializing the fields, so the output keeps the exact formatting of the input.
+        """
+        quoted = {}
+        for label in set(labels):
+            needs_quotes = any(char in label for char in (self.delimiter, '"', "\n", "\r"))
+            quoted[label] = '"' + label.replace('"', '""') + '"' if needs_quotes else label
+        line_end = "\r\n"
+        self.file.write("".join(record.rstrip(line_end) + self.delimiter + quoted[label] + line_end for record, label in zip(records, labels)))
+        self.file.flush()
@@ -0,0 +1,390 @@
+# system imports
+import os
+import json
+import hashlib
+import numpy as np
+
+# local imports
+from .bank_formats import BankFormat
+from .csv_stream import CsvStreamReader
+from .transactions import Transactions
+from ..utils import Helper
+from ..utils.logging import logger
+
+# Bump whenever the fingerprint function or the file layout changes
+STORE_VERSION = 1
+
+# Fingerprints read per block while merging the log into the sorted file
+MERGE_BLOCK = 1_000_000
+
+# Distinct normalized descriptions whose hash is remembered
+MAX_MEMO_SIZE = 200_000
+
+# Odd constants that separate the fields of a fingerprint
+_DATE_SALT = np.uint64(0x9E3779B97F4A7C15)
+_AMOUNT_SALT = np.uint64(0xC2B2AE3D27D4EB4F)
+_OCCURRENCE_SALT = np.uint64(0x165667B19E3779F9)
+
+
+def _mix(values: np.ndarray) -> np.ndarray:
+    """Scrambles uint64 values (splitmix64 finalizer), overflow wraps around as intended."""
+    values = np.asarray(values, dtype=np.uint64)
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def _hash_text(text: str) -> int:
+    """Returns a 64 bit hash of a text."""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def normalize_description(text: str) -> str:
+    """Lower-cases a description and collapses its whitespace, so re-exported texts compare equal."""
+    return " ".join(str(text).lower().split())
+
+
+class BloomFilter:
+    """Bit array on disk that rules out most fingerprints before the sorted store is searched."""
+    def __init__(self, path: str, bits: int, hashes: int) -> None:
+        self.path = path
+        self.bits = bits
+        self.hashes = hashes
+        if not os.path.exists(path) or os.path.getsize(path) != bits // 8:
+            np.zeros(bits // 8, dtype=np.uint8).tofile(path)
+        self.array = np.memmap(path, dtype=np.uint8, mode="r+")
+
+    def __str__(self) -> str:
+        """Returns a string representation of the BloomFilter instance."""
+        return f"BloomFilter: \n  -> bits= {self.bits},\n  -> hashes= {self.hashes}"
+
+    @staticmethod
+    def dimensions(capacity: int, false_positive_rate: float) -> tuple[int, int]:
+        """Returns (bits, hashes) for the capacity at the desired false positive rate."""
+        bits = int(-capacity * np.log(false_positive_rate) / np.log(2) ** 2)
+        bits = max(64, (bits + 63) // 64 * 64)
+        hashes = max(1, round(bits / capacity * np.log(2)))
+        return bits, hashes
+
+    def _positions(self, fingerprints: np.ndarray) -> np.ndarray:
+        """Returns the bit positions of every fingerprint (double hashing), shape (hashes, n)."""
+        first = fingerprints % np.uint64(self.bits)
+        step = (_mix(fingerprints) | np.uint64(1)) % np.uint64(self.bits)
+        rounds = np.arange(self.hashes, dtype=np.uint64)[:, None]
+        return (first + rounds * step) % np.uint64(self.bits)
+
+    def add(self, fingerprints: np.ndarray) -> None:
+        """Sets the bits of the fingerprints."""
+        positions = self._positions(fingerprints).ravel()
+        np.bitwise_or.at(self.array, (positions >> np.uint64(3)).astype(np.int64), (np.uint8(1) << (positions & np.uint64(7)).astype(np.uint8)))
+
+    def might_contain(self, fingerprints: np.ndarray) -> np.ndarray:
+        """Returns False for fingerprints that are certainly not in the set."""
+        positions = self._positions(fingerprints)
+        bytes_ = self.array[(positions >> np.uint64(3)).astype(np.int64)]
+        return ((bytes_ >> (positions & np.uint64(7)).astype(np.uint8)) & 1).astype(bool).all(axis=0)
+
+    def flush(self) -> None:
+        """Writes the changed bits to disk."""
+        self.array.flush()
+
+
+class FingerprintStore:
+    """Persistent set of transaction fingerprints, each with the id of the export it came from.
+
+    The bulk lives in a sorted file that is memory-mapped and binary searched, so tens of millions
+    of fingerprints never have to be loaded. New fingerprints go to an append-only log that is
+    merged into the sorted file once it grows beyond `compact_threshold`.
+    """
+    def __init__(self, path: str, bloom: bool = True, capacity: int = 10_000_000, false_positive_rate: float = 0.01, compact_threshold: int = 1_000_000) -> None:
+        self.path = path
+        self.compact_threshold = compact_threshold
+        self.false_positive_rate = false_positive_rate
+        os.makedirs(path, exist_ok=True)
+
+        self.meta_path = os.path.join(path, "meta.json")
+        self.meta = Helper.load_file(self.meta_path) if os.path.exists(self.meta_path) else {}
+        if self.meta.get("version") != STORE_VERSION:
+            if self.meta:
+                logger.warning("Fingerprint store '%s' has an outdated format, starting over.", path)
+            for name in ("fingerprints.u64", "sources.u32", "log.u64", "log_sources.u32", "bloom.bin"):
+                if os.path.exists(os.path.join(path, name)):
+                    os.remove(os.path.join(path, name))
+            self.meta = {"version": STORE_VERSION, "sources": {}, "capacity": capacity}
+
+        self._open_sorted()
+        log = self._read(os.path.join(path, "log.u64"), np.uint64)
+        log_sources = self._read(os.path.join(path, "log_sources.u32"), np.uint32)
+        log, log_sources = log[:len(log_sources)], log_sources[:len(log)]  # Drops a half written append
+        order = np.argsort(log, kind="stable")
+        self.log, self.log_sources = log[order], log_sources[order]  # Small, kept sorted in memory
+
+        # A filter that missed fingerprints would hide duplicates, so it is dropped when unused and refilled when new
+        self.bloom = None
+        bloom_path = os.path.join(path, "bloom.bin")
+        if bloom:
+            bits, hashes = BloomFilter.dimensions(self.meta["capacity"], false_positive_rate)
+            fresh = not os.path.exists(bloom_path) or os.path.getsize(bloom_path) != bits // 8
+            self.bloom = BloomFilter(bloom_path, bits, hashes)
+            if fresh:
+                self._fill_bloom()
+        elif os.path.exists(bloom_path):
+            os.remove(bloom_path)
+
+    def __str__(self) -> str:
+        """Returns a string representation of the FingerprintStore instance."""
+        return f"FingerprintStore: \n  -> path= {self.path},\n  -> fingerprints= {len(self)},\n  -> sources= {len(self.meta['sources'])}"
+
+    def __len__(self) -> int:
+        return len(self.sorted) + len(self.log)
+
+    @staticmethod
+    def _read(path: str, dtype) -> np.ndarray:
+        """Reads a whole binary array file (empty if missing)."""
+        return np.fromfile(path, dtype=dtype) if os.path.exists(path) else np.zeros(0, dtype=dtype)
+
+    @staticmethod
+    def _map(path: str, dtype) -> np.ndarray:
+        """Memory-maps a binary array file (empty files cannot be mapped)."""
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r")
+
+    def _open_sorted(self) -> None:
+        """Maps the sorted fingerprints and their source ids."""
+        self.sorted = self._map(os.path.join(self.path, "fingerprints.u64"), np.uint64)
+        self.sorted_sources = self._map(os.path.join(self.path, "sources.u32"), np.uint32)
+
+    def _fill_bloom(self) -> None:
+        """Adds all stored fingerprints to a new Bloom filter, block by block."""
+        for start in range(0, len(self.sorted), MERGE_BLOCK):
+            self.bloom.add(np.asarray(self.sorted[start:start + MERGE_BLOCK]))
+        self.bloom.add(self.log)
+
+    @staticmethod
+    def source_key(input_path: str, bank_format: BankFormat | None = None) -> str:
+        """Returns the identity of an export: a hash of its header and first data row.
+
+        Rows appended to the file keep its identity, while a re-download covering another period
+        under the same name is a new source, so its overlap with the old download is detected.
+        """
+        reader = CsvStreamReader(input_path, 1, bank_format=bank_format)
+        first_chunk = next(iter(reader), None)
+        first_row = first_chunk.records[0].rstrip("\r\n") if first_chunk is not None else ""
+        digest = hashlib.blake2b(json.dumps([reader.header, first_row]).encode("utf-8"), digest_size=16).hexdigest()
+        return f"content:{digest}"
+
+    def source_id(self, input_path: str, bank_format: BankFormat | None = None) -> int:
+        """Returns the id of an export file, a file keeps its id across runs and appends."""
+        key = self.source_key(input_path, bank_format)
+        sources = self.meta["sources"]
+        legacy_key = os.path.abspath(input_path)  # Stores written before sources were identified by content
+        if key not in sources and legacy_key in sources:
+            sources[key] = sources.pop(legacy_key)
+            Helper.save_file(self.meta_path, self.meta)
+            Helper.flush_file(self.meta_path)
+        if key not in sources:
+            sources[key] = len(sources)
+            # Stored right away, the log must never contain ids that are unknown after a crash
+            Helper.save_file(self.meta_path, self.meta)
+            Helper.flush_file(self.meta_path)
+        return sources[key]
+
+    @staticmethod
+    def _search(keys: np.ndarray, sources: np.ndarray, fingerprints: np.ndarray) -> np.ndarray:
+        """Returns the source id of every fingerprint found in a sorted array, -1 if absent."""
+        found = np.full(len(fingerprints), -1, dtype=np.int64)
+        if not len(keys) or not len(fingerprints):
+            return found
+        positions = np.searchsorted(keys, fingerprints)
+        inside = positions < len(keys)
+        hit = np.zeros(len(fingerprints), dtype=bool)
+        hit[inside] = keys[positions[inside]] == fingerprints[inside]
+        found[hit] = sources[positions[hit]]
+        return found
+
+    def lookup(self, fingerprints: np.ndarray) -> np.ndarray:
+        """Returns the source id of every fingerprint, -1 for unknown fingerprints."""
+        found = np.full(len(fingerprints), -1, dtype=np.int64)
+        candidates = np.arange(len(fingerprints))
+        if self.bloom is not None and len(candidates):
+            candidates = candidates[self.bloom.might_contain(fingerprints)]
+        if not len(candidates):
+            return found
+
+        # Sorted queries touch the pages of the mapped file in order
+        order = candidates[np.argsort(fingerprints[candidates])]
+        queries = fingerprints[order]
+        result = self._search(self.sorted, self.sorted_sources, queries)
+        missing = result < 0
+        result[missing] = self._search(self.log, self.log_sources, queries[missing])
+        found[order] = result
+        return found
+
+    def add(self, fingerprints: np.ndarray, source: int) -> None:
+        """Appends new fingerprints (not yet in the store) of one export to the log."""
+        fingerprints = np.unique(np.asarray(fingerprints, dtype=np.uint64))
+        if not len(fingerprints):
+            return
+        sources = np.full(len(fingerprints), source, dtype=np.uint32)
+        with open(os.path.join(self.path, "log.u64"), "ab") as f:
+            fingerprints.tofile(f)
+        with open(os.path.join(self.path, "log_sources.u32"), "ab") as f:
+            sources.tofile(f)
+        log = np.concatenate((self.log, fingerprints))
+        order = np.argsort(log, kind="stable")
+        self.log, self.log_sources = log[order], np.concatenate((self.log_sources, sources))[order]
+        if self.bloom is not None:
+            self.bloom.add(fingerprints)
+
+    def flush(self) -> None:
+        """Persists the metadata and the Bloom filter, merges a large log into the sorted file."""
+        if len(self.log) > self.compact_threshold:
+            self.compact()
+        if self.bloom is not None:
+            self.bloom.flush()
+        Helper.save_file(self.meta_path, self.meta)
+        Helper.flush_file(self.meta_path)
+
+    def compact(self) -> None:
+        """Merges the log into the sorted file block by block and replaces the file atomically."""
+        if not len(self.log):
+            return
+        tmp_keys = os.path.join(self.path, "fingerprints.u64.tmp")
+        tmp_sources = os.path.join(self.path, "sources.u32.tmp")
+        log_start = 0
+        with open(tmp_keys, "wb") as keys_file, open(tmp_sources, "wb") as sources_file:
+            for start in range(0, len(self.sorted), MERGE_BLOCK):
+                block = np.asarray(self.sorted[start:start + MERGE_BLOCK])
+                block_sources = np.asarray(self.sorted_sources[start:start + MERGE_BLOCK])
+                last_block = start + MERGE_BLOCK >= len(self.sorted)
+                log_end = len(self.log) if last_block else int(np.searchsorted(self.log, block[-1], side="right"))
+                keys = np.concatenate((block, self.log[log_start:log_end]))
+                sources = np.concatenate((block_sources, self.log_sources[log_start:log_end]))
+                order = np.argsort(keys, kind="stable")
+                keys[order].tofile(keys_file)
+                sources[order].tofile(sources_file)
+                log_start = log_end
+            if log_start < len(self.log):
+                self.log[log_start:].tofile(keys_file)
+                self.log_sources[log_start:].tofile(sources_file)
+
+        # Release the old mapping before the file is replaced
+        self.sorted = self.sorted_sources = None
+        os.replace(tmp_keys, os.path.join(self.path, "fingerprints.u64"))
+        os.replace(tmp_sources, os.path.join(self.path, "sources.u32"))
+        for name in ("log.u64", "log_sources.u32"):
+            os.remove(os.path.join(self.path, name))
+        self.log = np.zeros(0, dtype=np.uint64)
+        self.log_sources = np.zeros(0, dtype=np.uint32)
+        self._open_sorted()
+
+        # A Bloom filter filled beyond its capacity is rebuilt twice as large
+        if self.bloom is not None and len(self) > self.meta["capacity"]:
+            self.meta["capacity"] = 2 * len(self)
+            bits, hashes = BloomFilter.dimensions(self.meta["capacity"], self.false_positive_rate)
+            self.bloom = None
+            os.remove(os.path.join(self.path, "bloom.bin"))
+            self.bloom = BloomFilter(os.path.join(self.path, "bloom.bin"), bits, hashes)
+            self._fill_bloom()
+        logger.info("Compacted fingerprint store '%s' to %s fingerprints.", self.path, len(self))
+
+
+class _OccurrenceCounter:
+    """Counts how often each key was seen before, over all chunks of one file.
+
+    Keeps levels of sorted (key, count) arrays that are merged like a binary counter, so the
+    work per chunk stays logarithmic in the number of chunks.
+    """
+    def __init__(self) -> None:
+        self.levels = []
+
+    def next_occurrences(self, keys: np.ndarray) -> np.ndarray:
+        """Returns for every key how many equal keys came before it (earlier chunks and rows)."""
+        unique, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        seen = np.zeros(len(unique), dtype=np.int64)
+        for level_keys, level_counts in self.levels:
+            seen += FingerprintStore._search(level_keys, level_counts, unique).clip(min=0)
+
+        # Rank of every row among the equal keys of this chunk
+        order = np.argsort(inverse, kind="stable")
+        rank = np.empty(len(keys), dtype=np.int64)
+        rank[order] = np.arange(len(keys)) - np.repeat(np.cumsum(counts) - counts, counts)
+
+        self.levels.append((unique, counts.astype(np.int64)))
+        while len(self.levels) > 1 and len(self.levels[-2][0]) <= 2 * len(self.levels[-1][0]):
+            (keys_a, counts_a), (keys_b, counts_b) = self.levels.pop(), self.levels.pop()
+            merged, merged_inverse = np.unique(np.concatenate((keys_a, keys_b)), return_inverse=True)
+            self.levels.append((merged, np.bincount(merged_inverse, weights=np.concatenate((counts_a, counts_b))).astype(np.int64)))
+        return seen[inverse] + rank
+
+
+class Deduplicator:
+    """Pipeline stage that drops transactions already imported from another export.
+
+    A fingerprint covers date, amount, normalized description, an optional reference and the
+    occurrence number of identical transactions within the file (two equal purchases on one day
+    stay two transactions). Fingerprints of the file itself never count as duplicates, so
+    re-running an export is not affected. The fingerprints of a run are only staged; `commit`
+    stores them once their rows are in the output, `discard` forgets them after a cancel or error.
+    """
+    def __init__(self, store: FingerprintStore) -> None:
+        self.store = store
+        self.description_memo = {}  # Normalized description -> 64 bit hash
+        self.source = None
+        self.counter = None
+        self.staged = []  # New fingerprints of the current run, stored by commit
+        self.duplicates = 0  # Rows dropped in the current run
+
+    def __str__(self) -> str:
+        """Returns a string representation of the Deduplicator instance."""
+        return f"Deduplicator: \n  -> store= {self.store.path},\n  -> duplicates= {self.duplicates}"
+
+    def start(self, input_path: str, bank_format: BankFormat | None = None) -> None:
+        """Prepares a run over one export file."""
+        self.source = self.store.source_id(input_path, bank_format)
+        self.counter = _OccurrenceCounter()
+        self.staged = []
+        self.duplicates = 0
+
+    def _text_hashes(self, texts) -> np.ndarray:
+        """Returns the memoized hashes of the normalized texts."""
+        memo = self.description_memo
+        if len(memo) > MAX_MEMO_SIZE:
+            memo.clear()
+        hashes = np.empty(len(texts), dtype=np.uint64)
+        for i, text in enumerate(texts):
+            value = memo.get(text)
+            if value is None:
+                value = memo[text] = _hash_text(normalize_description(text))
+            hashes[i] = value
+        return hashes
+
+    def fingerprints(self, transactions: Transactions, references=None) -> np.ndarray:
+        """Returns the 64 bit fingerprint of every transaction."""
+        base = _mix(self._text_hashes(transactions.descriptions) ^ _mix(transactions.dates.astype(np.int64).astype(np.uint64) + _DATE_SALT))
+        base = _mix(base ^ _mix(transactions.amounts.astype(np.uint64) + _AMOUNT_SALT))
+        if references is not None:
+            base = _mix(base ^ self._text_hashes(references))
+        occurrences = self.counter.next_occurrences(base)
+        return _mix(base + occurrences.astype(np.uint64) * _OCCURRENCE_SALT)
+
+    def keep_mask(self, transactions: Transactions, references=None) -> np.ndarray:
+        """Returns False for the transactions already imported from another export and stages the new ones."""
+        fingerprints = self.fingerprints(transactions, references)
+        sources = self.store.lookup(fingerprints)
+        duplicate = (sources >= 0) & (sources != self.source)
+        self.staged.append(fingerprints[sources < 0])  # Unique within the file thanks to the occurrence numbers
+        self.duplicates += int(duplicate.sum())
+        return ~duplicate
+
+    def commit(self) -> None:
+        """Stores the staged fingerprints of the run (once their rows were written) and persists the store."""
+        if self.staged:
+            self.store.add(np.concatenate(self.staged), self.source)
+            self.staged = []
+        self.store.flush()
+
+    def discard(self) -> None:
+        """Forgets the staged fingerprints, e.g. after a cancelled or failed run."""
+        self.staged = []
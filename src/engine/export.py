@@ -0,0 +1,382 @@
+# system imports
+import io
+import os
+import re
+import csv
+import glob
+import gzip
+import json
+import struct
+from json.encoder import encode_basestring
+from collections import OrderedDict
+import numpy as np
+
+# local imports
+from .aggregation import period_codes, period_label
+from .columnar_cache import MISSING_DAY
+from .transactions import Transactions, MISSING_AMOUNT
+from ..utils.logging import logger
+
+# Export formats and their file extensions
+EXPORT_FORMATS = {"csv": ".csv", "jsonl": ".jsonl", "columnar": ".col"}
+
+# Compressions and the extension they append
+COMPRESSIONS = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+# Ways to split the export into separate files
+PARTITIONS = ("none", "month", "category")
+
+# Write buffer per open file, and the number of files kept open at once (partitions are reopened for appending)
+BUFFER_SIZE = 1024 * 1024
+MAX_OPEN_FILES = 64
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# Header of the ;-separated export
+CSV_HEADER = ("Datum", "Betrag", "Verwendungszweck", "Kategorie")
+
+# Partition names of rows without a date or category
+UNKNOWN_MONTH = "unbekannt"
+UNCATEGORIZED = "ohne_kategorie"
+
+# Start of every columnar file, followed by blocks of: header length (uint32), JSON block header, column bytes
+COLUMNAR_MAGIC = b"CSVBCOL1"
+_BLOCK_LENGTH = struct.Struct("<I")
+COLUMNAR_COLUMNS = {
+    "dates": "<i4",  # Days since 1970-01-01, MISSING_DAY if unknown
+    "amounts": "<i8",  # Signed amounts in cents, MISSING_AMOUNT if unknown
+    "category_ids": "<i4",  # Index into the block's categories, -1 = uncategorized
+    "desc_offsets": "<i8",  # Start of every description in desc_bytes, plus the end of the last one
+    "desc_bytes": "|u1",  # UTF-8 encoded descriptions, concatenated
+}
+
+# Suffix of the files of a full run until it has finished, the previous export stays intact until then
+PART_SUFFIX = ".part"
+
+# Characters not allowed in partition directory names
+_UNSAFE = re.compile(r"[^\w.\- ]+")
+
+
+def _zstd_module():
+    """Returns the available zstd implementation: compression.zstd (Python 3.14+) or the 'zstandard' package."""
+    try:
+        from compression import zstd
+        return zstd
+    except ImportError:
+        pass
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        msg = "zstd compression needs Python 3.14 or the 'zstandard' package."
+        logger.error(msg)
+        raise ValueError(msg)
+
+
+def _open_stream(path: str, compression: str):
+    """Opens a file for appending through a write buffer and the compression."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if compression == "gzip":
+        return io.BufferedWriter(gzip.GzipFile(path, "ab", compresslevel=GZIP_LEVEL), BUFFER_SIZE)
+    if compression == "zstd":
+        zstd = _zstd_module()
+        if hasattr(zstd, "ZstdFile"):
+            return io.BufferedWriter(zstd.ZstdFile(path, "ab", level=ZSTD_LEVEL), BUFFER_SIZE)
+        return zstd.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(open(path, "ab", buffering=BUFFER_SIZE), closefd=True)
+    return open(path, "ab", buffering=BUFFER_SIZE)
+
+
+def _read_stream(path: str) -> bytes:
+    """Returns the decompressed content of an export file, the compression is taken from its extension."""
+    if path.endswith(COMPRESSIONS["gzip"]):
+        with gzip.open(path, "rb") as f:
+            return f.read()
+    if path.endswith(COMPRESSIONS["zstd"]):
+        zstd = _zstd_module()
+        with open(path, "rb") as f:
+            data = f.read()
+        if hasattr(zstd, "ZstdFile"):
+            return zstd.decompress(data)
+        # Every append run (and every reopened partition file) adds a frame, all of them have to be read
+        with zstd.ZstdDecompressor().stream_reader(io.BytesIO(data), read_across_frames=True) as reader:
+            return reader.read()
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _format_dates(dates: np.ndarray) -> list[str]:
+    """Formats dates as YYYY-MM-DD, '' for NaT."""
+    return ["" if text == "NaT" else text for text in np.datetime_as_string(dates, unit="D").tolist()]
+
+
+def _format_amounts(amounts: np.ndarray) -> list[str]:
+    """Formats cents as decimal text with a point, '' for missing amounts."""
+    # Exact for every amount below 2**53 cents
+    return ["" if cents == MISSING_AMOUNT else f"{cents / 100:.2f}" for cents in amounts.tolist()]
+
+
+def encode_csv(transactions: Transactions, labels: list, header: bool) -> bytes:
+    """Returns ;-separated rows (German date and decimal notation) with an optional header."""
+    dates = [f"{text[8:10]}.{text[5:7]}.{text[:4]}" if text else "" for text in _format_dates(transactions.dates)]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=";")
+    if header:
+        writer.writerow(CSV_HEADER)
+    writer.writerows(zip(dates, [amount.replace(".", ",") for amount in _format_amounts(transactions.amounts)], transactions.descriptions.tolist(), ["" if label is None else label for label in labels]))
+    return buffer.getvalue().encode("utf-8")
+
+
+def encode_jsonl(transactions: Transactions, labels: list) -> bytes:
+    """Returns one JSON object per row: ISO date, amount in EUR, description and category (null if unknown)."""
+    categories = {label: "null" if label is None else encode_basestring(label) for label in set(labels)}  # Few distinct labels, encoded once
+    dates = [f'"{date}"' if date else "null" for date in _format_dates(transactions.dates)]
+    lines = [
+        f'{{"date": {date}, "amount": {amount or "null"}, "description": {encode_basestring(description)}, "category": {categories[label]}}}\n'
+        for date, amount, description, label in zip(dates, _format_amounts(transactions.amounts), transactions.descriptions.tolist(), labels)
+    ]
+    return "".join(lines).encode("utf-8")
+
+
+def encode_columnar(transactions: Transactions, category_ids: np.ndarray, categories: list[str]) -> bytes:
+    """Returns one self-contained block of the columnar format (its own category dictionary)."""
+    used, block_ids = np.unique(category_ids, return_inverse=True)
+    block_ids = block_ids.reshape(-1).astype(np.int32)
+    if len(used) and used[0] < 0:
+        block_ids -= 1  # Uncategorized rows keep -1
+        used = used[1:]
+    nat = np.isnat(transactions.dates)
+    encoded = [description.encode("utf-8") for description in transactions.descriptions.tolist()]
+    lengths = np.fromiter((len(text) for text in encoded), dtype=np.int64, count=len(encoded))
+    columns = {
+        "dates": np.where(nat, MISSING_DAY, transactions.dates.astype(np.int64)).astype(COLUMNAR_COLUMNS["dates"]),
+        "amounts": transactions.amounts.astype(COLUMNAR_COLUMNS["amounts"]),
+        "category_ids": block_ids.astype(COLUMNAR_COLUMNS["category_ids"]),
+        "desc_offsets": np.concatenate(([0], np.cumsum(lengths))).astype(COLUMNAR_COLUMNS["desc_offsets"]),
+        "desc_bytes": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+    }
+    header = json.dumps({
+        "rows": len(transactions),
+        "categories": [categories[category_id] for category_id in used.tolist()],
+        "columns": {name: [COLUMNAR_COLUMNS[name], column.nbytes] for name, column in columns.items()},
+    }).encode("utf-8")
+    return b"".join([_BLOCK_LENGTH.pack(len(header)), header] + [column.tobytes() for column in columns.values()])
+
+
+def read_columnar(path: str) -> dict:
+    """Reads a columnar export file into numpy columns: dates, amounts, descriptions and categories (None if uncategorized)."""
+    data = _read_stream(path)
+    if not data.startswith(COLUMNAR_MAGIC):
+        msg = f"'{path}' is not a columnar export file"
+        logger.error(msg)
+        raise ValueError(msg)
+    blocks = {"dates": [], "amounts": [], "descriptions": [], "categories": []}
+    offset = len(COLUMNAR_MAGIC)
+    while offset < len(data):
+        if data.startswith(COLUMNAR_MAGIC, offset):  # Files appended to in a later run (gzip members, zstd frames)
+            offset += len(COLUMNAR_MAGIC)
+            continue
+        (length,) = _BLOCK_LENGTH.unpack_from(data, offset)
+        header = json.loads(data[offset + _BLOCK_LENGTH.size:offset + _BLOCK_LENGTH.size + length])
+        offset += _BLOCK_LENGTH.size + length
+        columns = {}
+        for name, (dtype, size) in header["columns"].items():
+            columns[name] = np.frombuffer(data, dtype=dtype, count=size // np.dtype(dtype).itemsize, offset=offset)
+            offset += size
+        days = columns["dates"].astype(np.int64)
+        dates = days.astype("datetime64[D]")
+        dates[days == MISSING_DAY] = np.datetime64("NaT")
+        text = columns["desc_bytes"].tobytes()
+        bounds = columns["desc_offsets"].tolist()
+        lookup = np.array(header["categories"] + [None], dtype=object)
+        blocks["dates"].append(dates)
+        blocks["amounts"].append(columns["amounts"].astype(np.int64))
+        blocks["descriptions"].append(np.array([text[bounds[i]:bounds[i + 1]].decode("utf-8") for i in range(header["rows"])], dtype=object))
+        blocks["categories"].append(lookup[columns["category_ids"]])
+    empty = {"dates": "datetime64[D]", "amounts": np.int64, "descriptions": object, "categories": object}
+    return {name: np.concatenate(parts) if parts else np.empty(0, dtype=empty[name]) for name, parts in blocks.items()}
+
+
+def _partition_name(label: str) -> str:
+    """Returns a label that is safe as (part of) a directory name."""
+    name = _UNSAFE.sub("_", label).strip()
+    return name if name.strip(".") else "_"
+
+
+class Exporter:
+    """Writes the categorized transactions of a run in several formats from one pass.
+
+    Every chunk is appended to all formats: ;-CSV (German notation), JSON Lines and a compact
+    columnar binary format (see read_columnar), each optionally gzip or zstd compressed. Files
+    are named '<stem><format extension>[.gz|.zst]' in the export directory; with a partition
+    they go to Hive-style directories ('month=2024-03/', 'category=Lebensmittel/'), so
+    downstream tools can load only the partitions they need. A full run writes '.part' files
+    that replace the previous export of the input only when the run has finished.
+    """
+    def __init__(self, directory: str, stem: str, categories: list[str], formats=tuple(EXPORT_FORMATS), compression: str = "none", partition: str = "none", max_open_files: int = MAX_OPEN_FILES) -> None:
+        formats = list(dict.fromkeys(formats))
+        unknown = [name for name in formats if name not in EXPORT_FORMATS]
+        if unknown or not formats:
+            msg = f"Unknown export formats {unknown}, expected some of {list(EXPORT_FORMATS)}"
+            logger.error(msg)
+            raise ValueError(msg)
+        if compression not in COMPRESSIONS:
+            msg = f"Unknown compression '{compression}', expected one of {list(COMPRESSIONS)}"
+            logger.error(msg)
+            raise ValueError(msg)
+        if partition not in PARTITIONS:
+            msg = f"Unknown partition '{partition}', expected one of {list(PARTITIONS)}"
+            logger.error(msg)
+            raise ValueError(msg)
+        if compression == "zstd":
+            _zstd_module()  # Fail before the run, not after the first chunk
+        if max_open_files < 1:
+            raise ValueError("max_open_files must be at least 1.")
+        self.directory = directory
+        self.stem = stem
+        self.categories = list(categories)  # Category labels, indexed by category id
+        self.labels = self.categories + [None]  # -1 picks None (uncategorized)
+        self.formats = formats
+        self.compression = compression
+        self.partition = partition
+        self.max_open_files = max_open_files
+        self.files = OrderedDict()  # Path -> open stream, least recently used first
+        self.paths = set()  # Files written in this run
+        self.append = False  # Append to the existing files instead of replacing them at the end of the run
+        self.sizes = {}  # Size of every appended file before the run (None if it did not exist), for discard
+        self.rows = 0
+
+    def __str__(self) -> str:
+        """Returns a string representation of the Exporter instance."""
+        return f"Exporter: \n  -> directory= {self.directory},\n  -> formats= {self.formats},\n  -> compression= {self.compression},\n  -> partition= {self.partition}"
+
+    @classmethod
+    def from_config(cls, config: dict, input_path: str, categories: list[str]) -> "Exporter":
+        """Creates the exporter of an input from a preset's 'export' settings (directory, formats, compression, partition)."""
+        if not config.get("directory"):
+            msg = "The export settings need a 'directory'."
+            logger.error(msg)
+            raise ValueError(msg)
+        stem = os.path.splitext(os.path.basename(input_path))[0]
+        return cls(config["directory"], stem, categories, config.get("formats", tuple(EXPORT_FORMATS)), config.get("compression", "none"), config.get("partition", "none"))
+
+    def file_name(self, export_format: str) -> str:
+        """Returns the file name of a format, e.g. 'export.jsonl.gz'."""
+        return f"{self.stem}{EXPORT_FORMATS[export_format]}{COMPRESSIONS[self.compression]}"
+
+    def start(self, append: bool = False) -> None:
+        """Prepares a run; without `append` the files are written next to the previous export and replace it in `finish`."""
+        self.rows = 0
+        self.append = append
+        self.sizes = {}
+        if not append:
+            for path in self.owned_files(PART_SUFFIX):
+                os.remove(path)  # Left over by an interrupted run, must not be appended to
+
+    def owned_files(self, suffix: str = "") -> list[str]:
+        """Returns the existing files of this export (with the suffix): the top-level files and those in partition directories."""
+        directory = glob.escape(self.directory)
+        return sorted(
+            path
+            for export_format in self.formats
+            for pattern in ("", "month=*", "category=*")
+            for path in glob.glob(os.path.join(directory, pattern, glob.escape(self.file_name(export_format) + suffix)))
+            if os.path.isfile(path)
+        )
+
+    def _partitions(self, transactions: Transactions, category_ids: np.ndarray) -> list[tuple[str, np.ndarray]]:
+        """Returns (directory, row indexes) for every partition in the chunk."""
+        if self.partition == "none":
+            return [(self.directory, np.arange(len(transactions)))]
+        if self.partition == "month":
+            nat = np.isnat(transactions.dates)
+            keys = np.where(nat, np.iinfo(np.int64).min, period_codes(transactions.dates, "month"))
+            names = lambda key: UNKNOWN_MONTH if key == np.iinfo(np.int64).min else period_label(key, "month")
+        else:
+            keys = np.asarray(category_ids, dtype=np.int64)
+            names = lambda key: UNCATEGORIZED if key < 0 else _partition_name(self.categories[key])
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        order = np.argsort(inverse.reshape(-1), kind="stable")
+        bounds = np.searchsorted(inverse.reshape(-1)[order], np.arange(len(unique_keys) + 1))
+        return [
+            (os.path.join(self.directory, f"{self.partition}={names(key)}"), order[bounds[index]:bounds[index + 1]])
+            for index, key in enumerate(unique_keys.tolist())
+        ]
+
+    def _stream(self, path: str):
+        """Returns the open stream of a file, the least recently used file is closed if too many are open."""
+        stream = self.files.get(path)
+        if stream is not None:
+            self.files.move_to_end(path)
+            return stream
+        while len(self.files) >= self.max_open_files:
+            _, oldest = self.files.popitem(last=False)
+            oldest.close()
+        if self.append and path not in self.sizes:
+            self.sizes[path] = os.path.getsize(path) if os.path.exists(path) else None
+        stream = self.files[path] = _open_stream(path, self.compression)
+        self.paths.add(path)
+        return stream
+
+    def write(self, transactions: Transactions, category_ids: np.ndarray) -> None:
+        """Appends one categorized chunk to every format (and partition)."""
+        category_ids = np.asarray(category_ids, dtype=np.int32)
+        labels = np.array(self.labels, dtype=object)
+        for directory, rows in self._partitions(transactions, category_ids):
+            if len(rows) == len(transactions):
+                part, part_ids = transactions, category_ids
+            else:
+                part = Transactions(transactions.dates[rows], transactions.amounts[rows], transactions.descriptions[rows])
+                part_ids = category_ids[rows]
+            part_labels = labels[part_ids].tolist()
+            for export_format in self.formats:
+                path = os.path.join(directory, self.file_name(export_format))
+                if not self.append:
+                    path += PART_SUFFIX
+                new_file = path not in self.files and (not os.path.exists(path) or os.path.getsize(path) == 0)
+                stream = self._stream(path)
+                if export_format == "csv":
+                    stream.write(encode_csv(part, part_labels, header=new_file))
+                elif export_format == "jsonl":
+                    stream.write(encode_jsonl(part, part_labels))
+                else:
+                    stream.write((COLUMNAR_MAGIC if new_file else b"") + encode_columnar(part, part_ids, self.categories))
+        self.rows += len(transactions)
+
+    def close(self) -> None:
+        """Closes all open files (can be called more than once)."""
+        while self.files:
+            _, stream = self.files.popitem(last=False)
+            stream.close()
+
+    def finish(self) -> list[str]:
+        """Closes all files, replaces the previous export after a full run and returns the written paths."""
+        self.close()
+        paths = sorted(self.paths)
+        if not self.append:
+            paths = [path[:-len(PART_SUFFIX)] for path in paths]
+            for path in set(self.owned_files()) - set(paths):
+                os.remove(path)  # e.g. months that are gone or files of another partitioning
+            for path in paths:
+                os.replace(path + PART_SUFFIX, path)
+        self.paths.clear()
+        logger.info("Exported %s rows as %s into %s files in '%s'.", self.rows, ", ".join(self.formats), len(paths), self.directory)
+        return paths
+
+    def discard(self) -> None:
+        """Closes and removes what this run wrote (e.g. after a cancel or error), the previous export stays.
+
+        Appended files are cut back to their size before the run (gzip members and zstd frames
+        end there), files of a full run are removed.
+        """
+        self.close()
+        for path in self.paths:
+            size = self.sizes.get(path)
+            if size is not None:
+                os.truncate(path, size)
+            elif os.path.exists(path):
+                os.remove(path)
+        self.paths.clear()
+        self.sizes = {}
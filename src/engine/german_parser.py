@@ -0,0 +1,181 @@
+# system imports
+from datetime import date
+import numpy as np
+
+# local imports
+from .transactions import MISSING_AMOUNT
+
+# Day number of dates that could not be parsed (the int64 representation of NaT)
+NAT_DAYS = np.iinfo(np.int64).min
+
+# Ordinal of 1970-01-01, datetime64[D] counts days from there
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Amounts longer than this are malformed without looking at them (keeps the character matrix small)
+MAX_AMOUNT_CHARS = 32
+
+# Integer digits of an amount, more would overflow the int64 cents
+MAX_AMOUNT_DIGITS = 15
+
+# Distinct date strings remembered before the memo table starts over
+MAX_MEMO_SIZE = 100_000
+
+# Character codes of the amount grammar: [sign] digits[.digits...][,digits] or [sign] digits[.digits] (decimal point)
+_ZERO, _NINE = ord("0"), ord("9")
+_SPACES = (0, ord(" "), ord("\t"), 0xA0)  # 0 is the padding of shorter strings
+_COMMA, _DOT, _MINUS, _PLUS = ord(","), ord("."), ord("-"), ord("+")
+
+
+def parse_date_days(text: str) -> int:
+    """Converts a DD.MM.YYYY (or DD.MM.YY) date into days since 1970-01-01, NAT_DAYS if malformed."""
+    parts = str(text).strip().split(".")
+    if len(parts) != 3 or not all(part.isascii() and part.isdigit() for part in parts):
+        return NAT_DAYS
+    day, month, year = parts
+    if len(year) not in (2, 4):
+        return NAT_DAYS
+    try:
+        return date(int(year) + (2000 if len(year) == 2 else 0), int(month), int(day)).toordinal() - EPOCH_ORDINAL
+    except ValueError:
+        return NAT_DAYS
+
+
+def format_date_days(days: int) -> str:
+    """Formats days since 1970-01-01 as DD.MM.YYYY."""
+    return date.fromordinal(int(days) + EPOCH_ORDINAL).strftime("%d.%m.%Y")
+
+
+def parse_amount_cents(value) -> int:
+    """Converts a single amount into cents, MISSING_AMOUNT if malformed.
+
+    Numbers are taken as they are, strings are read exactly like the amount column of an export
+    (see GermanParser.parse_amounts), so rule bounds and transactions agree on every text.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(round(float(value) * 100))
+    return int(GermanParser().parse_amounts([str(value).strip()])[0])
+
+
+class ParseReport:
+    """Counts of the values that could not be parsed plus a few examples of them."""
+    MAX_SAMPLES = 10
+
+    def __init__(self, malformed: dict | None = None, samples: list | None = None) -> None:
+        self.malformed = malformed or {"date": 0, "amount": 0}  # Malformed values per column
+        self.samples = samples or []  # [row, column, value] of the first malformed values
+
+    def __str__(self) -> str:
+        """Returns a string representation of the ParseReport instance."""
+        return f"ParseReport: \n  -> malformed= {self.malformed},\n  -> samples= {self.samples}"
+
+    def __len__(self) -> int:
+        return sum(self.malformed.values())
+
+    def add(self, column: str, rows: np.ndarray, values: list[str]) -> None:
+        """Records the malformed values of one column of a chunk."""
+        self.malformed[column] += len(rows)
+        free = self.MAX_SAMPLES - len(self.samples)
+        self.samples.extend([int(row), column, value] for row, value in zip(rows[:free], values[:free]))
+
+    def summary(self) -> str:
+        """Returns a one-line description of the malformed values."""
+        examples = ", ".join(f"row {row} {column} '{value}'" for row, column, value in self.samples[:3])
+        return f"{self.malformed['date']} malformed dates and {self.malformed['amount']} malformed amounts (e.g. {examples})"
+
+    def to_dict(self) -> dict:
+        """Returns the report as a JSON-serializable dict."""
+        return {"malformed": dict(self.malformed), "samples": list(self.samples)}
+
+
+class GermanParser:
+    """Parses the date and amount columns of German bank exports chunk by chunk.
+
+    Dates go through a memo table, since an export only contains a few hundred distinct days.
+    Amounts are parsed on a character matrix with numpy instead of one float() per row.
+    Malformed values become NaT / MISSING_AMOUNT and are collected in `report`.
+    """
+    def __init__(self) -> None:
+        self.date_memo = {}  # Date string -> days since 1970-01-01
+        self.report = ParseReport()
+
+    def __str__(self) -> str:
+        """Returns a string representation of the GermanParser instance."""
+        return f"GermanParser: \n  -> memo_size= {len(self.date_memo)},\n  -> malformed= {len(self.report)}"
+
+    def parse_dates(self, texts: list[str], first_row: int = 0) -> np.ndarray:
+        """Parses DD.MM.YYYY dates into datetime64[D], `first_row` numbers the rows in the report."""
+        memo = self.date_memo
+        if len(memo) > MAX_MEMO_SIZE:
+            memo.clear()
+        for text in set(texts).difference(memo):
+            memo[text] = parse_date_days(text)
+        days = np.fromiter((memo[text] for text in texts), dtype=np.int64, count=len(texts))
+
+        bad = np.flatnonzero(days == NAT_DAYS)
+        if len(bad):
+            self.report.add("date", bad + first_row, [texts[i] for i in bad[:ParseReport.MAX_SAMPLES]])
+        return days.view("datetime64[D]")
+
+    def parse_amounts(self, texts: list[str], first_row: int = 0) -> np.ndarray:
+        """Parses decimal amounts into int64 cents, `first_row` numbers the rows in the report.
+
+        A dot is a thousands separator if a comma follows it ("-1.234,56") or, without a comma, if
+        exactly three digits follow it ("1.000"); otherwise the last dot is the decimal point ("12.50").
+        """
+        n = len(texts)
+        too_long = np.fromiter((len(text) > MAX_AMOUNT_CHARS for text in texts), dtype=bool, count=n)
+        values = np.array([text if len(text) <= MAX_AMOUNT_CHARS else "" for text in texts], dtype=str)
+        width = values.dtype.itemsize // 4
+        if n == 0 or width == 0:
+            cents = np.full(n, MISSING_AMOUNT, dtype=np.int64)
+            self._report_amounts(np.ones(n, dtype=bool), texts, first_row)
+            return cents
+
+        chars = values.view(np.uint32).reshape(n, width)
+        cols = np.arange(width)
+        digit = (chars >= _ZERO) & (chars <= _NINE)
+        space = np.isin(chars, _SPACES)
+        comma, dot = chars == _COMMA, chars == _DOT
+        sign = (chars == _MINUS) | (chars == _PLUS)
+
+        # Only the grammar characters, no spaces inside the value and at least one digit
+        valid = ~too_long & (digit | space | comma | dot | sign).all(axis=1) & digit.any(axis=1)
+        content = ~space
+        first = content.argmax(axis=1)
+        last = width - 1 - content[:, ::-1].argmax(axis=1)
+        inside = (cols >= first[:, None]) & (cols <= last[:, None])
+        valid &= ~(space & inside).any(axis=1)
+
+        # A sign may only lead the value, the comma appears at most once and dots only before it
+        valid &= ~(sign & (cols != first[:, None])).any(axis=1)
+        valid &= comma.sum(axis=1) <= 1
+        has_comma, has_dot = comma.any(axis=1), dot.any(axis=1)
+        last_dot = np.where(has_dot, width - 1 - dot[:, ::-1].argmax(axis=1), -1)
+        decimal_dot = ~has_comma & has_dot & ((digit & (cols > last_dot[:, None])).sum(axis=1) != 3)
+        separator = np.where(has_comma, comma.argmax(axis=1), np.where(decimal_dot, last_dot, width))
+        before = cols < separator[:, None]
+        valid &= ~(dot & (cols > separator[:, None])).any(axis=1)
+        whole_digits = digit & before
+        valid &= whole_digits.sum(axis=1) <= MAX_AMOUNT_DIGITS
+
+        # Euros digit by digit, then the first two decimals (the third one rounds half up)
+        numbers = np.where(digit, chars.astype(np.int64) - _ZERO, 0)
+        euros = np.zeros(n, dtype=np.int64)
+        for col in range(width):
+            euros = np.where(whole_digits[:, col], euros * 10 + numbers[:, col], euros)
+        decimals = digit & ~before
+        rank = np.cumsum(decimals, axis=1)
+        cents = euros * 100
+        cents += (numbers * (decimals & (rank == 1))).sum(axis=1) * 10
+        cents += (numbers * (decimals & (rank == 2))).sum(axis=1)
+        cents += ((numbers * (decimals & (rank == 3))).sum(axis=1) >= 5)
+        cents = np.where((chars == _MINUS).any(axis=1), -cents, cents)
+
+        self._report_amounts(~valid, texts, first_row)
+        return np.where(valid, cents, MISSING_AMOUNT)
+
+    def _report_amounts(self, malformed: np.ndarray, texts: list[str], first_row: int) -> None:
+        """Adds the malformed amounts of a chunk to the report."""
+        bad = np.flatnonzero(malformed)
+        if len(bad):
+            self.report.add("amount", bad + first_row, [texts[i] for i in bad[:ParseReport.MAX_SAMPLES]])
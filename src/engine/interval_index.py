@@ -0,0 +1,43 @@
+# system imports
+import numpy as np
+
+INT64_MAX = np.iinfo(np.int64).max
+
+
+class IntervalIndex:
+    """Sorted index over closed integer intervals [start, end] (one interval per rule).
+
+    The interval bounds split the number line into elementary segments. Every value maps to
+    a segment id with a binary search and every interval covers a contiguous range of
+    segment ids, so window tests become comparisons of small integers.
+    """
+    def __init__(self, starts, ends) -> None:
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.ends = np.minimum(np.asarray(ends, dtype=np.int64), INT64_MAX - 1)  # Keep 'end + 1' representable
+
+        # Sorted segment boundaries: a segment starts at every interval start and after every interval end
+        self.boundaries = np.unique(np.concatenate([self.starts, self.ends + 1]))
+        self.first_segment = self.segments(self.starts)  # First segment id covered per interval
+        self.last_segment = self.segments(self.ends)  # Last segment id covered per interval (inclusive)
+
+        # Number of intervals covering each segment, built from a difference array
+        non_empty = self.first_segment <= self.last_segment
+        delta = np.zeros(len(self.boundaries) + 2, dtype=np.int64)
+        np.add.at(delta, self.first_segment[non_empty], 1)
+        np.add.at(delta, self.last_segment[non_empty] + 1, -1)
+        self.coverage = np.cumsum(delta)[:-1]
+
+    def __str__(self) -> str:
+        """Returns a string representation of the IntervalIndex instance."""
+        return f"IntervalIndex: \n  -> intervals= {len(self)},\n  -> segments= {len(self.boundaries) + 1}"
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def segments(self, values) -> np.ndarray:
+        """Returns the elementary segment id of every value."""
+        return np.searchsorted(self.boundaries, np.asarray(values, dtype=np.int64), side="right")
+
+    def covered(self, segments: np.ndarray) -> np.ndarray:
+        """Returns a mask of the segments that lie inside at least one interval."""
+        return self.coverage[segments] > 0
@@ -0,0 +1,82 @@
+# system imports
+from collections import deque
+import numpy as np
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton that finds all rule search terms in a text with a single scan."""
+    def __init__(self, keywords: list[str], word_boundaries: bool = False) -> None:
+        self.keywords = [keyword.lower() for keyword in keywords]
+        self.word_boundaries = word_boundaries  # Only report terms that are not part of a longer word
+
+        # Trie nodes: transitions, failure link and the keyword ids ending in the node
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        self.build()
+
+    def __str__(self) -> str:
+        """Returns a string representation of the KeywordMatcher instance."""
+        return f"KeywordMatcher: \n  -> keywords= {len(self.keywords)},\n  -> states= {len(self.goto)},\n  -> word_boundaries= {self.word_boundaries}"
+
+    def build(self) -> None:
+        """Builds the trie of all keywords and links it into an automaton."""
+        for keyword_id, keyword in enumerate(self.keywords):
+            if not keyword:
+                continue
+            state = 0
+            for char in keyword:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                state = next_state
+            self.output[state].append(keyword_id)
+
+        # Breadth-first pass: failure links point to the longest proper suffix that is also in the trie
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                # Inherit the matches of the suffix state, so no failure chain is walked while scanning
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def match(self, text: str) -> set[int]:
+        """Returns the ids of all keywords occurring in the text (case-insensitive)."""
+        text = text.lower()
+        goto, fail, output, keywords = self.goto, self.fail, self.output, self.keywords
+        found = set()
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not output[state]:
+                continue
+            if not self.word_boundaries:
+                found.update(output[state])
+                continue
+            # Check the characters around the match for word boundaries
+            after = position + 1
+            for keyword_id in output[state]:
+                before = after - len(keywords[keyword_id]) - 1
+                if (before < 0 or not text[before].isalnum()) and (after >= len(text) or not text[after].isalnum()):
+                    found.add(keyword_id)
+        return found
+
+    def match_many(self, texts) -> tuple[np.ndarray, np.ndarray]:
+        """Scans every text once and returns (text index, keyword id) pairs for all matches."""
+        text_ids, keyword_ids = [], []
+        for text_id, text in enumerate(texts):
+            for keyword_id in self.match(text):
+                text_ids.append(text_id)
+                keyword_ids.append(keyword_id)
+        return np.asarray(text_ids, dtype=np.int64), np.asarray(keyword_ids, dtype=np.int64)
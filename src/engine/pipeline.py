@@ -0,0 +1,212 @@
+# system imports
+import os
+import time
+import threading
+from typing import Callable
+
+# local imports
+from .aggregation import SummaryAggregator
+from .bank_formats import FormatDetector, format_detector
+from .categorizer import Categorizer
+from .category_memo import CategoryMemo
+from .checkpoint import Checkpoint
+from .columnar_cache import ColumnarCache
+from .csv_stream import CsvStreamReader, CsvStreamWriter
+from .dedup import Deduplicator
+from .export import Exporter, PART_SUFFIX
+from .profiling import RunProfile
+from .results import CategorizationResult
+from .rule_set import RuleSet
+from .rule_stats import RuleStats
+from ..utils.logging import logger
+
+
+class CancelledError(Exception):
+    """Raised when a running categorization is cancelled."""
+
+
+class Pipeline:
+    """Streams a bank export through the categorizer chunk by chunk into the output file."""
+    def __init__(self, rule_set: RuleSet, chunk_size: int = 50_000, incremental: bool = False, columnar_cache: bool = False, dedup: Deduplicator | None = None, bank_format: str | None = None, detector: FormatDetector | None = None, memo: CategoryMemo | None = None, rule_stats: RuleStats | None = None) -> None:
+        self.categorizer = Categorizer(rule_set, memo, rule_stats)
+        self.chunk_size = chunk_size
+        self.incremental = incremental  # Resume appended inputs from the checkpoint of the last run
+        self.columnar_cache = columnar_cache  # Read unchanged inputs from their parsed binary sidecar
+        self.dedup = dedup  # Drops transactions already imported from another export
+        self.bank_format = bank_format  # Name of a registered bank format, None or 'auto' detects it per file
+        self.detector = detector or format_detector
+
+    def __str__(self) -> str:
+        """Returns a string representation of the Pipeline instance."""
+        return f"Pipeline: \n  -> chunk_size= {self.chunk_size},\n  -> incremental= {self.incremental},\n  -> columnar_cache= {self.columnar_cache},\n  -> rules= {len(self.categorizer.rule_set)}"
+
+    def run(self, input_path: str, output_path: str, progress: Callable[[int, float, float], None] | None = None, cancel_event: threading.Event | None = None, result: CategorizationResult | None = None, profile: RunProfile | None = None, summary: SummaryAggregator | None = None, export: Exporter | None = None) -> int:
+        """Categorizes `input_path` into `output_path` and returns the number of processed rows.
+
+        In incremental mode only rows appended since the last run are categorized and appended
+        to the existing output; a rewritten input falls back to a full run. With the columnar
+        cache a full run of an unchanged input skips parsing, any other full run rebuilds the cache.
+        With a Deduplicator, transactions already imported from another export are left out.
+
+        `progress` is called after every chunk with (rows done, fraction of the file read, rows per
+        second). If `cancel_event` gets set, the run stops after the current chunk, removes the
+        partial output (kept and checkpointed in incremental mode) and raises CancelledError. A
+        full run writes '<output>.part' and replaces the previous output only when it is done, so
+        a cancelled or failed run leaves the previous output as it was.
+        If `result` is given, the categorized rows are also collected there (e.g. for the GUI
+        preview). If `profile` is given, stage timings and rule statistics are recorded in it. If
+        `summary` is given, the monthly/weekly category summaries are accumulated in it. If `export`
+        is given, the categorized rows are also written in its formats (appended when resuming).
+        """
+        if not os.path.isfile(input_path):
+            msg = f"Input file not found: '{input_path}'"
+            logger.error(msg)
+            raise FileNotFoundError(msg)
+        if os.path.abspath(input_path) == os.path.abspath(output_path):
+            msg = "Input and output path must not be the same file."
+            logger.error(msg)
+            raise ValueError(msg)
+
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        # Continue after the last checkpoint if the input file was only appended to
+        checkpoint = Checkpoint.load(output_path, input_path) if self.incremental else None
+        resume = checkpoint is not None and checkpoint.matches(input_path)
+        if checkpoint is not None and not resume:
+            logger.info("'%s' changed since the last run, categorizing it completely.", input_path)
+
+        # Parsed columns of an unchanged input come from the cache, otherwise the cache is rebuilt while parsing
+        bank_format = self.detector.resolve(input_path, self.bank_format)
+        cache = ColumnarCache(input_path) if self.columnar_cache and not resume else None
+        builder = None
+        if cache is not None and cache.is_valid(bank_format):
+            logger.info("Reading '%s' from the columnar cache '%s'.", input_path, cache.path)
+            reader = cache.reader(self.chunk_size, profile)
+        else:
+            reader = CsvStreamReader(input_path, self.chunk_size, start_offset=checkpoint.offset if resume else 0, profile=profile, bank_format=bank_format)
+            if cache is not None:
+                builder = cache.builder(bank_format)
+        if self.dedup is not None:
+            self.dedup.start(input_path, bank_format)
+        if export is not None:
+            export.start(append=resume)
+        self.categorizer.start_run()
+        row_count = 0
+        written_offset = checkpoint.offset if resume else 0
+        tail_offset = checkpoint.tail_offset if resume else 0
+        started = time.perf_counter()
+        # A full run replaces the previous output only at its end, a resumed run appends to it
+        write_path = output_path if resume else output_path + PART_SUFFIX
+        resume_size = os.path.getsize(output_path) if resume else 0  # A failed resume is cut back to this
+        try:
+            with CsvStreamWriter(write_path, reader.delimiter, append=resume) as writer:
+                header_written = resume
+                for index, chunk in enumerate(reader):
+                    if cancel_event is not None and cancel_event.is_set():
+                        break
+                    if not header_written:
+                        writer.write_header(reader.header)
+                        header_written = True
+                    if builder is not None:
+                        builder.add(chunk)
+                    if self.dedup is not None:
+                        dedup_started = time.perf_counter()
+                        keep = self.dedup.keep_mask(chunk.transactions)
+                        if profile is not None:
+                            profile.add_stage("dedup", time.perf_counter() - dedup_started, len(chunk))
+                        if not keep.all():
+                            chunk = chunk.select(keep)
+                    category_ids = self.categorizer.categorize(chunk.transactions, profile)
+                    write_started = time.perf_counter()
+                    writer.write_records(chunk.records, self.categorizer.rule_set.labels(category_ids))
+                    if profile is not None:
+                        profile.add_stage("write", time.perf_counter() - write_started, len(chunk))
+                    if export is not None:
+                        export_started = time.perf_counter()
+                        export.write(chunk.transactions, category_ids)
+                        if profile is not None:
+                            profile.add_stage("export", time.perf_counter() - export_started, len(chunk))
+                    if result is not None:
+                        result.append(chunk.transactions, category_ids)
+                    if summary is not None:
+                        summary.add(chunk.transactions, category_ids)
+                    row_count += len(chunk)
+                    written_offset, tail_offset = chunk.end_offset, chunk.tail_offset
+                    logger.debug("Wrote chunk %s (%s rows) to '%s'.", index, len(chunk), output_path, extra={"sample": 10})
+
+                    if progress is not None:
+                        elapsed = time.perf_counter() - started
+                        fraction = reader.bytes_read / reader.total_bytes if reader.total_bytes else 1.0
+                        progress(row_count, min(fraction, 1.0), row_count / elapsed if elapsed > 0 else 0.0)
+
+                # An export without any data rows still gets its header
+                if not header_written:
+                    writer.write_header(reader.header)
+
+            # Only a completely read input becomes the new cache
+            if builder is not None and not (cancel_event is not None and cancel_event.is_set()):
+                builder.commit(reader.header, reader.header_bytes, reader.bytes_read, reader.parse_report)
+            # Fingerprints only count once their rows are in the output (kept after a cancel only in incremental mode)
+            if self.dedup is not None and (self.incremental or not (cancel_event is not None and cancel_event.is_set())):
+                self.dedup.commit()
+        except BaseException:
+            # The previous output and export stay as they were, the checkpoint still matches them
+            if resume:
+                os.truncate(output_path, resume_size)
+            elif os.path.exists(write_path):
+                os.remove(write_path)
+            if export is not None:
+                export.discard()
+            raise
+        finally:
+            if builder is not None:
+                builder.abort()  # Nothing left to discard after a commit
+            if self.dedup is not None:
+                self.dedup.discard()  # Nothing left to discard after a commit
+            if export is not None:
+                export.close()
+
+        if profile is not None:
+            profile.finish()
+        if len(reader.parse_report):
+            logger.warning("'%s' contains %s, these rows stay uncategorized.", input_path, reader.parse_report.summary())
+
+        cancelled = cancel_event is not None and cancel_event.is_set()
+        if cancelled and not self.incremental:
+            os.remove(write_path)
+            if export is not None:
+                export.discard()
+        elif not resume:
+            os.replace(write_path, output_path)
+        if cancelled and self.incremental and export is not None:
+            export.finish()  # Like the output, the export keeps the rows categorized before the cancel
+
+        # The checkpoint always describes what the output contains, also after a cancel
+        if self.incremental and (row_count or not resume):
+            total_rows = (checkpoint.row_count if resume else 0) + row_count
+            Checkpoint.create(input_path, reader.header_bytes, written_offset, tail_offset, total_rows).save(output_path)
+
+        if cancelled:
+            logger.info("Categorization of '%s' cancelled after %s rows.", input_path, row_count)
+            raise CancelledError(f"Cancelled after {row_count} rows.")
+
+        memo = self.categorizer.memo
+        if memo is not None:
+            memo.save()
+            logger.info("Category memo answered %s of %s lookups (%s keys remembered).", memo.hits, memo.hits + memo.misses, len(memo))
+        rule_stats = self.categorizer.rule_stats
+        if rule_stats is not None:
+            rule_stats.record(self.categorizer.rule_set, self.categorizer.rule_hits)
+            rule_stats.save()
+        logger.info("Tested %.2f rules per transaction on average (%s order).", self.categorizer.avg_rules_evaluated(), "adaptive" if self.categorizer.order is not None else "declared")
+        if export is not None:
+            export.finish()
+        if self.dedup is not None and self.dedup.duplicates:
+            logger.info("Left out %s transactions of '%s' that were already imported from another export.", self.dedup.duplicates, input_path)
+        if resume:
+            logger.info("Appended %s new rows from '%s' to '%s'.", row_count, input_path, output_path)
+        else:
+            logger.info("Categorized %s rows from '%s' into '%s'.", row_count, input_path, output_path)
+        return row_count
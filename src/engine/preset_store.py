@@ -0,0 +1,262 @@
+# system imports
+import os
+import json
+import sqlite3
+import threading
+
+# local imports
+from .german_parser import parse_date_days, NAT_DAYS
+from ..utils import Helper
+from ..utils.logging import logger
+
+# Bump whenever the tables change
+SCHEMA_VERSION = 1
+
+# Preset keys that are stored in their own columns or tables, all others go into 'extra' as JSON
+_RULE_KEYS = {"input_categories": "input", "output_categories": "output"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS presets (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    position INTEGER NOT NULL,
+    input_path TEXT NOT NULL DEFAULT '',
+    output_path TEXT NOT NULL DEFAULT '',
+    extra TEXT NOT NULL DEFAULT '{}',
+    revision INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS rules (
+    id INTEGER PRIMARY KEY,
+    preset_id INTEGER NOT NULL REFERENCES presets(id) ON DELETE CASCADE,
+    direction TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    filters TEXT NOT NULL DEFAULT '',
+    date_from TEXT NOT NULL DEFAULT '',
+    date_to TEXT NOT NULL DEFAULT '',
+    min_value,
+    max_value,
+    date_from_days INTEGER,
+    date_to_days INTEGER
+);
+CREATE INDEX IF NOT EXISTS rules_by_preset ON rules(preset_id, direction, position);
+CREATE INDEX IF NOT EXISTS rules_by_category ON rules(category);
+CREATE INDEX IF NOT EXISTS rules_by_dates ON rules(date_from_days, date_to_days);
+"""
+
+
+def _days(text) -> int | None:
+    """Returns the day number of a rule date for the date index, None if it is empty or malformed."""
+    days = parse_date_days(text) if str(text).strip() else NAT_DAYS
+    return None if days == NAT_DAYS else days
+
+
+class PresetStore:
+    """Optional SQLite database with all presets, their paths and category rules.
+
+    Loading a preset is an indexed query instead of parsing its whole JSON file, and every
+    change is one transaction. Rules keep their order per preset and direction; they are
+    indexed by category and by their date window. Presets can be imported from and exported
+    to the usual '<name>.json' files next to settings.json.
+    """
+    def __init__(self, path: str) -> None:
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.lock = threading.RLock()  # One connection shared by the GUI and worker threads
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        with self.lock, self.connection:
+            self.connection.executescript(_SCHEMA)
+            self.connection.execute("INSERT OR IGNORE INTO settings (key, value) VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+
+    def __str__(self) -> str:
+        """Returns a string representation of the PresetStore instance."""
+        return f"PresetStore: \n  -> path= {self.path},\n  -> presets= {len(self.presets())}"
+
+    def __contains__(self, name: str) -> bool:
+        return self._preset_id(name) is not None
+
+    def close(self) -> None:
+        """Closes the database connection."""
+        with self.lock:
+            self.connection.close()
+
+    def _preset_id(self, name: str) -> int | None:
+        """Returns the row id of a preset, None if it does not exist."""
+        with self.lock:
+            row = self.connection.execute("SELECT id FROM presets WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def presets(self) -> list[str]:
+        """Returns the names of all presets in menu order."""
+        with self.lock:
+            return [name for (name,) in self.connection.execute("SELECT name FROM presets ORDER BY position, id")]
+
+    def revision(self, name: str) -> int:
+        """Returns a number that changes whenever the preset is saved."""
+        with self.lock:
+            row = self.connection.execute("SELECT revision FROM presets WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            msg = f"Preset '{name}' not found in '{self.path}'"
+            logger.error(msg)
+            raise ValueError(msg)
+        return row[0]
+
+    def get_setting(self, key: str, default=None):
+        """Returns a JSON value from the settings table."""
+        with self.lock:
+            row = self.connection.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_setting(self, key: str, value) -> None:
+        """Stores a JSON value in the settings table."""
+        with self.lock, self.connection:
+            self._write_setting(key, value)
+
+    def _write_setting(self, key: str, value) -> None:
+        """Writes a setting inside the caller's transaction."""
+        self.connection.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def load(self, name: str) -> dict:
+        """Returns a preset in the layout of a preset JSON file."""
+        with self.lock:
+            row = self.connection.execute("SELECT id, input_path, output_path, extra FROM presets WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                msg = f"Preset '{name}' not found in '{self.path}'"
+                logger.error(msg)
+                raise ValueError(msg)
+            preset_id, input_path, output_path, extra = row
+            rules = self.connection.execute(
+                "SELECT direction, category, filters, date_from, date_to, min_value, max_value FROM rules WHERE preset_id = ? ORDER BY direction, position",
+                (preset_id,),
+            ).fetchall()
+
+        preset_data = {"paths": {"input_path": input_path, "output_path": output_path}, **json.loads(extra)}
+        for key, direction in _RULE_KEYS.items():
+            preset_data[key] = [
+                {"category": category, "filters": filters, "dateFrom": date_from, "dateTo": date_to, "minValue": min_value, "maxValue": max_value}
+                for rule_direction, category, filters, date_from, date_to, min_value, max_value in rules
+                if rule_direction == direction
+            ]
+        return preset_data
+
+    def save(self, name: str, preset_data: dict) -> None:
+        """Replaces a preset (paths, rules and all other keys) in one transaction, new presets are appended."""
+        with self.lock, self.connection:
+            self._write_preset(name, preset_data)
+
+    def _write_preset(self, name: str, preset_data: dict) -> None:
+        """Writes a preset inside the caller's transaction."""
+        paths = preset_data.get("paths", {})
+        extra = {key: value for key, value in preset_data.items() if key != "paths" and key not in _RULE_KEYS}
+        cursor = self.connection.execute(
+            "UPDATE presets SET input_path = ?, output_path = ?, extra = ?, revision = revision + 1 WHERE name = ?",
+            (paths.get("input_path", ""), paths.get("output_path", ""), json.dumps(extra), name),
+        )
+        if cursor.rowcount:
+            preset_id = self._preset_id(name)
+        else:
+            cursor = self.connection.execute(
+                "INSERT INTO presets (name, position, input_path, output_path, extra, revision) VALUES (?, (SELECT COALESCE(MAX(position), -1) + 1 FROM presets), ?, ?, ?, 1)",
+                (name, paths.get("input_path", ""), paths.get("output_path", ""), json.dumps(extra)),
+            )
+            preset_id = cursor.lastrowid
+
+        self.connection.execute("DELETE FROM rules WHERE preset_id = ?", (preset_id,))
+        self.connection.executemany(
+            "INSERT INTO rules (preset_id, direction, position, category, filters, date_from, date_to, min_value, max_value, date_from_days, date_to_days) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (preset_id, direction, position, str(rule.get("category", "")), str(rule.get("filters", "")), str(rule.get("dateFrom", "")), str(rule.get("dateTo", "")),
+                 rule.get("minValue", ""), rule.get("maxValue", ""), _days(rule.get("dateFrom", "")), _days(rule.get("dateTo", "")))
+                for key, direction in _RULE_KEYS.items()
+                for position, rule in enumerate(preset_data.get(key, []))
+            ],
+        )
+
+    def update(self, name: str, new_data: dict) -> dict:
+        """Merges new top-level keys into a preset (like Helper.update_json_file) and returns it."""
+        with self.lock:
+            preset_data = self.load(name) if name in self else {}
+            preset_data.update(new_data)
+            self.save(name, preset_data)
+        return preset_data
+
+    def delete(self, name: str) -> None:
+        """Removes a preset together with its rules."""
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM presets WHERE name = ?", (name,))
+
+    def set_order(self, names: list[str]) -> None:
+        """Stores the menu order of the presets."""
+        with self.lock, self.connection:
+            self._write_order(names)
+
+    def _write_order(self, names: list[str]) -> None:
+        """Writes the menu order inside the caller's transaction."""
+        self.connection.executemany("UPDATE presets SET position = ? WHERE name = ?", list(enumerate(names)))
+
+    def find_rules(self, category: str | None = None, on_date: str | None = None) -> list[dict]:
+        """Returns the rules of all presets with the given category and/or a date window containing a DD.MM.YYYY date."""
+        conditions, parameters = [], []
+        if category is not None:
+            conditions.append("rules.category = ?")
+            parameters.append(category)
+        if on_date is not None:
+            days = _days(on_date)
+            if days is None:
+                msg = f"Invalid date '{on_date}', expected DD.MM.YYYY"
+                logger.error(msg)
+                raise ValueError(msg)
+            conditions.append("(rules.date_from_days IS NULL OR rules.date_from_days <= ?) AND (rules.date_to_days IS NULL OR rules.date_to_days >= ?)")
+            parameters.extend([days, days])
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self.lock:
+            rows = self.connection.execute(
+                f"SELECT presets.name, rules.direction, rules.category, rules.filters, rules.date_from, rules.date_to, rules.min_value, rules.max_value "
+                f"FROM rules JOIN presets ON presets.id = rules.preset_id {where} ORDER BY presets.position, rules.direction, rules.position",
+                parameters,
+            ).fetchall()
+        return [
+            {"preset": name, "direction": direction, "category": rule_category, "filters": filters, "dateFrom": date_from, "dateTo": date_to, "minValue": min_value, "maxValue": max_value}
+            for name, direction, rule_category, filters, date_from, date_to, min_value, max_value in rows
+        ]
+
+    def import_json(self, settings_path: str) -> int:
+        """Imports the presets listed in settings.json from their JSON files and returns their number."""
+        Helper.flush_file()  # Pending changes have to reach the files first
+        preset_menu = Helper.load_file(settings_path).get("preset_menu", {}) if os.path.exists(settings_path) else {}
+        directory = os.path.dirname(settings_path)
+        imported = []
+        with self.lock, self.connection:
+            for name in preset_menu.get("presets", []):
+                preset_path = os.path.join(directory, f"{name}.json")
+                if os.path.exists(preset_path):
+                    self._write_preset(name, Helper.load_file(preset_path))
+                    imported.append(name)
+                else:
+                    logger.warning("Preset file '%s' not found, skipping it.", preset_path)
+            self._write_order(imported)
+            if preset_menu.get("selected_preset") in imported:
+                self._write_setting("selected_preset", preset_menu["selected_preset"])
+        logger.info("Imported %s presets from '%s' into '%s'.", len(imported), directory, self.path)
+        return len(imported)
+
+    def export_json(self, settings_path: str) -> int:
+        """Writes every preset to '<name>.json' next to settings.json, updates its preset list and returns their number."""
+        directory = os.path.dirname(settings_path)
+        names = self.presets()
+        for name in names:
+            Helper.save_file(os.path.join(directory, f"{name}.json"), self.load(name))
+        settings_data = Helper.load_file(settings_path) if os.path.exists(settings_path) else {}
+        settings_data["preset_menu"] = {"presets": names, "selected_preset": self.get_setting("selected_preset", names[0] if names else "")}
+        Helper.save_file(settings_path, settings_data)
+        Helper.flush_file()
+        logger.info("Exported %s presets from '%s' to '%s'.", len(names), self.path, directory)
+        return len(names)
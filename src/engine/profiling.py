@@ -0,0 +1,106 @@
+# system imports
+import os
+import json
+import time
+from contextlib import contextmanager
+import numpy as np
+
+# local imports
+from .rule_set import RuleSet, INPUT
+
+
+class RunProfile:
+    """Wall time and row counts per pipeline stage plus hit counts and evaluation time per rule."""
+    STAGES = ("read", "parse", "dedup", "index_lookup", "memo_lookup", "keyword_match", "rule_eval", "write", "export")
+
+    def __init__(self, rule_set: RuleSet | None = None) -> None:
+        self.rule_set = rule_set
+        self.stage_seconds = dict.fromkeys(self.STAGES, 0.0)
+        self.stage_rows = dict.fromkeys(self.STAGES, 0)
+        rules = len(rule_set) if rule_set is not None else 0
+        self.rule_hits = np.zeros(rules, dtype=np.int64)  # Rows assigned by each rule
+        self.rule_evaluated = np.zeros(rules, dtype=np.int64)  # Candidate rows each rule was tested on
+        self.rule_seconds = np.zeros(rules, dtype=np.float64)  # Time spent evaluating each rule
+        self.transactions = 0  # Transactions passed to the categorizer
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def __str__(self) -> str:
+        """Returns a string representation of the RunProfile instance."""
+        stages = ", ".join(f"{name}= {seconds:.3f}s" for name, seconds in self.stage_seconds.items())
+        return f"RunProfile: \n  -> stages= {stages},\n  -> rules= {len(self.rule_hits)}"
+
+    @contextmanager
+    def stage(self, name: str, rows: int = 0):
+        """Adds the wall time of the enclosed block (and its row count) to a stage."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_seconds[name] += time.perf_counter() - started
+            self.stage_rows[name] += rows
+
+    def add_stage(self, name: str, seconds: float, rows: int = 0) -> None:
+        """Adds an externally measured duration to a stage."""
+        self.stage_seconds[name] += seconds
+        self.stage_rows[name] += rows
+
+    def record_rule(self, rule: int, evaluated: int, hits: int, seconds: float) -> None:
+        """Adds the outcome of evaluating one rule on one chunk."""
+        self.rule_evaluated[rule] += evaluated
+        self.rule_hits[rule] += hits
+        self.rule_seconds[rule] += seconds
+
+    def count_transactions(self, count: int) -> None:
+        """Adds the transactions of one categorized chunk."""
+        self.transactions += count
+
+    def avg_rules_evaluated(self) -> float:
+        """Returns the average number of rules a transaction was tested against."""
+        return float(self.rule_evaluated.sum()) / self.transactions if self.transactions else 0.0
+
+    def finish(self) -> None:
+        """Marks the end of the run."""
+        self.finished = time.perf_counter()
+
+    def rule_report(self) -> list[dict]:
+        """Returns one entry per rule, the rules with the highest evaluation time first."""
+        if self.rule_set is None:
+            return []
+        rules = self.rule_set
+        report = []
+        for rule in range(len(rules)):
+            report.append({
+                "rule": rule,
+                "category": rules.categories[rules.category_ids[rule]],
+                "filters": rules.filters[rule],
+                "direction": "input" if rules.directions[rule] == INPUT else "output",
+                "hits": int(self.rule_hits[rule]),
+                "evaluated_rows": int(self.rule_evaluated[rule]),
+                "seconds": round(float(self.rule_seconds[rule]), 6),
+            })
+        return sorted(report, key=lambda entry: entry["seconds"], reverse=True)
+
+    def to_dict(self) -> dict:
+        """Returns the profile as a JSON-serializable dict."""
+        end = self.finished if self.finished is not None else time.perf_counter()
+        rules = self.rule_report()
+        return {
+            "total_seconds": round(end - self.started, 6),
+            "transactions": self.transactions,
+            "avg_rules_evaluated": round(self.avg_rules_evaluated(), 4),
+            "stages": {
+                name: {"seconds": round(self.stage_seconds[name], 6), "rows": self.stage_rows[name]}
+                for name in self.STAGES
+            },
+            "rules": rules,
+            "dead_rules": sorted(entry["rule"] for entry in rules if entry["hits"] == 0),
+        }
+
+    def save(self, path: str) -> None:
+        """Writes the JSON report of the run."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=4)
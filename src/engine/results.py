@@ -0,0 +1,48 @@
+# system imports
+import numpy as np
+
+# local imports
+from .transactions import Transactions
+
+
+class CategorizationResult:
+    """Collects the categorized transactions of a run in memory, column by column."""
+    def __init__(self, categories: list[str]) -> None:
+        self.categories = list(categories)  # Category labels, indexed by category id
+        self.dates = np.empty(0, dtype="datetime64[D]")
+        self.amounts = np.empty(0, dtype=np.int64)
+        self.descriptions = np.empty(0, dtype=object)
+        self.category_ids = np.empty(0, dtype=np.int32)  # -1 = uncategorized
+        self._pending = []  # Chunks not yet concatenated
+
+    def __str__(self) -> str:
+        """Returns a string representation of the CategorizationResult instance."""
+        return f"CategorizationResult: \n  -> rows= {len(self)},\n  -> categories= {len(self.categories)}"
+
+    def __len__(self) -> int:
+        self._consolidate()
+        return len(self.dates)
+
+    def append(self, transactions: Transactions, category_ids: np.ndarray) -> None:
+        """Adds one categorized chunk."""
+        self._pending.append((transactions, np.asarray(category_ids, dtype=np.int32)))
+
+    def _consolidate(self) -> None:
+        """Concatenates all pending chunks into the column arrays (once, not per chunk)."""
+        if not self._pending:
+            return
+        chunks = [(self.dates, self.amounts, self.descriptions, self.category_ids)]
+        chunks += [(t.dates, t.amounts, t.descriptions, ids) for t, ids in self._pending]
+        self.dates, self.amounts, self.descriptions, self.category_ids = (np.concatenate(column) for column in zip(*chunks))
+        self._pending = []
+
+    def columns(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Returns (dates, amounts, descriptions, category_ids) of all collected rows."""
+        self._consolidate()
+        return self.dates, self.amounts, self.descriptions, self.category_ids
+
+    def labels(self, uncategorized: str = "") -> np.ndarray:
+        """Returns the category label of every collected row."""
+        self._consolidate()
+        lookup = np.array(self.categories + [uncategorized], dtype=object)
+        return lookup[self.category_ids]
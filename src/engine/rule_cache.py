@@ -0,0 +1,100 @@
+# system imports
+import os
+import json
+import hashlib
+from collections import OrderedDict
+
+# local imports
+from .preset_store import PresetStore
+from .rule_set import RuleSet
+from ..utils.logging import logger
+
+
+class _CacheEntry:
+    """Parsed preset data and its compiled rule set for one version of a preset file."""
+    def __init__(self, signature: tuple, digest: str, preset_data: dict) -> None:
+        self.signature = signature  # (mtime_ns, size) of the file when it was read
+        self.digest = digest  # Content hash of the file
+        self.preset_data = preset_data
+        self.rule_set = None  # Compiled on first use
+
+
+class RuleSetCache:
+    """LRU cache of parsed presets and compiled rule sets, keyed by preset name and file version.
+
+    A preset is only re-read when its mtime or size changed, and only recompiled when its
+    content hash changed as well. With a PresetStore the presets are loaded from the database
+    instead, then the preset's revision decides whether the entry is still current.
+    """
+    def __init__(self, max_size: int = 16, store: PresetStore | None = None) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1.")
+        self.max_size = max_size
+        self.store = store
+        self.entries = OrderedDict()  # preset name -> _CacheEntry, least recently used first
+        self.hits = 0
+        self.misses = 0
+
+    def __str__(self) -> str:
+        """Returns a string representation of the RuleSetCache instance."""
+        return f"RuleSetCache: \n  -> presets= {list(self.entries)},\n  -> max_size= {self.max_size},\n  -> hits= {self.hits},\n  -> misses= {self.misses}"
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get_preset_data(self, preset_name: str, preset_path: str) -> dict:
+        """Returns the parsed preset file. The returned dict is shared and must not be modified."""
+        return self._get_entry(preset_name, preset_path).preset_data
+
+    def get_rule_set(self, preset_name: str, preset_path: str) -> RuleSet:
+        """Returns the compiled rule set of the preset file."""
+        entry = self._get_entry(preset_name, preset_path)
+        if entry.rule_set is None:
+            entry.rule_set = RuleSet.from_preset(entry.preset_data)
+            logger.debug("Compiled rule set for preset '%s'.", preset_name)
+        return entry.rule_set
+
+    def invalidate(self, preset_name: str | None = None) -> None:
+        """Drops one preset (or all presets) from the cache."""
+        if preset_name is None:
+            self.entries.clear()
+        else:
+            self.entries.pop(preset_name, None)
+
+    def _get_entry(self, preset_name: str, preset_path: str) -> _CacheEntry:
+        """Returns an up-to-date cache entry, re-reading the file only if it changed."""
+        if self.store is not None:
+            signature = ("revision", self.store.revision(preset_name))
+        else:
+            stat = os.stat(preset_path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        entry = self.entries.get(preset_name)
+
+        if entry is not None and entry.signature == signature:
+            self.entries.move_to_end(preset_name)
+            self.hits += 1
+            return entry
+
+        if self.store is not None:
+            preset_data, digest = self.store.load(preset_name), None
+        else:
+            with open(preset_path, "rb") as f:
+                raw = f.read()
+            digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+            # File was touched or rewritten with identical content: keep the compiled rules
+            if entry is not None and entry.digest == digest:
+                entry.signature = signature
+                self.entries.move_to_end(preset_name)
+                self.hits += 1
+                return entry
+            preset_data = json.loads(raw)
+
+        self.misses += 1
+        entry = _CacheEntry(signature, digest, preset_data)
+        self.entries[preset_name] = entry
+        self.entries.move_to_end(preset_name)
+        while len(self.entries) > self.max_size:
+            evicted, _ = self.entries.popitem(last=False)
+            logger.debug("Evicted preset '%s' from the rule set cache.", evicted)
+        return entry
@@ -0,0 +1,126 @@
+# system imports
+import json
+import hashlib
+import numpy as np
+
+# local imports
+from .german_parser import parse_date_days, parse_amount_cents, NAT_DAYS
+from .transactions import MISSING_AMOUNT
+from .keyword_matcher import KeywordMatcher
+from .interval_index import IntervalIndex
+from ..utils.logging import logger
+
+# Bounds used when a rule leaves its date or amount window open
+DATE_MIN = np.datetime64("0001-01-01", "D")
+DATE_MAX = np.datetime64("9999-12-31", "D")
+AMOUNT_MAX = np.iinfo(np.int64).max
+
+# Rule directions: input categories match incoming money, output categories outgoing money
+INPUT = 1
+OUTPUT = -1
+
+
+def _parse_date(value, default: np.datetime64) -> np.datetime64:
+    """Parses a DD.MM.YYYY rule date, empty values fall back to the default."""
+    text = str(value).strip()
+    if not text:
+        return default
+    days = parse_date_days(text)
+    if days == NAT_DAYS:
+        raise ValueError(f"invalid date '{text}', expected DD.MM.YYYY")
+    return np.datetime64(days, "D")
+
+
+def _parse_cents(value, default: int) -> int:
+    """Parses a rule amount (float or German/English decimal string) into cents."""
+    if not str(value).strip():
+        return default
+    cents = parse_amount_cents(value)
+    if cents == MISSING_AMOUNT:
+        raise ValueError(f"invalid amount '{value}'")
+    return cents
+
+
+class RuleSet:
+    """Compiled, column-wise representation of the category rules of a preset."""
+    def __init__(self, categories, filters, date_from, date_to, min_cents, max_cents, directions, category_ids, word_boundaries: bool = False) -> None:
+        self.categories = list(categories)  # Distinct category labels, indexed by category id
+        self.filters = list(filters)  # Lower-cased search term per rule ("" matches everything)
+        self.date_from = np.asarray(date_from, dtype="datetime64[D]")
+        self.date_to = np.asarray(date_to, dtype="datetime64[D]")
+        self.min_cents = np.asarray(min_cents, dtype=np.int64)  # Lower bound of the absolute amount
+        self.max_cents = np.asarray(max_cents, dtype=np.int64)  # Upper bound of the absolute amount
+        self.directions = np.asarray(directions, dtype=np.int8)  # INPUT or OUTPUT per rule
+        self.category_ids = np.asarray(category_ids, dtype=np.int32)  # Category id per rule
+
+        # All distinct search terms are compiled into one automaton, rules refer to them by keyword id
+        self.keywords = list(dict.fromkeys(keyword for keyword in self.filters if keyword))
+        keyword_index = {keyword: keyword_id for keyword_id, keyword in enumerate(self.keywords)}
+        self.keyword_ids = np.array([keyword_index.get(keyword, -1) for keyword in self.filters], dtype=np.int32)  # -1 = no search term
+        self.matcher = KeywordMatcher(self.keywords, word_boundaries)
+
+        # Date and signed amount windows as interval indexes, outgoing windows are mirrored below zero
+        self.date_index = IntervalIndex(self.date_from.astype(np.int64), self.date_to.astype(np.int64))
+        incoming = self.directions == INPUT
+        self.amount_index = IntervalIndex(
+            np.where(incoming, self.min_cents, -self.max_cents),
+            np.where(incoming, self.max_cents, -np.maximum(self.min_cents, 1)),  # Zero counts as incoming
+        )
+
+        # Content hash of the compiled rules, results remembered for one version are invalid for any other
+        digest = hashlib.blake2b(digest_size=16)
+        for column in (self.date_from, self.date_to, self.min_cents, self.max_cents, self.directions, self.category_ids):
+            digest.update(np.ascontiguousarray(column).tobytes())
+        digest.update(json.dumps([self.categories, self.filters, word_boundaries]).encode("utf-8"))
+        self.version = digest.hexdigest()
+
+    def __str__(self) -> str:
+        """Returns a string representation of the RuleSet instance."""
+        return f"RuleSet: \n  -> rules= {len(self)},\n  -> categories= {self.categories}"
+
+    def __len__(self) -> int:
+        return len(self.filters)
+
+    @classmethod
+    def from_preset(cls, preset_data: dict) -> "RuleSet":
+        """Compiles the 'input_categories' and 'output_categories' of a preset into a RuleSet.
+
+        Rules keep their order from the preset, the first matching rule wins. With the optional
+        preset flag 'match_whole_words' search terms only match complete words.
+        """
+        categories, filters, date_from, date_to, min_cents, max_cents, directions, category_ids = [], [], [], [], [], [], [], []
+        category_index = {}
+
+        for key, direction in (("input_categories", INPUT), ("output_categories", OUTPUT)):
+            for row in preset_data.get(key, []):
+                try:
+                    row_from = _parse_date(row.get("dateFrom", ""), DATE_MIN)
+                    row_to = _parse_date(row.get("dateTo", ""), DATE_MAX)
+                    row_min = _parse_cents(row.get("minValue", ""), 0)
+                    row_max = _parse_cents(row.get("maxValue", ""), AMOUNT_MAX)
+                except ValueError as e:
+                    msg = f"Invalid rule for category '{row.get('category')}' in '{key}': {e}"
+                    logger.error(msg)
+                    raise ValueError(msg)
+
+                category = str(row.get("category", ""))
+                if category not in category_index:
+                    category_index[category] = len(categories)
+                    categories.append(category)
+
+                filters.append(str(row.get("filters", "")).strip().lower())
+                date_from.append(row_from)
+                date_to.append(row_to)
+                min_cents.append(row_min)
+                max_cents.append(row_max)
+                directions.append(direction)
+                category_ids.append(category_index[category])
+
+        logger.debug("Compiled %s rules into %s categories.", len(filters), len(categories))
+        word_boundaries = bool(preset_data.get("match_whole_words", False))
+        return cls(categories, filters, date_from, date_to, min_cents, max_cents, directions, category_ids, word_boundaries)
+
+    def labels(self, category_ids: np.ndarray, uncategorized: str = "") -> np.ndarray:
+        """Maps category ids (-1 = no match) to their labels."""
+        lookup = np.array(self.categories + [uncategorized], dtype=object)
+        return lookup[np.asarray(category_ids)]  # -1 picks the trailing 'uncategorized' label
@@ -0,0 +1,139 @@
+# system imports
+import os
+import json
+import numpy as np
+
+# local imports
+from .rule_set import RuleSet
+from ..utils import Helper
+from ..utils.logging import logger
+
+# Weight of the earlier runs whenever a run is recorded, so the order follows changes in spending
+DECAY = 0.9
+
+# Rules whose decayed hit count falls below this are forgotten (e.g. deleted rules)
+MIN_HITS = 0.5
+
+
+def rule_keys(rule_set: RuleSet) -> list[str]:
+    """Returns a key per rule made of its content (direction, category, search term, windows)."""
+    return [
+        json.dumps([int(rule_set.directions[rule]), rule_set.categories[rule_set.category_ids[rule]], rule_set.filters[rule],
+                    str(rule_set.date_from[rule]), str(rule_set.date_to[rule]), int(rule_set.min_cents[rule]), int(rule_set.max_cents[rule])])
+        for rule in range(len(rule_set))
+    ]
+
+
+def adaptive_order(rule_set: RuleSet, hits: np.ndarray) -> np.ndarray:
+    """Returns the rule ids in evaluation order, the most frequently hit rules first.
+
+    First match wins, so a rule may only be evaluated before an earlier rule of another
+    category if no transaction can match both. Two rules can only match the same transaction
+    if their date and signed amount windows intersect and if one of them has no search term or
+    both have the same one; rows whose description contains several search terms have to be
+    evaluated in the declared order by the caller. The result is a topological order of these
+    constraints that picks the hottest ready rule at every step (ties keep the declared order).
+    """
+    count = len(rule_set)
+    if not count or not np.any(hits):
+        return np.arange(count)
+    dates, amounts = rule_set.date_index, rule_set.amount_index
+    keyword_ids, category_ids = rule_set.keyword_ids, rule_set.category_ids
+    live = (dates.first_segment <= dates.last_segment) & (amounts.first_segment <= amounts.last_segment)  # Empty windows never match
+
+    def conflicts(rule: int) -> np.ndarray:
+        """Returns a mask of the later rules that can match a transaction together with the rule."""
+        later = slice(rule + 1, count)
+        keyword_id = keyword_ids[rule]
+        return (live[rule] & live[later]
+                & (dates.first_segment[later] <= dates.last_segment[rule]) & (dates.first_segment[rule] <= dates.last_segment[later])
+                & (amounts.first_segment[later] <= amounts.last_segment[rule]) & (amounts.first_segment[rule] <= amounts.last_segment[later])
+                & (category_ids[later] != category_ids[rule])
+                & ((keyword_id < 0) | (keyword_ids[later] < 0) | (keyword_ids[later] == keyword_id)))
+
+    # Number of earlier conflicting rules per rule that have not been placed yet
+    blockers = np.zeros(count, dtype=np.int64)
+    for rule in range(count - 1):
+        blockers[rule + 1:] += conflicts(rule)
+
+    hits = np.asarray(hits, dtype=np.float64)
+    placed = np.zeros(count, dtype=bool)
+    order = np.empty(count, dtype=np.int64)
+    for position in range(count):
+        ready = np.flatnonzero((blockers == 0) & ~placed)  # Never empty: the first unplaced rule is always ready
+        rule = ready[np.argmax(hits[ready])]
+        order[position] = rule
+        placed[rule] = True
+        blockers[rule + 1:] -= conflicts(rule)
+    return order
+
+
+class RuleStats:
+    """Persistent hit counts per rule, from which the Categorizer derives its evaluation order.
+
+    Rules are identified by their content, so the counts survive editing and reordering the
+    other rules of the preset. Every recorded run scales the counts of the earlier runs by
+    DECAY, rules that are not hit any more fade out.
+    """
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path  # JSON file next to the preset, None keeps the counts in memory only
+        self.hits = {}  # Rule key -> decayed number of transactions the rule categorized
+        self.changed = False
+        self.cached_order = (None, None)  # (rule set version, order) until the next recorded run
+        if path and os.path.exists(path):
+            self._load()
+
+    def __str__(self) -> str:
+        """Returns a string representation of the RuleStats instance."""
+        return f"RuleStats: \n  -> path= {self.path},\n  -> rules= {len(self.hits)}"
+
+    def __len__(self) -> int:
+        return len(self.hits)
+
+    def _load(self) -> None:
+        """Reads the counts of earlier runs, an unreadable file is ignored."""
+        try:
+            self.hits = {str(key): float(count) for key, count in Helper.load_file(self.path)["hits"].items()}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning("Ignoring unreadable rule statistics '%s': %s", self.path, e)
+            self.hits = {}
+
+    def rule_hits(self, rule_set: RuleSet) -> np.ndarray:
+        """Returns the recorded hit count of every rule of a rule set."""
+        hits = self.hits
+        return np.array([hits.get(key, 0.0) for key in rule_keys(rule_set)], dtype=np.float64)
+
+    def order(self, rule_set: RuleSet) -> np.ndarray:
+        """Returns the evaluation order of a rule set, see adaptive_order."""
+        version, order = self.cached_order
+        if version != rule_set.version:
+            order = adaptive_order(rule_set, self.rule_hits(rule_set))
+            self.cached_order = (rule_set.version, order)
+        return order
+
+    def record(self, rule_set: RuleSet, hits: np.ndarray) -> None:
+        """Adds the hits of a run, the counts of the earlier runs are decayed first."""
+        counts = {key: count * DECAY for key, count in self.hits.items() if count * DECAY >= MIN_HITS}
+        for key, count in zip(rule_keys(rule_set), np.asarray(hits).tolist()):
+            if count:
+                counts[key] = counts.get(key, 0.0) + count
+        self.hits = counts
+        self.changed = True
+        self.cached_order = (None, None)
+
+    def save(self) -> None:
+        """Writes the counts next to the preset (only if they changed)."""
+        if not self.path or not self.changed:
+            return
+        Helper.save_file(self.path, {"hits": {key: round(count, 3) for key, count in self.hits.items()}})
+        self.changed = False
+
+    def invalidate(self) -> None:
+        """Forgets all counts and removes the file (e.g. when the preset is deleted)."""
+        self.hits = {}
+        self.changed = False
+        self.cached_order = (None, None)
+        if self.path:
+            Helper.discard_file(self.path)
+            if os.path.exists(self.path):
+                os.remove(self.path)
@@ -0,0 +1,27 @@
+# system imports
+import numpy as np
+
+# Sentinel for amounts that could not be parsed (never matched by any rule)
+MISSING_AMOUNT = np.iinfo(np.int64).min
+
+
+class Transactions:
+    """Column-wise container for a batch of bank transactions."""
+    def __init__(self, dates, amounts, descriptions) -> None:
+        self.dates = np.asarray(dates, dtype="datetime64[D]")  # Booking dates, NaT if unknown
+        self.amounts = np.asarray(amounts, dtype=np.int64)  # Signed amounts in cents, MISSING_AMOUNT if unknown
+        self.descriptions = np.asarray(descriptions, dtype=object)  # Raw description texts
+
+        if not (len(self.dates) == len(self.amounts) == len(self.descriptions)):
+            raise ValueError("Transaction columns must all have the same length.")
+
+    def __str__(self) -> str:
+        """Returns a string representation of the Transactions instance."""
+        return f"Transactions: \n  -> rows= {len(self)}"
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def valid_mask(self) -> np.ndarray:
+        """Returns a mask of all rows with a parsable date and amount."""
+        return ~np.isnat(self.dates) & (self.amounts != MISSING_AMOUNT)
@@ -0,0 +1,282 @@
+# system imports
+import os
+import sys
+import time
+import glob
+import queue
+import select
+import struct
+import ctypes
+import ctypes.util
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# local imports
+from .batch import OUTPUT_SUFFIX, BatchProcessor, available_cores, _init_worker, _run_file
+from .rule_set import RuleSet
+from ..utils.logging import logger
+
+# inotify flags (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008  # A file opened for writing was closed
+IN_MOVED_TO = 0x00000080  # A file was renamed into the directory
+IN_Q_OVERFLOW = 0x00004000  # The kernel dropped events
+IN_IGNORED = 0x00008000  # The watch was removed (e.g. the directory was deleted)
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+# Layout of struct inotify_event without its name: wd, mask, cookie, len
+_EVENT = struct.Struct("iIII")
+
+# Default seconds between scans of the polling watcher, also the time a file's size has to stay unchanged
+POLL_INTERVAL = 1.0
+
+# Seconds between full scans while inotify is used, for changes inotify does not report (e.g. network shares)
+RESCAN_INTERVAL = 30.0
+
+# Files waiting for a free worker, the watcher blocks while the queue is full
+QUEUE_SIZE = 100
+
+
+class InotifyWatcher:
+    """Reports files that were completely written into (or moved into) the watched directories.
+
+    Uses the Linux inotify API through ctypes; `create` returns None where it is not available.
+    """
+    def __init__(self, libc, fd: int, directories: list[str]) -> None:
+        self.libc = libc
+        self.fd = fd
+        self.watches = {}  # Watch descriptor -> directory
+        for directory in directories:
+            wd = libc.inotify_add_watch(fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO)
+            if wd < 0:
+                error = ctypes.get_errno()
+                self.close()
+                raise OSError(error, f"Cannot watch '{directory}': {os.strerror(error)}")
+            self.watches[wd] = directory
+
+    def __str__(self) -> str:
+        """Returns a string representation of the InotifyWatcher instance."""
+        return f"InotifyWatcher: \n  -> directories= {list(self.watches.values())}"
+
+    @classmethod
+    def create(cls, directories: list[str]) -> "InotifyWatcher | None":
+        """Returns a watcher for the directories, None if inotify cannot be used here."""
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+            return cls(libc, fd, directories)
+        except (OSError, AttributeError) as e:
+            logger.warning("inotify is not available, polling the watched directories instead: %s", e)
+            return None
+
+    def wait(self, timeout: float) -> tuple[list[str], bool]:
+        """Waits up to `timeout` seconds and returns the completed files and whether a full scan is needed."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return [], False
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return [], False
+
+        paths, rescan = [], False
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0")
+            offset += _EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                logger.warning("inotify dropped events, scanning the watched directories.")
+                rescan = True
+            elif mask & IN_IGNORED:
+                logger.warning("Watched directory '%s' is gone.", self.watches.pop(wd, "?"))
+            elif name and not mask & IN_ISDIR and wd in self.watches:
+                paths.append(os.path.join(self.watches[wd], os.fsdecode(name)))
+        return paths, rescan
+
+    def close(self) -> None:
+        """Closes the inotify file descriptor."""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingWatcher:
+    """Fallback without change notifications: every wait ends in a full scan."""
+    def __init__(self, interval: float = POLL_INTERVAL, stop_event: threading.Event | None = None) -> None:
+        self.interval = interval
+        self.stop_event = stop_event or threading.Event()
+
+    def __str__(self) -> str:
+        """Returns a string representation of the PollingWatcher instance."""
+        return f"PollingWatcher: \n  -> interval= {self.interval}"
+
+    def wait(self, timeout: float) -> tuple[list[str], bool]:
+        """Sleeps for the poll interval (or until stopped) and asks for a full scan."""
+        self.stop_event.wait(self.interval)
+        return [], True
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+
+class FolderWatcher:
+    """Long-running mode that categorizes bank exports as soon as they arrive in a directory.
+
+    Files reported complete by inotify (closed after writing or moved in) are queued at once,
+    files found by a scan only after their size and mtime stayed unchanged for `settle_seconds`.
+    A bounded queue feeds a process pool whose workers keep the compiled rules; outputs are
+    written to `<name>_categorized.csv` in the output directory. Files whose output is newer
+    than the file itself count as done, so a restart does not categorize them again.
+    """
+    def __init__(self, rule_set: RuleSet, directories: list[str], output_dir: str, chunk_size: int = 50_000, workers: int | None = None, incremental: bool = False, columnar_cache: bool = False, bank_format: str | None = None, poll_interval: float = POLL_INTERVAL, queue_size: int = QUEUE_SIZE, use_inotify: bool = True) -> None:
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1.")
+        for directory in directories:
+            if not os.path.isdir(directory):
+                msg = f"Watched directory not found: '{directory}'"
+                logger.error(msg)
+                raise FileNotFoundError(msg)
+        self.rule_set = rule_set
+        self.directories = [os.path.abspath(directory) for directory in directories]
+        self.output_dir = output_dir
+        self.chunk_size = chunk_size
+        self.workers = workers or available_cores()
+        self.incremental = incremental
+        self.columnar_cache = columnar_cache
+        self.bank_format = bank_format
+        self.settle_seconds = poll_interval
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.queue = queue.Queue(maxsize=queue_size)  # (path, signature, arrival time), None stops the dispatcher
+        self.pending = {}  # Path -> (signature, first seen) of files that are still being written
+        self.queued = set()  # Paths waiting in the queue or being categorized
+        self.processed = {}  # Path -> signature of the version that was categorized last
+        self.lock = threading.Lock()
+        self.files_done = 0
+
+    def __str__(self) -> str:
+        """Returns a string representation of the FolderWatcher instance."""
+        return f"FolderWatcher: \n  -> directories= {self.directories},\n  -> output_dir= {self.output_dir},\n  -> workers= {self.workers},\n  -> queue_size= {self.queue.maxsize}"
+
+    @staticmethod
+    def _signature(path: str) -> tuple[int, int] | None:
+        """Returns (size, mtime_ns) of a file, None if it is gone."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _is_input(self, path: str) -> bool:
+        """Checks whether a file is a bank export (no output, hidden or temporary file)."""
+        name = os.path.basename(path)
+        return name.lower().endswith(".csv") and not name.endswith(OUTPUT_SUFFIX) and not name.startswith((".", "~"))
+
+    def _is_done(self, path: str, signature: tuple[int, int]) -> bool:
+        """Checks whether this version of a file was already categorized (in this or an earlier run)."""
+        with self.lock:
+            if path in self.queued or self.processed.get(path) == signature:
+                return True
+        output = self._signature(BatchProcessor.output_path_for(path, self.output_dir))
+        return output is not None and output[1] >= signature[1] and path not in self.processed
+
+    def scan(self) -> list[str]:
+        """Returns the input files of all watched directories."""
+        return sorted(path for directory in self.directories for path in glob.glob(os.path.join(directory, "*")) if os.path.isfile(path) and self._is_input(path))
+
+    def offer(self, path: str, complete: bool, stop_event: threading.Event) -> None:
+        """Queues a file once it is completely written; `complete` skips the size check (inotify close/move)."""
+        if not self._is_input(path):
+            return
+        signature = self._signature(path)
+        if signature is None or self._is_done(path, signature):
+            self.pending.pop(path, None)
+            return
+
+        now = time.monotonic()
+        seen = self.pending.get(path)
+        if not complete:
+            if seen is None or seen[0] != signature:
+                self.pending[path] = (signature, now)  # New or still growing, check again after the next scan
+                return
+            if now - seen[1] < self.settle_seconds:
+                return
+        arrived = seen[1] if seen is not None else now
+        self.pending.pop(path, None)
+        with self.lock:
+            self.queued.add(path)
+        while not stop_event.is_set():
+            try:
+                self.queue.put((path, signature, arrived), timeout=0.5)
+                logger.debug("Queued '%s' (%s files waiting).", path, self.queue.qsize(), extra={"rate_limit": True})
+                return
+            except queue.Full:
+                continue  # Back pressure: the workers are behind, wait for a free slot
+        with self.lock:
+            self.queued.discard(path)
+
+    def run(self, stop_event: threading.Event | None = None) -> int:
+        """Watches the directories until `stop_event` is set and returns the number of categorized files."""
+        stop_event = stop_event or threading.Event()
+        os.makedirs(self.output_dir, exist_ok=True)
+        watcher = InotifyWatcher.create(self.directories) if self.use_inotify else None
+        rescan_interval = RESCAN_INTERVAL if watcher is not None else self.poll_interval
+        watcher = watcher or PollingWatcher(self.poll_interval, stop_event)
+        logger.info("Watching %s for new exports with %s (%s workers), outputs go to '%s'.", self.directories, type(watcher).__name__, self.workers, self.output_dir)
+
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self.rule_set, self.chunk_size, self.incremental, self.columnar_cache, self.bank_format)) as pool:
+            # Start every worker now, so the first file does not wait for a process and the rules
+            for future in [pool.submit(os.getpid) for _ in range(self.workers)]:
+                future.result()
+            dispatcher = threading.Thread(target=self._dispatch, args=(pool,), name="watch-dispatcher", daemon=True)
+            dispatcher.start()
+            try:
+                last_scan = 0.0
+                while not stop_event.is_set():
+                    if time.monotonic() - last_scan >= rescan_interval or self.pending:
+                        for path in self.scan():
+                            self.offer(path, False, stop_event)
+                        last_scan = time.monotonic()
+                    paths, rescan = watcher.wait(min(self.poll_interval, 0.5))
+                    for path in paths:
+                        self.offer(path, True, stop_event)
+                    if rescan:
+                        last_scan = 0.0
+            finally:
+                watcher.close()
+                self.queue.put(None)  # The dispatcher submits the files still queued, then the pool finishes them
+                dispatcher.join()
+        logger.info("Stopped watching after %s categorized files.", self.files_done)
+        return self.files_done
+
+    def _dispatch(self, pool: ProcessPoolExecutor) -> None:
+        """Hands the queued files to the pool, at most one per worker at a time."""
+        slots = threading.Semaphore(self.workers)
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            slots.acquire()
+            path, signature, arrived = item
+            future = pool.submit(_run_file, path, BatchProcessor.output_path_for(path, self.output_dir), False)
+            future.add_done_callback(lambda future, path=path, signature=signature, arrived=arrived: self._finished(future, path, signature, arrived, slots))
+
+    def _finished(self, future, path: str, signature: tuple[int, int], arrived: float, slots: threading.Semaphore) -> None:
+        """Records the outcome of one file (called from the pool's result thread)."""
+        try:
+            row_count, _ = future.result()
+        except Exception as e:  # A broken file must not stop the watcher
+            logger.error("Categorizing '%s' failed: %s", path, e)
+        else:
+            self.files_done += 1
+            logger.info("Categorized %s rows of '%s' %.2fs after it arrived.", row_count, path, time.monotonic() - arrived, extra={"rate_limit": True})
+        with self.lock:
+            self.processed[path] = signature  # Failed files are only retried once they change
+            self.queued.discard(path)
+        slots.release()
@@ -0,0 +1,60 @@
+# system imports
+import queue
+import threading
+
+# local imports
+from .aggregation import SummaryAggregator
+from .category_memo import CategoryMemo
+from .export import Exporter
+from .pipeline import Pipeline, CancelledError
+from .profiling import RunProfile
+from .results import CategorizationResult
+from .rule_set import RuleSet
+from .rule_stats import RuleStats
+from ..utils.logging import logger
+
+
+class CategorizeWorker(threading.Thread):
+    """Runs a Pipeline on a background thread and reports back through a message queue.
+
+    Messages are tuples: ("progress", rows, fraction, rows_per_sec), ("done", rows),
+    ("cancelled", message) or ("error", message). The GUI polls `messages` from its own thread.
+    """
+    def __init__(self, rule_set: RuleSet, input_path: str, output_path: str, chunk_size: int = 50_000, bank_format: str | None = None, memo: CategoryMemo | None = None, rule_stats: RuleStats | None = None, export: Exporter | None = None) -> None:
+        super().__init__(name="CategorizeWorker", daemon=True)
+        self.pipeline = Pipeline(rule_set, chunk_size, bank_format=bank_format, memo=memo, rule_stats=rule_stats)
+        self.input_path = input_path
+        self.output_path = output_path
+        self.export = export  # Additional export formats written in the same pass
+        self.result = CategorizationResult(rule_set.categories)  # Filled while running, complete after "done"
+        self.profile = RunProfile(rule_set)  # Stage timings and rule statistics of the run
+        self.summary = SummaryAggregator(rule_set.categories)  # Monthly/weekly totals per category
+        self.messages = queue.Queue()
+        self.cancel_event = threading.Event()
+
+    def __str__(self) -> str:
+        """Returns a string representation of the CategorizeWorker instance."""
+        return f"CategorizeWorker: \n  -> input_path= {self.input_path},\n  -> output_path= {self.output_path}"
+
+    def run(self) -> None:
+        """Categorizes the input file and posts the outcome to the message queue."""
+        try:
+            row_count = self.pipeline.run(self.input_path, self.output_path, progress=self.report_progress, cancel_event=self.cancel_event, result=self.result, profile=self.profile, summary=self.summary, export=self.export)
+        except CancelledError as e:
+            self.messages.put(("cancelled", str(e)))
+        except (OSError, ValueError) as e:
+            logger.error("Categorization failed: %s", e)
+            self.messages.put(("error", str(e)))
+        except Exception as e:  # Anything else must not leave the GUI waiting forever
+            logger.exception("Categorization failed unexpectedly: %s", e)
+            self.messages.put(("error", f"{type(e).__name__}: {e}"))
+        else:
+            self.messages.put(("done", row_count))
+
+    def report_progress(self, rows: int, fraction: float, rows_per_sec: float) -> None:
+        """Posts a progress update (called from the worker thread)."""
+        self.messages.put(("progress", rows, fraction, rows_per_sec))
+
+    def cancel(self) -> None:
+        """Requests the worker to stop after the current chunk."""
+        self.cancel_event.set()
@@ -1,3 +1,17 @@
-__all__ = ["app"]
+__all__ = ["app", "preview_table", "stats_panel", "summary_panel"]
 
 from .app import App
+
+
+def __getattr__(name):
+    """Imports the result panels only on first use, they need the numeric engine which the window does not wait for."""
+    if name == "PreviewTable":
+        from .preview_table import PreviewTable
+        return PreviewTable
+    if name == "StatsPanel":
+        from .stats_panel import StatsPanel
+        return StatsPanel
+    if name == "SummaryPanel":
+        from .summary_panel import SummaryPanel
+        return SummaryPanel
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
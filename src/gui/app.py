@@ -1,21 +1,33 @@
 # system imports
+import threading
 import tkinter as tk
 from tkinter import ttk
+from tkinter import messagebox
 import customtkinter as ctk
 
 # local imports
 from .window_manager import WindowManager
-from ..classes import SettingsManager
-from ..classes import PresetManager
-from ..classes import DataManager
 from ..utils import FileDialogHelper 
+from ..utils import StartupTimer
 from ..utils.logging import logger
 
+# The managers and the numeric engine (numpy) are imported on a background thread while the window is built
+
+# Milliseconds between the checks whether the background imports have finished
+BACKEND_POLL_MS = 20
+
+
 class App:
     """Main Application Class"""
-    def __init__(self, main, monitor_idx=None) -> None:
+    def __init__(self, main, monitor_idx=None, startup: StartupTimer | None = None) -> None:
         # Log application startup
         logger.info("Application is starting ...")
+        self.startup = startup or StartupTimer()
+        self.startup.mark("imports")
+
+        # Import the backend while the window is built
+        self.backend_thread = threading.Thread(target=self.import_backend, name="backend-import", daemon=True)
+        self.backend_thread.start()
 
         self.main = main
         self.main.title("CSV Formatter")
@@ -23,25 +35,73 @@ class App:
 
         # Initialize window manager
         self.window_manager = WindowManager(self, monitor_idx)
+        self.startup.mark("window")
 
         # Default settings
         self.settings_path = "./data/settings.json"
 
+        # Managers are created once the window is shown (see load_backend)
+        self.settings_manager = None
+        self.preset_manager = None
+        self.data_manager = None
+        self.backend_widgets = []  # Widgets that need the managers, disabled until they are loaded
+
+        # Create GUI components
+        self.create_widgets()
+        self.startup.mark("widgets")
+
+        # Load the presets and the categories after the first frame
+        self.main.after_idle(self.on_first_frame)
+
+        # Initialize file dialog helper
+        self.file_dialog_helper = FileDialogHelper() 
+
+        # Background categorization worker (None while idle) and the result of the last run
+        self.worker = None
+        self.last_result = None
+        self.last_profile = None
+        self.last_summary = None
+
+    def import_backend(self) -> None:
+        """Imports the managers and the engine on a background thread, so the Tk thread finds them in sys.modules."""
+        from .. import classes, engine  # noqa: F401
+        self.startup.mark("backend_imports")
+
+    def on_first_frame(self) -> None:
+        """Called on the first idle of the event loop, when the window is drawn."""
+        self.startup.mark("first_frame")
+        self.load_backend()
+
+    def load_backend(self) -> None:
+        """Creates the managers, loads the current preset and starts filling the Treeviews."""
+        if self.backend_thread.is_alive():
+            self.main.after(BACKEND_POLL_MS, self.load_backend)
+            return
+        from ..classes import SettingsManager, PresetManager, DataManager
+        from ..classes.preset_manager import AUTO_LABEL
+        from ..engine.bank_formats import BANK_FORMATS
+
         # Initialize settings manager
         self.settings_manager = SettingsManager(self, self.settings_path)
 
         # Initialize preset manager
         self.preset_manager = PresetManager(self, self.settings_path)
+        self.presetMenu.configure(variable=self.preset_manager.selected_preset, values=self.preset_manager.presets)
+        self.bankMenu.configure(values=[AUTO_LABEL, *BANK_FORMATS])
+        self.preset_manager.get_bank_format()  # Load the bank format from the current preset
+        self.preset_manager.get_paths()  # Load the paths from the current preset
+        self.startup.mark("presets")
 
-        # Create GUI components
-        self.create_widgets()
-
-        # Initialize data manager
-        self.data_manager = DataManager(app=self)
+        # Initialize data manager, it fills the Treeviews in batches and calls on_categories_loaded
+        self.data_manager = DataManager(app=self, on_loaded=self.on_categories_loaded)
         logger.debug(self.data_manager)
 
-        # Initialize file dialog helper
-        self.file_dialog_helper = FileDialogHelper() 
+    def on_categories_loaded(self) -> None:
+        """Enables the widgets that need the managers and reports the startup times."""
+        for widget in self.backend_widgets:
+            widget.configure(state="normal")
+        self.startup.mark("ready")
+        self.startup.report()
 
     def create_widgets(self) -> None:
         """Creates the main GUI components."""
@@ -52,6 +112,9 @@ class App:
         ## Bank Option
         bankoption = ctk.CTkLabel(bankFrame, text="Bank:")
         bankoption.pack(padx=5, pady=5, side="left")
+        self.bankMenu = ctk.CTkOptionMenu(bankFrame, values=[], command=lambda label: self.preset_manager.set_bank_format(label))
+        self.bankMenu.pack(padx=5, pady=5, side="left")
+        self.backend_widgets.append(self.bankMenu)
 
 
 
@@ -77,12 +140,10 @@ class App:
         btnFileOutput = ctk.CTkButton(csvPaths, text="Datei auswählen", command=lambda: self.file_dialog_helper.open_fileDialog(self.OutputEntry))
         btnFileOutput.grid(row=1, column=2, padx=5, pady=5, sticky="ew")
 
-        ## Load the paths from the current preset
-        self.preset_manager.get_paths()  # Load the paths from the current preset
-        
         ## Save Button
         btnSavePaths = ctk.CTkButton(csvPaths, text="Speichert Pfade", command=lambda: self.preset_manager.set_paths(self.InputEntry.get(), self.OutputEntry.get()))
         btnSavePaths.grid(row=2, column=2, padx=5, pady=5, sticky="ew")
+        self.backend_widgets.append(btnSavePaths)
     
 
 
@@ -94,10 +155,12 @@ class App:
         ## Add an Input Category
         btnAddCategoryInput = ctk.CTkButton(inputFrame, text="Kategorie hinzufügen", command=lambda: self.data_manager.add_category(self.treeInput))
         btnAddCategoryInput.grid(row=0, column=0, padx=5, pady=5, sticky="ew")
+        self.backend_widgets.append(btnAddCategoryInput)
 
         ## Delete an Input Category
         btnDeleteCategoryInput = ctk.CTkButton(inputFrame, text="Kategorie löschen", command=lambda: self.data_manager.delete_category(self.treeInput))
         btnDeleteCategoryInput.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
+        self.backend_widgets.append(btnDeleteCategoryInput)
     
         ## Create the Input Treeview widget
         self.treeInput = ttk.Treeview(inputFrame, columns=("category", "filters", "dateFrom", "dateTo", "minValue", "maxValue"), show="headings")
@@ -126,10 +189,12 @@ class App:
         ## Add an Output Category
         btnAddCategoryOutput = ctk.CTkButton(outputFrame, text="Kategorie hinzufügen", command=lambda: self.data_manager.add_category(self.treeOutput))
         btnAddCategoryOutput.grid(row=0, column=0, padx=5, pady=5, sticky="ew")
+        self.backend_widgets.append(btnAddCategoryOutput)
 
         ## Delete an Output Category
         btnDeleteCategoryOutput = ctk.CTkButton(outputFrame, text="Kategorie löschen", command=lambda: self.data_manager.delete_category(self.treeOutput))
         btnDeleteCategoryOutput.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
+        self.backend_widgets.append(btnDeleteCategoryOutput)
 
         ## Create the Output Treeview widget
         self.treeOutput = ttk.Treeview(outputFrame, columns=("category", "filters", "dateFrom", "dateTo", "minValue", "maxValue"), show="headings")
@@ -157,6 +222,29 @@ class App:
         ## Save all Categories
         btnSaveCategories = ctk.CTkButton(saveFrame, text="Speichere Kategorien", command=lambda: self.data_manager.save_all_treeviews(self.treeInput, self.treeOutput))
         btnSaveCategories.pack(padx=5, pady=5, side="top")
+        self.backend_widgets.append(btnSaveCategories)
+
+        ## Categorize the input file into the output file
+        self.btnCategorize = ctk.CTkButton(saveFrame, text="Kategorisieren", command=self.run_categorization)
+        self.btnCategorize.pack(padx=5, pady=5, side="top")
+        self.backend_widgets.append(self.btnCategorize)
+
+        ## Progress of a running categorization
+        progressFrame = ctk.CTkFrame(saveFrame, fg_color="transparent")
+        progressFrame.pack(fill="x", expand=False, padx=5, pady=5, side="top")
+        self.progressBar = ctk.CTkProgressBar(progressFrame)
+        self.progressBar.set(0)
+        self.progressBar.pack(padx=5, pady=5, side="left", fill="x", expand=True)
+        self.progressLabel = ctk.CTkLabel(progressFrame, text="", width=220)
+        self.progressLabel.pack(padx=5, pady=5, side="left")
+        self.btnCancel = ctk.CTkButton(progressFrame, text="Abbrechen", state="disabled", command=self.cancel_categorization)
+        self.btnCancel.pack(padx=5, pady=5, side="left")
+        self.btnPreview = ctk.CTkButton(progressFrame, text="Vorschau", state="disabled", command=self.show_preview)
+        self.btnPreview.pack(padx=5, pady=5, side="left")
+        self.btnStats = ctk.CTkButton(progressFrame, text="Statistik", state="disabled", command=self.show_stats)
+        self.btnStats.pack(padx=5, pady=5, side="left")
+        self.btnSummary = ctk.CTkButton(progressFrame, text="Übersicht", state="disabled", command=self.show_summary)
+        self.btnSummary.pack(padx=5, pady=5, side="left")
 
 
 
@@ -178,14 +266,15 @@ class App:
         ## Delete preset
         self.btnDelPreset = ctk.CTkButton(presetsFrame, text="Löschen", command=lambda: self.preset_manager.delete_preset(self.presetEntry.get()))
         self.btnDelPreset.pack(padx=5, pady=5, side="left")
+        self.backend_widgets.extend([self.btnAddPreset, self.btnDelPreset])
 
         ## Option menu
         self.presetMenu = ctk.CTkOptionMenu(presetsFrame, # window frame
-                                           variable=self.preset_manager.selected_preset, # selected preset at the moment
-                                           values=self.preset_manager.presets, # a list of all presets ("*"" makes a tuple out of the list)
-                                           command=self.preset_manager.on_preset_change  # Callback for when the preset changes
+                                           values=[], # the presets and the selected one are set once they are loaded (see load_backend)
+                                           command=lambda sel_preset: self.preset_manager.on_preset_change(sel_preset)  # Callback for when the preset changes
                                            )
         self.presetMenu.pack(padx=5, pady=5, ipadx=20, side="right", expand=True, anchor="w")
+        self.backend_widgets.append(self.presetMenu)
 
         ## Label preset menu
         presetLabel = ctk.CTkLabel(presetsFrame, text="Select Preset: ")
@@ -193,6 +282,10 @@ class App:
 
 
 
+        # Disabled until the managers are loaded
+        for widget in self.backend_widgets:
+            widget.configure(state="disabled")
+
         # Keyboard shortcut bindings
 
         ## Bind the delete key to all treeviews
@@ -212,17 +305,123 @@ class App:
         if current_preset in self.preset_manager.presets:
             self.presetMenu.set(current_preset)
         else:
-            logger.critical(f"Failed to update preset option menu: the current preset '{current_preset}' is not among the available presets.")
+            logger.critical("Failed to update preset option menu: the current preset '%s' is not among the available presets.", current_preset)
             raise ValueError(f"Failed to update preset option menu: the current preset '{current_preset}' is not among the available presets.")
         logger.debug("Preset optionsmenu updated.")
 
 
 
+    def run_categorization(self) -> None:
+        """Starts categorizing the input file into the output file on a background thread."""
+        if self.worker is not None:
+            logger.warning("A categorization is already running.")
+            return
+        from ..engine import CategorizeWorker, Exporter
+        from ..engine.bank_formats import AUTO_FORMAT
+        try:
+            rule_set = self.data_manager.get_rule_set()
+            # Optional 'export' settings of the preset: directory, formats, compression, partition
+            export_config = self.preset_manager.preset_data.get("export")
+            export = Exporter.from_config(export_config, self.InputEntry.get(), rule_set.categories) if export_config else None
+        except (OSError, ValueError) as e:
+            logger.error("Categorization failed: %s", e)
+            messagebox.showerror("Error", f"Categorization failed:\n{e}")
+            return
+
+        self.worker = CategorizeWorker(rule_set, self.InputEntry.get(), self.OutputEntry.get(), bank_format=self.preset_manager.preset_data.get("bank_format", AUTO_FORMAT), memo=self.preset_manager.get_category_memo(), rule_stats=self.preset_manager.get_rule_stats(), export=export)
+        self.worker.start()
+        logger.info("Categorization started...")
+
+        # Update the widgets for the running state
+        self.btnCategorize.configure(state="disabled")
+        self.btnCancel.configure(state="normal")
+        self.progressBar.set(0)
+        self.progressLabel.configure(text="0 Zeilen")
+        self.main.after(100, self.poll_worker)
+
+    def poll_worker(self) -> None:
+        """Processes the messages of the background worker on the Tk thread."""
+        finished = None
+        alive = self.worker.is_alive()  # Checked before draining, so a last message posted meanwhile is not missed
+        while not self.worker.messages.empty():
+            message = self.worker.messages.get_nowait()
+            if message[0] == "progress":
+                _, rows, fraction, rows_per_sec = message
+                self.progressBar.set(fraction)
+                self.progressLabel.configure(text=f"{rows:,} Zeilen ({rows_per_sec:,.0f}/s)".replace(",", "."))
+            else:
+                finished = message
+
+        if finished is None and not alive:
+            finished = ("error", "The categorization stopped unexpectedly, see the log for details.")
+        if finished is None:
+            self.main.after(100, self.poll_worker)
+            return
+
+        # Reset the widgets and report the result
+        finished_worker, self.worker = self.worker, None
+        self.btnCategorize.configure(state="normal")
+        self.btnCancel.configure(state="disabled")
+        status, detail = finished
+        if status == "done":
+            self.progressBar.set(1)
+            self.last_result = finished_worker.result
+            self.last_profile = finished_worker.profile
+            self.last_summary = finished_worker.summary
+            self.btnPreview.configure(state="normal")
+            self.btnStats.configure(state="normal")
+            self.btnSummary.configure(state="normal")
+            messagebox.showinfo("Info", f"{detail} rows categorized.")
+        elif status == "cancelled":
+            self.progressBar.set(0)
+            self.progressLabel.configure(text="Abgebrochen")
+        else:
+            messagebox.showerror("Error", f"Categorization failed:\n{detail}")
+
+    def show_preview(self) -> None:
+        """Opens a window with a paged preview of the last categorization result."""
+        if self.last_result is None:
+            return
+        from .preview_table import PreviewTable
+        previewWindow = ctk.CTkToplevel(self.main)
+        previewWindow.title("Vorschau")
+        previewWindow.geometry("900x650")
+        PreviewTable(previewWindow, self.last_result)
+
+    def show_stats(self) -> None:
+        """Opens a window with the stage timings and rule statistics of the last run."""
+        if self.last_profile is None:
+            return
+        from .stats_panel import StatsPanel
+        statsWindow = ctk.CTkToplevel(self.main)
+        statsWindow.title("Statistik")
+        statsWindow.geometry("800x600")
+        StatsPanel(statsWindow, self.last_profile)
+
+    def show_summary(self) -> None:
+        """Opens a window with the monthly/weekly category summaries of the last run."""
+        if self.last_summary is None:
+            return
+        from .summary_panel import SummaryPanel
+        summaryWindow = ctk.CTkToplevel(self.main)
+        summaryWindow.title("Übersicht")
+        summaryWindow.geometry("800x600")
+        SummaryPanel(summaryWindow, self.last_summary)
+
+    def cancel_categorization(self) -> None:
+        """Asks the running background worker to stop."""
+        if self.worker is not None:
+            self.worker.cancel()
+            self.btnCancel.configure(state="disabled")
+            logger.info("Cancelling categorization...")
+
+
+
     # Methods for Keyboard shortcuts
 
     def kb_tree_delete_row(self, event) -> None:
         """Handles the delete key event for treeviews."""
-        if event.keysym == "Delete":
+        if event.keysym == "Delete" and self.data_manager is not None:
             # Check which treeview is focused and delete the selected item
             if self.main.focus_get() == self.treeInput:
                 self.data_manager.delete_category(self.treeInput)
@@ -0,0 +1,162 @@
+# system imports
+import numpy as np
+from tkinter import ttk
+import customtkinter as ctk
+
+# local imports
+from ..engine import CategorizationResult
+from ..utils.logging import logger
+
+# Label of the filter entry that shows every category / rows without a category
+ALL_CATEGORIES = "Alle Kategorien"
+UNCATEGORIZED = "(ohne Kategorie)"
+
+
+def _format_amount(cents: int) -> str:
+    """Formats cents as German decimal amount ("-1.234,56")."""
+    return f"{cents / 100:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def _format_date(date: np.datetime64) -> str:
+    """Formats a date as DD.MM.YYYY."""
+    if np.isnat(date):
+        return ""
+    year, month, day = str(date).split("-")
+    return f"{day}.{month}.{year}"
+
+
+class PreviewTable:
+    """Virtualized table over a CategorizationResult.
+
+    The Treeview only ever holds the visible window of rows. Sorting and filtering work on an
+    index array into the result columns, so neither rebuilds the widget.
+    """
+    COLUMNS = ("date", "amount", "description", "category")
+
+    def __init__(self, parent, result: CategorizationResult, visible_rows: int = 25) -> None:
+        self.parent = parent
+        self.result = result
+        self.visible_rows = visible_rows
+        self.dates, self.amounts, self.descriptions, self.category_ids = result.columns()
+
+        # Row order and filter as index arrays, `view` holds the rows that are currently listed
+        self.order = np.arange(len(self.dates))
+        self.filter_mask = np.ones(len(self.dates), dtype=bool)
+        self.view = self.order
+        self.offset = 0
+        self.sort_column = None
+        self.sort_descending = False
+
+        self.create_widgets()
+        self.render()
+
+        logger.debug("%s", self)
+
+    def __str__(self) -> str:
+        """Returns a string representation of the PreviewTable instance."""
+        return f"PreviewTable: \n  -> rows= {len(self.dates)},\n  -> visible_rows= {self.visible_rows}"
+
+    def create_widgets(self) -> None:
+        """Creates the table, scrollbar, paging and filter widgets."""
+        # Frame for the category filter and paging
+        controlFrame = ctk.CTkFrame(self.parent)
+        controlFrame.pack(fill="x", expand=False, padx=10, pady=5)
+
+        ## Category filter
+        filterLabel = ctk.CTkLabel(controlFrame, text="Kategorie:")
+        filterLabel.pack(padx=5, pady=5, side="left")
+        self.filterMenu = ctk.CTkOptionMenu(controlFrame, values=[ALL_CATEGORIES, UNCATEGORIZED] + self.result.categories, command=self.apply_filter)
+        self.filterMenu.pack(padx=5, pady=5, side="left")
+
+        ## Paging
+        btnNextPage = ctk.CTkButton(controlFrame, text=">", width=40, command=lambda: self.scroll(self.visible_rows))
+        btnNextPage.pack(padx=5, pady=5, side="right")
+        self.pageLabel = ctk.CTkLabel(controlFrame, text="")
+        self.pageLabel.pack(padx=5, pady=5, side="right")
+        btnPrevPage = ctk.CTkButton(controlFrame, text="<", width=40, command=lambda: self.scroll(-self.visible_rows))
+        btnPrevPage.pack(padx=5, pady=5, side="right")
+
+        # Frame for the table
+        tableFrame = ctk.CTkFrame(self.parent)
+        tableFrame.pack(fill="both", expand=True, padx=10, pady=5)
+
+        ## Treeview with a fixed number of rows, the scrollbar drives the offset instead of the widget
+        self.tree = ttk.Treeview(tableFrame, columns=self.COLUMNS, show="headings", height=self.visible_rows)
+        for col, text, width in zip(self.COLUMNS, ("Datum", "Betrag", "Verwendungszweck", "Kategorie"), (90, 100, 450, 150)):
+            self.tree.heading(col, text=text, command=lambda c=col: self.sort_by(c))
+            self.tree.column(col, width=width, stretch=(col == "description"), anchor="w" if col == "description" else "center")
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scrollbar = ttk.Scrollbar(tableFrame, orient="vertical", command=self.on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+
+        ## Mouse wheel scrolling (Windows/macOS and X11)
+        self.tree.bind("<MouseWheel>", lambda event: self.scroll(-3 if event.delta > 0 else 3))
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll(3))
+
+    def render(self) -> None:
+        """Materializes only the visible window of rows in the Treeview."""
+        self.tree.delete(*self.tree.get_children())
+        rows = self.view[self.offset:self.offset + self.visible_rows]
+        lookup = self.result.categories + [""]
+        for row in rows:
+            self.tree.insert("", "end", values=(
+                _format_date(self.dates[row]),
+                _format_amount(int(self.amounts[row])),
+                self.descriptions[row],
+                lookup[self.category_ids[row]],
+            ))
+
+        # Update scrollbar and page indicator
+        total = len(self.view)
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.visible_rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        page_count = max(1, -(-total // self.visible_rows))
+        self.pageLabel.configure(text=f"Seite {self.offset // self.visible_rows + 1} / {page_count} ({total} Zeilen)")
+
+    def scroll(self, rows: int) -> None:
+        """Moves the visible window by a number of rows."""
+        max_offset = max(0, len(self.view) - self.visible_rows)
+        self.offset = min(max(0, self.offset + rows), max_offset)
+        self.render()
+
+    def on_scrollbar(self, action: str, value: str, unit: str | None = None) -> None:
+        """Translates scrollbar commands ('moveto' or 'scroll') into row offsets."""
+        if action == "moveto":
+            self.offset = 0
+            self.scroll(int(float(value) * len(self.view)))
+        elif action == "scroll":
+            self.scroll(int(value) * (self.visible_rows if unit == "pages" else 1))
+
+    def sort_by(self, column: str) -> None:
+        """Sorts all rows by a column, a second click on the same column reverses the order."""
+        self.sort_descending = not self.sort_descending if self.sort_column == column else False
+        self.sort_column = column
+        keys = {
+            "date": self.dates,
+            "amount": self.amounts,
+            "description": self.descriptions.astype(str),
+            "category": self.result.labels(),
+        }[column]
+        self.order = np.argsort(keys, kind="stable")
+        if self.sort_descending:
+            self.order = self.order[::-1]
+        self.update_view()
+
+    def apply_filter(self, category: str) -> None:
+        """Shows only rows of one category without rebuilding the widget."""
+        if category == ALL_CATEGORIES:
+            self.filter_mask = np.ones(len(self.dates), dtype=bool)
+        elif category == UNCATEGORIZED:
+            self.filter_mask = self.category_ids < 0
+        else:
+            self.filter_mask = self.category_ids == self.result.categories.index(category)
+        self.update_view()
+
+    def update_view(self) -> None:
+        """Recomputes the listed rows from the sort order and filter and jumps to the top."""
+        self.view = self.order[self.filter_mask[self.order]]
+        self.offset = 0
+        self.render()
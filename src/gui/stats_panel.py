@@ -0,0 +1,67 @@
+# system imports
+from tkinter import ttk
+import customtkinter as ctk
+
+# local imports
+from ..engine import RunProfile
+from ..utils.logging import logger
+
+
+class StatsPanel:
+    """Shows the stage timings and the per-rule statistics of a RunProfile."""
+    def __init__(self, parent, profile: RunProfile) -> None:
+        self.parent = parent
+        self.report = profile.to_dict()
+        self.create_widgets()
+
+        logger.debug("%s", self)
+
+    def __str__(self) -> str:
+        """Returns a string representation of the StatsPanel instance."""
+        return f"StatsPanel: \n  -> total_seconds= {self.report['total_seconds']},\n  -> rules= {len(self.report['rules'])}"
+
+    def create_widgets(self) -> None:
+        """Creates the stage and rule tables."""
+        # Frame for the pipeline stages
+        stageFrame = ctk.CTkFrame(self.parent)
+        stageFrame.pack(fill="x", expand=False, padx=10, pady=5)
+
+        ## Summary
+        dead_rules = len(self.report["dead_rules"])
+        summaryLabel = ctk.CTkLabel(stageFrame, text=f"Gesamtzeit: {self.report['total_seconds']:.3f} s, geprüfte Regeln je Buchung: {self.report['avg_rules_evaluated']:.2f}, Regeln ohne Treffer: {dead_rules}")
+        summaryLabel.pack(padx=5, pady=5, side="top", anchor="w")
+
+        ## Stage table
+        stageTree = ttk.Treeview(stageFrame, columns=("stage", "seconds", "rows", "rate"), show="headings", height=len(RunProfile.STAGES))
+        for col, text in zip(("stage", "seconds", "rows", "rate"), ("Schritt", "Zeit (s)", "Zeilen", "Zeilen/s")):
+            stageTree.heading(col, text=text)
+            stageTree.column(col, width=120, stretch=True, anchor="center")
+        for name, stats in self.report["stages"].items():
+            rate = f"{stats['rows'] / stats['seconds']:,.0f}" if stats["seconds"] > 0 else ""
+            stageTree.insert("", "end", values=(name, f"{stats['seconds']:.4f}", stats["rows"], rate))
+        stageTree.pack(padx=5, pady=5, fill="x")
+
+        # Frame for the rules, the most expensive first
+        ruleFrame = ctk.CTkFrame(self.parent)
+        ruleFrame.pack(fill="both", expand=True, padx=10, pady=5)
+
+        ## Rule table
+        columns = ("category", "filters", "direction", "hits", "evaluated", "ms")
+        ruleTree = ttk.Treeview(ruleFrame, columns=columns, show="headings")
+        for col, text in zip(columns, ("Kategorie", "Suchbegriff", "Richtung", "Treffer", "Geprüfte Zeilen", "Zeit (ms)")):
+            ruleTree.heading(col, text=text)
+            ruleTree.column(col, width=110, stretch=True, anchor="center")
+        ruleTree.tag_configure("dead", foreground="gray")
+        for entry in self.report["rules"]:
+            ruleTree.insert("", "end", values=(
+                entry["category"],
+                entry["filters"],
+                entry["direction"],
+                entry["hits"],
+                entry["evaluated_rows"],
+                f"{entry['seconds'] * 1000:.2f}",
+            ), tags=("dead",) if entry["hits"] == 0 else ())
+        ruleTree.pack(side="left", fill="both", expand=True, padx=5, pady=5)
+        scrollbar = ttk.Scrollbar(ruleFrame, orient="vertical", command=ruleTree.yview)
+        ruleTree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
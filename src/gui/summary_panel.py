@@ -0,0 +1,70 @@
+# system imports
+from tkinter import ttk
+import customtkinter as ctk
+
+# local imports
+from ..engine import SummaryAggregator
+from ..utils.logging import logger
+
+# Period names shown in the selector
+PERIOD_LABELS = {"month": "Monat", "week": "Woche"}
+
+
+class SummaryPanel:
+    """Shows the per-category totals of a SummaryAggregator by month or ISO week."""
+    def __init__(self, parent, summary: SummaryAggregator) -> None:
+        self.parent = parent
+        self.summary = summary
+        self.create_widgets()
+        self.show_period(summary.periods[0])
+
+        logger.debug("%s", self)
+
+    def __str__(self) -> str:
+        """Returns a string representation of the SummaryPanel instance."""
+        return f"SummaryPanel: \n  -> periods= {self.summary.periods},\n  -> skipped= {self.summary.skipped}"
+
+    def create_widgets(self) -> None:
+        """Creates the period selector and the summary table."""
+        # Frame for the period selector
+        controlFrame = ctk.CTkFrame(self.parent)
+        controlFrame.pack(fill="x", expand=False, padx=10, pady=5)
+
+        ## Period selector
+        labels = [PERIOD_LABELS.get(period, period) for period in self.summary.periods]
+        self.periodButton = ctk.CTkSegmentedButton(controlFrame, values=labels, command=lambda label: self.show_period(self.summary.periods[labels.index(label)]))
+        self.periodButton.pack(padx=5, pady=5, side="left")
+
+        ## Rows without a valid date or amount are not part of the summary
+        skippedLabel = ctk.CTkLabel(controlFrame, text=f"Ohne gültiges Datum/Betrag: {self.summary.skipped}")
+        skippedLabel.pack(padx=5, pady=5, side="right")
+
+        # Frame for the summary table
+        tableFrame = ctk.CTkFrame(self.parent)
+        tableFrame.pack(fill="both", expand=True, padx=10, pady=5)
+
+        ## Summary table
+        columns = ("period", "category", "total", "count", "min", "max", "mean")
+        self.tree = ttk.Treeview(tableFrame, columns=columns, show="headings")
+        for col, text in zip(columns, ("Zeitraum", "Kategorie", "Summe", "Anzahl", "Min.", "Max.", "Mittelwert")):
+            self.tree.heading(col, text=text)
+            self.tree.column(col, width=100, stretch=True, anchor="center")
+        self.tree.pack(side="left", fill="both", expand=True, padx=5, pady=5)
+        scrollbar = ttk.Scrollbar(tableFrame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+
+    def show_period(self, period: str) -> None:
+        """Fills the table with the summary of one period."""
+        self.periodButton.set(PERIOD_LABELS.get(period, period))
+        self.tree.delete(*self.tree.get_children())
+        for entry in self.summary.rows(period):
+            self.tree.insert("", "end", values=(
+                entry["period"],
+                entry["category"] or "(ohne Kategorie)",
+                f"{entry['total']:.2f}",
+                entry["count"],
+                f"{entry['min']:.2f}",
+                f"{entry['max']:.2f}",
+                f"{entry['mean']:.2f}",
+            ))
@@ -1,16 +1,20 @@
 # system imports
+import threading
 import tkinter as tk
-from screeninfo import get_monitors 
 import customtkinter as ctk
 
 # local imports
 from ..utils.logging import logger
 
+# Milliseconds between the checks whether the monitor query has finished
+MONITOR_POLL_MS = 20
+
 class WindowManager:
     """""Handles the window size and DPI awareness for the application."""
     def __init__(self, app, monitor_idx) -> None:
         self.app = app
         self.monitor_idx = monitor_idx
+        self.monitors = None  # Filled by the background monitor query
         
         # Set CustomTkinter appearance mode and default color theme
         ctk.set_appearance_mode("Light")  # "System" (follows OS), "Dark" or "Light"
@@ -22,19 +26,43 @@ class WindowManager:
         self.app.main.resizable(True, True)
 
         # * DEBUGGING
-        logger.debug(f"{self.__str__()}")
+        logger.debug("%s", self)
 
     def __str__(self) -> str:
         """"Returns a string representation of the WindowManager instance."""
         return f"WindowManager: \n  -> monitor_idx= {self.monitor_idx},\n  -> app= {self.app}"
 
     def center_window(self, window_width, window_height, window_name) -> None:
-        """Sets the position of the window to the center of the screen"""
-        # Update the "requested size" from geometry manager
-        window_name.update_idletasks()
+        """Sets the size of the window now and centers it on the screen once the monitors are known.
+
+        Querying the monitors can take a noticeable time, so it runs on a background thread
+        while the window is already shown.
+        """
+        window_name.geometry(f'{window_width}x{window_height}')
+        threading.Thread(target=self.query_monitors, name="monitor-query", daemon=True).start()
+        self.place_window(window_width, window_height, window_name)
+
+    def query_monitors(self) -> None:
+        """Reads the monitor layout (runs on a background thread, without any Tk calls)."""
+        try:
+            from screeninfo import get_monitors
+            monitors = get_monitors()
+        except Exception as e:  # screeninfo raises its own error type when no display backend is found
+            logger.warning("Could not query the monitors, keeping the window position: %s", e)
+            monitors = []
+        self.monitors = monitors
+
+    def place_window(self, window_width, window_height, window_name) -> None:
+        """Moves the window to the center of the selected monitor as soon as the query has finished."""
+        monitors = self.monitors
+        if monitors is None:
+            window_name.after(MONITOR_POLL_MS, self.place_window, window_width, window_height, window_name)
+            return
+        self.app.startup.mark("monitors")
+        if not monitors:
+            return
 
         # select display by index or default to rightmost
-        monitors = get_monitors()
         if self.monitor_idx is not None and 0 <= self.monitor_idx < len(monitors):
             monitor = monitors[self.monitor_idx]
         else:
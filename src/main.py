@@ -1,23 +1,260 @@
 # system imports
+import os
+import sys
+import json
+import time
 import argparse
-import tkinter as tk
-import customtkinter as ctk
 
-# local imports
-from .gui import App
+# GUI and engine modules are imported inside the run functions, so headless runs start fast
 
-def main():
-    """Entry point for the CSV Formatter application."""
-    # Parse optional monitor argument
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parses the command line arguments."""
     parser = argparse.ArgumentParser(description="CSV Formatter Application")
     parser.add_argument("--monitor", type=int, default=None,
                         help="Index of monitor to launch window on (0-based, default: rightmost)")
-    args = parser.parse_args()
-    
+    parser.add_argument("--headless", action="store_true",
+                        help="Categorize without starting the GUI (implied by --input)")
+    parser.add_argument("--settings", default="./data/settings.json",
+                        help="Path to the settings file next to the preset files (default: ./data/settings.json)")
+    parser.add_argument("--preset", default=None,
+                        help="Preset to categorize with (default: the selected preset in the settings)")
+    parser.add_argument("--input", default=None,
+                        help="CSV file, directory or glob of CSV files to categorize (default: input path of the preset)")
+    parser.add_argument("--output", default=None,
+                        help="Output CSV file, or output directory for a directory/glob input (default: output path of the preset)")
+    parser.add_argument("--merged-output", default=None,
+                        help="For a directory/glob input: additionally merge all outputs into this file")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="For a directory/glob input: number of worker processes (default: available cores)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only categorize rows appended since the last run (falls back to a full run if the input was rewritten)")
+    parser.add_argument("--columnar-cache", action="store_true",
+                        help="Keep the parsed columns of every input in a binary '<input>.colcache' sidecar and reuse them while the input is unchanged")
+    parser.add_argument("--dedup-store", default=None,
+                        help="Leave out transactions already imported from another export, fingerprints are kept in this directory (single files only)")
+    parser.add_argument("--bank", default=None,
+                        help="Bank format of the inputs, e.g. 'Sparkasse' or 'DKB' (default: the bank format of the preset, else auto, detected per file)")
+    parser.add_argument("--category-memo", action="store_true",
+                        help="Remember the categories of recurring transactions in '<preset>.category_memo.json' next to the preset and skip their rule evaluation (single files only)")
+    parser.add_argument("--adaptive-order", action="store_true",
+                        help="Evaluate the rules hit most often in earlier runs first (overlapping rules keep their order); hit counts are kept in '<preset>.rule_stats.json' next to the preset (single files only)")
+    parser.add_argument("--profile-report", default=None,
+                        help="Write stage timings and per-rule hit/cost statistics of a single-file run to this JSON file")
+    parser.add_argument("--summary-report", default=None,
+                        help="Write monthly and weekly totals, counts, min, max and mean per category to this JSON file (in incremental mode only of the newly categorized rows)")
+    parser.add_argument("--export", default=None, metavar="DIRECTORY",
+                        help="Additionally export the categorized rows into this directory in the --export-formats, read in the same pass (single files only, default: the 'export' settings of the preset)")
+    parser.add_argument("--export-formats", default="csv,jsonl,columnar",
+                        help="For --export: comma-separated formats out of csv, jsonl and columnar (default: all)")
+    parser.add_argument("--compression", choices=("none", "gzip", "zstd"), default="none",
+                        help="For --export: compress the exported files (zstd needs Python 3.14 or the 'zstandard' package)")
+    parser.add_argument("--partition", choices=("none", "month", "category"), default="none",
+                        help="For --export: write one file per month or category into 'month=YYYY-MM' or 'category=<name>' subdirectories")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and categorize every CSV export that arrives in the input directory of the preset (or --input) into the output directory (or --output)")
+    parser.add_argument("--poll-interval", type=float, default=1.0,
+                        help="For --watch: seconds between directory scans where inotify is not available, and how long a file's size has to stay unchanged (default: 1)")
+    parser.add_argument("--import-presets", default=None, metavar="DATABASE",
+                        help="Import the JSON presets next to the settings into this SQLite preset store and exit (set 'preset_store' in the settings to use it)")
+    parser.add_argument("--export-presets", default=None, metavar="DATABASE",
+                        help="Export all presets of this SQLite preset store to JSON files next to the settings and exit")
+    parser.add_argument("--startup-report", default=None,
+                        help="Write the GUI startup phases (first frame, presets loaded, ready) with their times to this JSON file")
+    parser.add_argument("--chunk-size", type=int, default=50_000,
+                        help="Number of rows categorized per chunk (default: 50000)")
+    return parser.parse_args(argv)
+
+
+def preset_store_errors() -> tuple[type[Exception], ...]:
+    """Returns the database errors of the preset store, without importing sqlite3 for JSON presets."""
+    sqlite3 = sys.modules.get("sqlite3")
+    return (sqlite3.Error,) if sqlite3 is not None else ()
+
+
+def open_preset_store(settings_path: str, settings: dict):
+    """Returns the PresetStore configured in the settings, None if the presets are JSON files."""
+    store_file = settings.get("preset_store")
+    if not store_file:
+        return None
+    from .engine import PresetStore
+    return PresetStore(os.path.join(os.path.dirname(settings_path), store_file))
+
+
+def load_preset(settings_path: str, preset: str | None) -> tuple[str, dict]:
+    """Returns the name and data of the given (or selected) preset without any GUI state.
+
+    The preset file (or the preset store, opened once and closed again) is read directly.
+    """
+    with open(settings_path, "r") as f:
+        settings = json.load(f)
+    store = open_preset_store(settings_path, settings)
+    try:
+        if preset is None:
+            preset = store.get_setting("selected_preset") if store is not None else settings.get("preset_menu", {}).get("selected_preset")
+            if not preset:
+                raise ValueError(f"No preset given and no selected preset in '{settings_path}'.")
+        if store is not None:
+            return preset, store.load(preset)
+    finally:
+        if store is not None:
+            store.close()
+
+    preset_path = os.path.join(os.path.dirname(settings_path), f"{preset}.json")
+    with open(preset_path, "r") as f:
+        return preset, json.load(f)
+
+
+def run_preset_transfer(args: argparse.Namespace) -> int:
+    """Imports the JSON presets next to the settings into a preset store, or exports the store back to them."""
+    from .engine import PresetStore
+    from .utils.logging import logger
+
+    store = None
+    try:
+        store = PresetStore(args.import_presets or args.export_presets)
+        if args.import_presets:
+            store.import_json(args.settings)
+        else:
+            store.export_json(args.settings)
+    except (OSError, ValueError, *preset_store_errors()) as e:
+        logger.error("Preset transfer failed: %s", e)
+        return 1
+    finally:
+        if store is not None:
+            store.close()
+    return 0
+
+
+def bank_format(args: argparse.Namespace, preset_data: dict) -> str:
+    """Returns the bank format given on the command line, else the one of the preset (like the GUI), else 'auto'."""
+    return args.bank or preset_data.get("bank_format") or "auto"
+
+
+def is_batch_input(input_path: str) -> bool:
+    """Returns True if the input is a directory or a glob pattern of several files."""
+    return os.path.isdir(input_path) or any(char in input_path for char in "*?[")
+
+
+def run_headless(args: argparse.Namespace) -> int:
+    """Categorizes one file (or a directory of files) with the given preset and returns the exit code."""
+    from .engine import CategoryMemo, Deduplicator, Exporter, FingerprintStore, FormatDetector, Pipeline, RuleSet, RuleStats, RunProfile, SummaryAggregator
+    from .utils.logging import logger
+
+    try:
+        preset_name, preset_data = load_preset(args.settings, args.preset)
+        paths = preset_data.get("paths", {})
+        input_path = args.input or paths.get("input_path", "")
+        output_path = args.output or paths.get("output_path", "")
+        if not input_path or not output_path:
+            raise ValueError("Input and output path are required (via arguments or the preset).")
+
+        rule_set = RuleSet.from_preset(preset_data)
+        summary = SummaryAggregator(rule_set.categories) if args.summary_report else None
+        if args.export:
+            export_config = {"directory": args.export, "formats": args.export_formats.split(","), "compression": args.compression, "partition": args.partition}
+        else:
+            export_config = preset_data.get("export")
+        # Detected formats are remembered next to the settings, unchanged exports are not sniffed again
+        detector = FormatDetector(os.path.join(os.path.dirname(args.settings), "bank_formats_cache.json"))
+        if is_batch_input(input_path):
+            if args.dedup_store:
+                raise ValueError("--dedup-store is only supported for single input files.")
+            if args.category_memo:
+                raise ValueError("--category-memo is only supported for single input files.")
+            if args.adaptive_order:
+                raise ValueError("--adaptive-order is only supported for single input files.")
+            if args.export:
+                raise ValueError("--export is only supported for single input files.")
+            if export_config:
+                logger.warning("The export settings of the preset are only used for single input files.")
+            from .engine import BatchProcessor
+            batch = BatchProcessor(rule_set, args.chunk_size, args.workers, args.incremental, args.columnar_cache, bank_format(args, preset_data))
+            batch.run(input_path, output_path, args.merged_output, summary)
+        else:
+            dedup = Deduplicator(FingerprintStore(args.dedup_store)) if args.dedup_store else None
+            memo = None
+            if args.category_memo:
+                memo_path = os.path.join(os.path.dirname(args.settings), f"{preset_name}.category_memo.json")
+                with open(args.settings, "r") as f:
+                    memo_size = json.load(f).get("category_memo_size", 100_000)
+                if memo_size and memo_size > 0:
+                    memo = CategoryMemo(memo_path, memo_size)
+                else:
+                    logger.warning("The category memo is turned off in the settings (category_memo_size %s), categorizing without it.", memo_size)
+            rule_stats = RuleStats(os.path.join(os.path.dirname(args.settings), f"{preset_name}.rule_stats.json")) if args.adaptive_order else None
+            pipeline = Pipeline(rule_set, args.chunk_size, args.incremental, args.columnar_cache, dedup, bank_format(args, preset_data), detector, memo, rule_stats)
+            profile = RunProfile(rule_set) if args.profile_report else None
+            export = Exporter.from_config(export_config, input_path, rule_set.categories) if export_config else None
+            pipeline.run(input_path, output_path, profile=profile, summary=summary, export=export)
+            if profile is not None:
+                profile.save(args.profile_report)
+                logger.info("Profile report written to '%s'.", args.profile_report)
+        if summary is not None:
+            summary.save(args.summary_report)
+            logger.info("Summary report written to '%s'.", args.summary_report)
+    except (OSError, ValueError, *preset_store_errors()) as e:
+        logger.error("Headless categorization failed: %s", e)
+        return 1
+    return 0
+
+
+def run_watch(args: argparse.Namespace) -> int:
+    """Watches the input directory of the preset and categorizes new exports until interrupted."""
+    import signal
+    import threading
+    from .engine import FolderWatcher, RuleSet
+    from .utils.logging import logger
+
+    try:
+        _, preset_data = load_preset(args.settings, args.preset)
+        paths = preset_data.get("paths", {})
+        input_path = args.input or paths.get("input_path", "")
+        output_path = args.output or paths.get("output_path", "")
+        if not input_path or not output_path:
+            raise ValueError("Input and output path are required (via arguments or the preset).")
+
+        # Preset paths usually name files, then their directories are used
+        input_dir = input_path if os.path.isdir(input_path) else os.path.dirname(input_path) or "."
+        output_dir = (os.path.dirname(output_path) or ".") if output_path.lower().endswith(".csv") else output_path
+        watcher = FolderWatcher(RuleSet.from_preset(preset_data), [input_dir], output_dir, args.chunk_size, args.workers, args.incremental, args.columnar_cache, bank_format(args, preset_data), args.poll_interval)
+    except (OSError, ValueError, *preset_store_errors()) as e:
+        logger.error("Watching failed: %s", e)
+        return 1
+
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    try:
+        watcher.run(stop_event)
+    except KeyboardInterrupt:
+        stop_event.set()
+    return 0
+
+
+def run_gui(args: argparse.Namespace) -> int:
+    """Starts the GUI on the desired monitor."""
+    started = time.perf_counter()  # The startup report includes the GUI imports
+    import customtkinter as ctk
+    from .gui import App
+    from .utils import StartupTimer
+
     # Create main window and launch app on desired monitor
     main_window = ctk.CTk()
-    app = App(main_window, monitor_idx=args.monitor)
+    app = App(main_window, monitor_idx=args.monitor, startup=StartupTimer(started, args.startup_report))
     main_window.mainloop()
+    return 0
+
+
+def main(argv=None) -> int:
+    """Entry point for the CSV Formatter application."""
+    args = parse_args(argv)
+    if args.import_presets or args.export_presets:
+        return run_preset_transfer(args)
+    if args.watch:
+        return run_watch(args)
+    if args.headless or args.input:
+        return run_headless(args)
+    return run_gui(args)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
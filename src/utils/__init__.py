@@ -1,4 +1,12 @@
-__all__ = ["helpers", "file_dialog_helper"]
+__all__ = ["helpers", "file_dialog_helper", "startup_timer"]
 
 from .helpers import Helper
-from .file_dialog_helper import FileDialogHelper
+from .startup_timer import StartupTimer
+
+
+def __getattr__(name):
+    """Imports GUI helpers only on first use, so headless runs never load tkinter."""
+    if name == "FileDialogHelper":
+        from .file_dialog_helper import FileDialogHelper
+        return FileDialogHelper
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
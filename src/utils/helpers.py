@@ -1,6 +1,8 @@
 # system imports
 import os
-import json
+
+# local imports
+from .json_store import json_store
 
 class Helper:
     """Helper methods"""
@@ -18,24 +20,26 @@ class Helper:
     
     @staticmethod
     def save_file(file_path: str, file_data: dict) -> None:
-        """Saves a file."""
-        with open(file_path, 'w') as f:
-            json.dump(file_data, f, indent=4)
+        """Saves a file (written behind and atomically by the shared JSON store)."""
+        json_store.write(file_path, file_data)
+
+    @staticmethod
+    def load_file(file_path: str) -> dict:
+        """Loads a JSON file, including changes that are not flushed to disk yet."""
+        return json_store.read(file_path)
+
+    @staticmethod
+    def flush_file(file_path: str | None = None) -> None:
+        """Writes pending changes of a file (or of all files) to disk now."""
+        json_store.flush(file_path)
+
+    @staticmethod
+    def discard_file(file_path: str) -> None:
+        """Drops pending changes of a file that is about to be deleted."""
+        json_store.discard(file_path)
 
     @staticmethod
     def update_json_file(file_path: str, new_data: dict) -> dict:
         """Update JSON file with new data without losing existing content"""
-        # Read existing data
-        existing_data = {}
-        if os.path.exists(file_path):
-            with open(file_path, 'r') as f:
-                existing_data = json.load(f)
-        
-        # Update existing data with new data
-        existing_data.update(new_data)
-        
-        # Write combined data back to file
-        with open(file_path, 'w') as f:
-            json.dump(existing_data, f, indent=4)
-        
-        return existing_data
\ No newline at end of file
+        # Pending writes to the same file are merged in memory and written once
+        return json_store.update(file_path, new_data)
@@ -0,0 +1,138 @@
+# system imports
+import os
+import copy
+import stat
+import json
+import atexit
+import tempfile
+import threading
+
+# local imports
+from .logging import logger
+
+# Permission mask of the process, read once (os.umask can only be read by setting it)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+class JsonStore:
+    """Write-behind store for JSON files.
+
+    Writes are kept in memory and coalesced per file, then flushed together after `delay`
+    seconds without further writes (or on exit). Every flush replaces the file atomically,
+    so a crash mid-write never leaves a truncated file behind.
+    """
+    def __init__(self, delay: float = 0.5) -> None:
+        self.delay = delay
+        self.pending = {}  # path -> document waiting to be written
+        self.lock = threading.RLock()
+        self.timer = None
+
+    def __str__(self) -> str:
+        """Returns a string representation of the JsonStore instance."""
+        return f"JsonStore: \n  -> delay= {self.delay},\n  -> pending= {list(self.pending)}"
+
+    def read(self, path: str) -> dict:
+        """Returns the document of a file, including writes that are not flushed yet."""
+        path = os.path.abspath(path)
+        with self.lock:
+            if path in self.pending:
+                return copy.deepcopy(self.pending[path])
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def write(self, path: str, data: dict) -> None:
+        """Schedules a full replacement of the file. New files are written immediately."""
+        path = os.path.abspath(path)
+        with self.lock:
+            self.pending[path] = copy.deepcopy(data)
+            if not os.path.exists(path):
+                self.flush(path)
+            else:
+                self._schedule()
+
+    def update(self, path: str, new_data: dict) -> dict:
+        """Merges new top-level keys into the file's document and schedules the write."""
+        path = os.path.abspath(path)
+        with self.lock:
+            if path in self.pending:
+                document = self.pending[path]
+            elif os.path.exists(path):
+                with open(path, "r") as f:
+                    document = json.load(f)
+            else:
+                document = {}
+            document.update(copy.deepcopy(new_data))
+            self.pending[path] = document
+            if not os.path.exists(path):
+                self.flush(path)
+            else:
+                self._schedule()
+            return copy.deepcopy(document)
+
+    def flush(self, path: str | None = None, raise_errors: bool = True) -> None:
+        """Writes pending documents (all, or only the given file) to disk.
+
+        A document stays pending until it was written; the first error is raised after all
+        documents were tried (only logged with `raise_errors=False`, e.g. on the timer thread).
+        """
+        error = None
+        with self.lock:
+            if path is not None:
+                path = os.path.abspath(path)
+            paths = list(self.pending) if path is None else [path] if path in self.pending else []
+            for pending_path in paths:
+                try:
+                    self._atomic_write(pending_path, self.pending[pending_path])
+                except OSError as e:
+                    logger.error("Could not save '%s', keeping the changes for the next save: %s", pending_path, e)
+                    error = error or e
+                else:
+                    del self.pending[pending_path]
+            if not self.pending and self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        if error is not None and raise_errors:
+            raise error
+
+    def flush_pending(self) -> None:
+        """Writes all pending documents and only logs failures (debounce timer and exit)."""
+        self.flush(raise_errors=False)
+
+    def discard(self, path: str) -> None:
+        """Drops pending writes of a file (e.g. before deleting it)."""
+        with self.lock:
+            self.pending.pop(os.path.abspath(path), None)
+
+    def _schedule(self) -> None:
+        """(Re)starts the debounce timer."""
+        if self.timer is not None:
+            self.timer.cancel()
+        self.timer = threading.Timer(self.delay, self.flush_pending)
+        self.timer.daemon = True
+        self.timer.start()
+
+    @staticmethod
+    def _atomic_write(path: str, data: dict) -> None:
+        """Writes to a temporary file in the same directory and renames it over the target, keeping its permissions."""
+        directory = os.path.dirname(path) or "."
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK  # Like a file created with open()
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+        try:
+            os.chmod(tmp_path, mode)  # mkstemp creates the file with 0600
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+
+# Create a shared store instance, pending writes are flushed when the interpreter exits
+json_store = JsonStore()
+atexit.register(json_store.flush_pending)
@@ -1,25 +1,162 @@
 # system imports
 import logging
+import logging.handlers
 import os
+import sys
+import time
+import queue
+import atexit
+import threading
+
+# Size of the log file before it is rotated, and the number of rotated files kept
+MAX_LOG_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 3
+
+# Records per call site let through at once, and the seconds until the next burst is allowed
+RATE_LIMIT_BURST = 20
+RATE_LIMIT_INTERVAL = 10.0
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+LOG_DATEFMT = "%m.%d.%Y %I:%M:%S"
+
+
+class RateLimitFilter(logging.Filter):
+    """Lets at most `burst` records per call site through every `interval` seconds.
+
+    Only records logged with extra={"rate_limit": True} are limited, so repeated per-file or
+    per-row messages cannot flood the log while every other call site logs as before. The
+    number of suppressed records is appended to the next record of the call site, or logged by
+    `report` on shutdown. Errors are never dropped.
+    """
+    def __init__(self, burst: int = RATE_LIMIT_BURST, interval: float = RATE_LIMIT_INTERVAL) -> None:
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.windows = {}  # (path, line) -> [window start, records let through, records suppressed, last suppressed record]
+        self.lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.ERROR or not getattr(record, "rate_limit", False):
+            return True
+        now = time.monotonic()
+        with self.lock:
+            window = self.windows.setdefault((record.pathname, record.lineno), [now, 0, 0, None])
+            if now - window[0] >= self.interval:
+                window[0], window[1] = now, 0
+            if window[1] >= self.burst:
+                window[2] += 1
+                window[3] = record
+                return False
+            window[1] += 1
+            suppressed, window[2], window[3] = window[2], 0, None
+        if suppressed:
+            record.msg = f"{record.msg} ({suppressed} similar messages suppressed)"
+        return True
+
+    def report(self) -> list[logging.LogRecord]:
+        """Returns the last suppressed record of every call site with its suppressed count."""
+        with self.lock:
+            records = []
+            for window in self.windows.values():
+                if window[2]:
+                    record = logging.makeLogRecord(window[3].__dict__)
+                    record.msg = f"{record.msg} ({window[2]} similar messages suppressed)"
+                    record.rate_limit = False
+                    records.append(record)
+                window[2], window[3] = 0, None
+        return records
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps only every n-th record of a call site for records logged with extra={"sample": n}."""
+    def __init__(self) -> None:
+        super().__init__()
+        self.counts = {}  # (path, line) -> records seen
+        self.lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        every = getattr(record, "sample", 1)
+        if every <= 1:
+            return True
+        with self.lock:
+            key = (record.pathname, record.lineno)
+            count = self.counts.get(key, 0)
+            self.counts[key] = count + 1
+        return count % every == 0
+
+
+def _create_handlers(log_file: str, rotate: bool) -> list[logging.Handler]:
+    """Returns the file and console handler that write the formatted records."""
+    if rotate:
+        file_handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=MAX_LOG_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8")
+    else:
+        file_handler = logging.FileHandler(log_file, encoding="utf-8")
+    handlers = [file_handler, logging.StreamHandler()]  # Also output to console
+    formatter = logging.Formatter(LOG_FORMAT, LOG_DATEFMT)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+def _in_child_process() -> bool:
+    """Returns True inside a worker process of multiprocessing."""
+    multiprocessing = sys.modules.get("multiprocessing")
+    return multiprocessing is not None and multiprocessing.parent_process() is not None
+
+
+def _log_directly(root: logging.Logger, log_file: str) -> None:
+    """Replaces the queue of a worker process by plain handlers.
+
+    Worker processes end without running atexit, so a listener thread could lose its last
+    records; they also must not rotate the file the main process writes to.
+    """
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in _create_handlers(log_file, rotate=False):
+        handler.addFilter(SamplingFilter())
+        handler.addFilter(RateLimitFilter())
+        root.addHandler(handler)
 
 
 def setup_logger():
-    """Configure and return a logger instance for the application."""
+    """Configure and return a logger instance for the application.
+
+    Logging threads only put the records into a queue, a background listener thread formats
+    them and does the file and console I/O. Messages use %-style arguments, so they are only
+    formatted if their level is enabled.
+    """
     log_dir = "./logs"
     os.makedirs(log_dir, exist_ok=True)
 
     log_file = f"{log_dir}/logging.log"
 
-    # Configure logging
-    logging.basicConfig(
-        level = logging.INFO,
-        format = "%(asctime)s - %(levelname)s - %(message)s",
-        datefmt = "%m.%d.%Y %I:%M:%S",
-        handlers = [
-            logging.FileHandler(log_file),
-            logging.StreamHandler()  # Also output to console
-        ]
-    )
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    if _in_child_process():
+        _log_directly(root, log_file)
+        return logging.getLogger("default_logger")
+
+    records = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(records)
+    queue_handler.addFilter(SamplingFilter())  # Before the rate limit, dropped samples must not use up its budget
+    rate_limit = RateLimitFilter()
+    queue_handler.addFilter(rate_limit)
+    root.addHandler(queue_handler)
+
+    listener = logging.handlers.QueueListener(records, *_create_handlers(log_file, rotate=True), respect_handler_level=True)
+    listener.start()
+
+    def stop_listener() -> None:
+        """Logs the pending suppressed counts, then writes the remaining records."""
+        for record in rate_limit.report():
+            queue_handler.handle(record)
+        listener.stop()
+
+    atexit.register(stop_listener)  # Writes the remaining records before the interpreter exits
+
+    # Forked worker processes inherit the queue but not the listener thread
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=lambda: _log_directly(root, log_file))
 
     return logging.getLogger("default_logger")
 
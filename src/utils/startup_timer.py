@@ -0,0 +1,52 @@
+# system imports
+import os
+import json
+import time
+import threading
+
+# local imports
+from .logging import logger
+
+
+class StartupTimer:
+    """Seconds from the start of the GUI to each startup phase.
+
+    Phases are marked from the Tk thread and from the background threads of the startup
+    (monitor query, engine imports); only the first mark of a phase counts. Once the window is
+    ready the phases are logged and, if a path is given, written as a JSON report.
+    """
+    def __init__(self, started: float | None = None, report_path: str | None = None) -> None:
+        self.started = started if started is not None else time.perf_counter()
+        self.report_path = report_path
+        self.phases = {}  # Phase name -> seconds since start, in the order they were reached
+        self.lock = threading.Lock()
+
+    def __str__(self) -> str:
+        """Returns a string representation of the StartupTimer instance."""
+        phases = ", ".join(f"{name}= {seconds:.3f}s" for name, seconds in self.phases.items())
+        return f"StartupTimer: \n  -> phases= {phases},\n  -> report_path= {self.report_path}"
+
+    def mark(self, phase: str) -> None:
+        """Records that a phase was reached now."""
+        seconds = time.perf_counter() - self.started
+        with self.lock:
+            self.phases.setdefault(phase, seconds)
+
+    def to_dict(self) -> dict:
+        """Returns the phases as a JSON-serializable dict."""
+        with self.lock:
+            phases = {name: round(seconds, 6) for name, seconds in self.phases.items()}
+        return {"total_seconds": max(phases.values(), default=0.0), "phases": phases}
+
+    def report(self) -> None:
+        """Logs the phases and writes the JSON report if a path was given."""
+        report = self.to_dict()
+        logger.info("Startup finished after %.3fs: %s", report["total_seconds"], ", ".join(f"{name} {seconds:.3f}s" for name, seconds in report["phases"].items()))
+        if not self.report_path:
+            return
+        directory = os.path.dirname(self.report_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.report_path, "w") as f:
+            json.dump(report, f, indent=4)
+        logger.info("Startup report written to '%s'.", self.report_path)
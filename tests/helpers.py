@@ -0,0 +1,69 @@
+# system imports
+import numpy as np
+
+HEADER = "Buchungstag;Verwendungszweck;Betrag;Waehrung"
+
+# Descriptions with the amount range they are drawn from (in cents, signed)
+_VENDORS = [
+    ("REWE Markt GmbH", -9000, -500),
+    ("EDEKA Center", -7000, -300),
+    ("Miete Wohnung", -95000, -85000),
+    ("Lohn Gehalt Firma", 250000, 320000),
+    ("Netflix Abo", -1799, -1299),
+    ("Aral Tankstelle", -8000, -2000),
+    ("Kindergeld Familienkasse", 25000, 25100),
+    ("Amazon Marketplace", -15000, -1000),
+    ("Unbekannte Buchung", -3000, 3000),
+]
+
+# Rules overlap on purpose (same search term in several categories, open windows)
+PRESET = {
+    "paths": {"input_path": "", "output_path": ""},
+    "input_categories": [
+        {"category": "Gehalt", "filters": "lohn", "dateFrom": "", "dateTo": "", "minValue": "", "maxValue": ""},
+        {"category": "Kindergeld", "filters": "kindergeld", "dateFrom": "01.01.2024", "dateTo": "", "minValue": "", "maxValue": ""},
+        {"category": "Sonstiges", "filters": "", "dateFrom": "", "dateTo": "", "minValue": "", "maxValue": "20,00"},
+    ],
+    "output_categories": [
+        {"category": "Lebensmittel", "filters": "rewe", "dateFrom": "", "dateTo": "", "minValue": "", "maxValue": "50,00"},
+        {"category": "Großeinkauf", "filters": "rewe", "dateFrom": "", "dateTo": "", "minValue": "", "maxValue": ""},
+        {"category": "Lebensmittel", "filters": "edeka", "dateFrom": "", "dateTo": "", "minValue": "", "maxValue": ""},
+        {"category": "Wohnen", "filters": "miete", "dateFrom": "", "dateTo": "", "minValue": "", "maxValue": ""},
+        {"category": "Abos", "filters": "netflix", "dateFrom": "01.06.2023", "dateTo": "", "minValue": "", "maxValue": ""},
+        {"category": "Mobilität", "filters": "tankstelle", "dateFrom": "", "dateTo": "", "minValue": "", "maxValue": ""},
+        {"category": "Online", "filters": "amazon", "dateFrom": "", "dateTo": "31.12.2023", "minValue": "", "maxValue": ""},
+        {"category": "Kleinkram", "filters": "", "dateFrom": "", "dateTo": "", "minValue": "", "maxValue": "10,00"},
+    ],
+}
+
+
+def make_rows(count: int, seed: int = 0, start: int = 0) -> list[str]:
+    """Returns `count` deterministic export rows; row i is the same for every call with the same seed."""
+    rng = np.random.default_rng(seed)
+    vendors = rng.integers(0, len(_VENDORS), start + count)[start:]
+    rows = []
+    for index, vendor in zip(range(start, start + count), vendors.tolist()):
+        name, low, high = _VENDORS[vendor]
+        cents = low + (index * 7919) % (high - low + 1)
+        day = np.datetime64("2023-01-01") + index // 20
+        amount = f"{'-' if cents < 0 else ''}{abs(cents) // 100},{abs(cents) % 100:02d}"
+        rows.append(f"{day.astype(object):%d.%m.%Y};{name} Ref {index:08d};{amount};EUR")
+    return rows
+
+
+def write_export(path, rows: list[str]) -> None:
+    """Writes rows with the export header."""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("\n".join([HEADER] + rows) + "\n")
+
+
+def append_rows(path, rows: list[str]) -> None:
+    """Appends rows to an existing export."""
+    with open(path, "a", encoding="utf-8", newline="") as f:
+        f.write("\n".join(rows) + "\n")
+
+
+def data_rows(path) -> list[str]:
+    """Returns the rows of an output file without its header."""
+    with open(path, encoding="utf-8") as f:
+        return f.read().splitlines()[1:]
@@ -0,0 +1,69 @@
+# system imports
+import threading
+import pytest
+
+# local imports
+from src.engine import CancelledError, Deduplicator, FingerprintStore, Pipeline, RuleSet
+from tests.helpers import PRESET, data_rows, make_rows, write_export
+
+ROWS = make_rows(300)
+
+
+def _run(input_path, output_path, store_path, chunk_size=50_000, cancel_after=None) -> int:
+    """Categorizes with a Deduplicator on the store, optionally cancelling after `cancel_after` chunks."""
+    pipeline = Pipeline(RuleSet.from_preset(PRESET), chunk_size, dedup=Deduplicator(FingerprintStore(str(store_path))), bank_format="Generisch")
+    cancel_event = threading.Event()
+    chunks = []
+
+    def progress(rows, fraction, rate):
+        chunks.append(rows)
+        if cancel_after is not None and len(chunks) >= cancel_after:
+            cancel_event.set()
+
+    return pipeline.run(str(input_path), str(output_path), progress=progress, cancel_event=cancel_event)
+
+
+def _descriptions(path) -> list[str]:
+    return [row.split(";")[1] for row in data_rows(path)]
+
+
+def test_overlapping_exports_are_left_out(tmp_path):
+    write_export(tmp_path / "januar.csv", ROWS[:200])
+    write_export(tmp_path / "februar.csv", ROWS[150:])
+    _run(tmp_path / "januar.csv", tmp_path / "januar_out.csv", tmp_path / "store")
+    _run(tmp_path / "februar.csv", tmp_path / "februar_out.csv", tmp_path / "store")
+    assert _descriptions(tmp_path / "februar_out.csv") == [row.split(";")[1] for row in ROWS[200:]]
+
+
+def test_rerunning_an_export_keeps_all_rows(tmp_path):
+    write_export(tmp_path / "umsaetze.csv", ROWS[:200])
+    for _ in range(2):
+        assert _run(tmp_path / "umsaetze.csv", tmp_path / "out.csv", tmp_path / "store") == 200
+
+
+def test_redownload_under_the_same_name_is_a_new_source(tmp_path):
+    write_export(tmp_path / "umsaetze.csv", ROWS[:200])
+    _run(tmp_path / "umsaetze.csv", tmp_path / "out.csv", tmp_path / "store")
+    write_export(tmp_path / "umsaetze.csv", ROWS[150:])
+    assert _run(tmp_path / "umsaetze.csv", tmp_path / "out.csv", tmp_path / "store") == 100
+
+
+def test_cancelled_run_stores_no_fingerprints(tmp_path):
+    write_export(tmp_path / "januar.csv", ROWS[:200])
+    write_export(tmp_path / "februar.csv", ROWS[:200])
+    with pytest.raises(CancelledError):
+        _run(tmp_path / "januar.csv", tmp_path / "januar_out.csv", tmp_path / "store", chunk_size=50, cancel_after=2)
+    assert len(FingerprintStore(str(tmp_path / "store"))) == 0
+    assert _run(tmp_path / "februar.csv", tmp_path / "februar_out.csv", tmp_path / "store") == 200
+
+
+def test_failed_run_stores_no_fingerprints(tmp_path):
+    write_export(tmp_path / "januar.csv", ROWS[:200])
+    pipeline = Pipeline(RuleSet.from_preset(PRESET), 50, dedup=Deduplicator(FingerprintStore(str(tmp_path / "store"))), bank_format="Generisch")
+
+    def fail(rows, fraction, rate):
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        pipeline.run(str(tmp_path / "januar.csv"), str(tmp_path / "out.csv"), progress=fail)
+    assert len(FingerprintStore(str(tmp_path / "store"))) == 0
@@ -0,0 +1,126 @@
+# system imports
+import csv
+import glob
+import gzip
+import json
+import os
+import numpy as np
+import pytest
+
+# local imports
+from src.engine import Exporter, Transactions
+from src.engine.export import COMPRESSIONS, read_columnar, _read_stream, _zstd_module
+
+CATEGORIES = ["Lebensmittel", "Miete"]
+
+
+def _chunk() -> tuple[Transactions, np.ndarray]:
+    """Returns three transactions in two months, one of them uncategorized."""
+    transactions = Transactions(np.array(["2024-01-05", "2024-02-01", "NaT"], dtype="datetime64[D]"), [-1250, 100000, -5], ["REWE; Markt", 'Miete "Feb"', "Gebühr"])
+    return transactions, np.array([0, 1, -1], dtype=np.int32)
+
+
+def _export(directory: str, compression: str, partition: str, append: bool) -> None:
+    """Writes the chunk twice, reopening every file for each chunk (max_open_files=1)."""
+    exporter = Exporter(directory, "umsaetze", CATEGORIES, compression=compression, partition=partition, max_open_files=1)
+    exporter.start(append=append)
+    for _ in range(2):
+        exporter.write(*_chunk())
+    exporter.finish()
+
+
+def _files(directory: str, export_format: str, compression: str) -> list[str]:
+    extension = {"csv": ".csv", "jsonl": ".jsonl", "columnar": ".col"}[export_format] + COMPRESSIONS[compression]
+    return sorted(glob.glob(os.path.join(directory, "**", f"umsaetze{extension}"), recursive=True))
+
+
+@pytest.mark.parametrize("partition", ["none", "month", "category"])
+@pytest.mark.parametrize("compression", ["none", "gzip", "zstd"])
+def test_every_format_reads_back_after_appending(tmp_path, compression, partition):
+    if compression == "zstd":
+        try:
+            _zstd_module()
+        except ValueError:
+            pytest.skip("no zstd implementation installed")
+    directory = str(tmp_path / "export")
+    _export(directory, compression, partition, append=False)
+    _export(directory, compression, partition, append=True)
+
+    columns = [read_columnar(path) for path in _files(directory, "columnar", compression)]
+    assert sum(len(column["dates"]) for column in columns) == 12
+    descriptions = np.concatenate([column["descriptions"] for column in columns])
+    categories = np.concatenate([column["categories"] for column in columns])
+    assert sorted(descriptions.tolist()) == sorted(["REWE; Markt", 'Miete "Feb"', "Gebühr"] * 4)
+    assert sorted(zip(descriptions.tolist(), categories.tolist()), key=str) == sorted([("REWE; Markt", "Lebensmittel"), ('Miete "Feb"', "Miete"), ("Gebühr", None)] * 4, key=str)
+
+    lines = [json.loads(line) for path in _files(directory, "jsonl", compression) for line in _read_stream(path).decode("utf-8").splitlines()]
+    assert len(lines) == 12
+    assert {"date": "2024-01-05", "amount": -12.5, "description": "REWE; Markt", "category": "Lebensmittel"} in lines
+    assert {"date": None, "amount": -0.05, "description": "Gebühr", "category": None} in lines
+
+    rows = []
+    for path in _files(directory, "csv", compression):
+        reader = csv.reader(_read_stream(path).decode("utf-8").splitlines(), delimiter=";")
+        assert next(reader) == ["Datum", "Betrag", "Verwendungszweck", "Kategorie"]  # One header per file, also after appending
+        rows.extend(reader)
+    assert len(rows) == 12
+    assert ["01.02.2024", "1000,00", 'Miete "Feb"', "Miete"] in rows
+
+
+def test_full_run_replaces_the_previous_export(tmp_path):
+    directory = str(tmp_path / "export")
+    _export(directory, "gzip", "month", append=False)
+    _export(directory, "gzip", "month", append=False)
+    assert sum(len(read_columnar(path)["dates"]) for path in _files(directory, "columnar", "gzip")) == 6
+
+
+def test_cancelled_run_removes_its_files(tmp_path):
+    directory = str(tmp_path / "export")
+    exporter = Exporter(directory, "umsaetze", CATEGORIES, partition="category")
+    exporter.start()
+    exporter.write(*_chunk())
+    exporter.discard()
+    assert not [path for path in glob.glob(os.path.join(directory, "**", "*"), recursive=True) if os.path.isfile(path)]
+
+
+def test_gzip_members_of_reopened_files_are_valid(tmp_path):
+    directory = str(tmp_path / "export")
+    _export(directory, "gzip", "none", append=False)
+    with gzip.open(_files(directory, "jsonl", "gzip")[0], "rt", encoding="utf-8") as f:
+        assert len(f.read().splitlines()) == 6
+
+
+def test_only_owned_files_are_replaced(tmp_path):
+    directory = tmp_path / "export"
+    (directory / "archiv").mkdir(parents=True)
+    (directory / "archiv" / "umsaetze.csv.gz").write_bytes(b"unrelated")
+    _export(str(directory), "gzip", "month", append=False)
+    _export(str(directory), "gzip", "category", append=False)
+    assert (directory / "archiv" / "umsaetze.csv.gz").read_bytes() == b"unrelated"
+    assert not glob.glob(str(directory / "month=*" / "*"))  # Files of the previous partitioning are gone
+    assert len(glob.glob(str(directory / "category=*" / "umsaetze.*"))) == 9
+
+
+def test_failed_run_keeps_the_previous_export(tmp_path):
+    directory = str(tmp_path / "export")
+    _export(directory, "none", "none", append=False)
+    before = {path: open(path, "rb").read() for path in _files(directory, "jsonl", "none")}
+    exporter = Exporter(directory, "umsaetze", CATEGORIES)
+    exporter.start()
+    exporter.write(*_chunk())
+    exporter.discard()
+    assert {path: open(path, "rb").read() for path in _files(directory, "jsonl", "none")} == before
+    assert not glob.glob(os.path.join(directory, "**", "*.part"), recursive=True)
+
+
+@pytest.mark.parametrize("compression", ["none", "gzip"])
+def test_discarded_append_run_is_cut_back(tmp_path, compression):
+    directory = str(tmp_path / "export")
+    _export(directory, compression, "month", append=False)
+    before = {path: open(path, "rb").read() for export_format in ("csv", "jsonl", "columnar") for path in _files(directory, export_format, compression)}
+    exporter = Exporter(directory, "umsaetze", CATEGORIES, compression=compression, partition="month", max_open_files=1)
+    exporter.start(append=True)
+    exporter.write(*_chunk())
+    exporter.discard()
+    after = {path: open(path, "rb").read() for export_format in ("csv", "jsonl", "columnar") for path in _files(directory, export_format, compression)}
+    assert after == before
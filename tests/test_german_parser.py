@@ -0,0 +1,47 @@
+# system imports
+import numpy as np
+import pytest
+
+# local imports
+from src.engine.german_parser import GermanParser, parse_amount_cents
+from src.engine.transactions import MISSING_AMOUNT
+
+AMOUNTS = [
+    ("12.50", 1250),
+    ("1.000", 100000),
+    ("1.000,50", 100050),
+    ("-0,5", -50),
+    ("-1.234,56", -123456),
+    ("1000.5", 100050),
+    ("1.234.567", 123456700),
+    ("+7", 700),
+    ("12,345", 1235),  # The third decimal rounds half up
+    ("12,5.0", MISSING_AMOUNT),
+    ("1 000", MISSING_AMOUNT),
+    ("abc", MISSING_AMOUNT),
+    ("", MISSING_AMOUNT),
+]
+
+
+@pytest.mark.parametrize("text, cents", AMOUNTS)
+def test_column_and_rule_amounts_agree(text, cents):
+    assert GermanParser().parse_amounts([text])[0] == cents
+    assert parse_amount_cents(text) == cents
+
+
+def test_amount_column_is_parsed_row_by_row():
+    texts = [text for text, _ in AMOUNTS]
+    parser = GermanParser()
+    assert parser.parse_amounts(texts).tolist() == [cents for _, cents in AMOUNTS]
+    assert parser.report.malformed["amount"] == sum(cents == MISSING_AMOUNT for _, cents in AMOUNTS)
+
+
+def test_numeric_rule_amounts():
+    assert parse_amount_cents(12800.0) == 1280000
+    assert parse_amount_cents(0) == 0
+
+
+def test_dates():
+    days = GermanParser().parse_dates(["31.12.2023", "01.02.24", "30.02.2024", ""])
+    assert days[:2].tolist() == [np.datetime64("2023-12-31").astype(object), np.datetime64("2024-02-01").astype(object)]
+    assert np.isnat(days[2:]).all()
@@ -0,0 +1,51 @@
+# system imports
+import os
+import stat
+import pytest
+
+# local imports
+from src.utils.json_store import JsonStore, _UMASK
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="POSIX permissions")
+
+
+def _mode(path) -> int:
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_atomic_write_keeps_the_permissions(tmp_path):
+    path = tmp_path / "preset.json"
+    path.write_text("{}")
+    os.chmod(path, 0o664)
+    JsonStore._atomic_write(str(path), {"paths": {}})
+    assert _mode(path) == 0o664
+    assert path.read_text().startswith("{")
+
+
+def test_new_files_follow_the_umask(tmp_path):
+    JsonStore._atomic_write(str(tmp_path / "settings.json"), {})
+    assert _mode(tmp_path / "settings.json") == 0o666 & ~_UMASK
+
+
+def test_failed_background_flush_keeps_the_document(tmp_path, monkeypatch):
+    path = tmp_path / "preset.json"
+    path.write_text("{}")
+    store = JsonStore(delay=60)
+    store.write(str(path), {"paths": {"input_path": "a.csv"}})
+
+    def no_space(fd):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(os, "fsync", no_space)
+    store.flush_pending()  # What the debounce timer does
+    assert str(path) in store.pending
+    assert store.read(str(path)) == {"paths": {"input_path": "a.csv"}}
+    with pytest.raises(OSError):
+        store.flush()
+    assert path.read_text() == "{}"
+    assert not list(tmp_path.glob("*.tmp"))
+
+    monkeypatch.undo()
+    store.flush()
+    assert store.pending == {}
+    assert "a.csv" in path.read_text()
@@ -0,0 +1,30 @@
+# system imports
+import logging
+
+# local imports
+from src.utils.logging import RateLimitFilter
+
+
+def _record(rate_limit: bool | None = None, level: int = logging.INFO) -> logging.LogRecord:
+    record = logging.LogRecord("test", level, "watch.py", 278, "Categorized '%s'.", ("a.csv",), None)
+    if rate_limit is not None:
+        record.rate_limit = rate_limit
+    return record
+
+
+def test_rate_limit_only_applies_to_opted_in_records():
+    rate_limit = RateLimitFilter(burst=2, interval=60)
+    assert all(rate_limit.filter(_record()) for _ in range(10))
+    assert [rate_limit.filter(_record(True)) for _ in range(4)] == [True, True, False, False]
+    assert rate_limit.filter(_record(True, logging.ERROR))
+
+
+def test_report_returns_pending_suppressed_counts():
+    rate_limit = RateLimitFilter(burst=1, interval=60)
+    for _ in range(4):
+        rate_limit.filter(_record(True))
+    records = rate_limit.report()
+    assert len(records) == 1
+    assert records[0].getMessage() == "Categorized 'a.csv'. (3 similar messages suppressed)"
+    assert rate_limit.filter(records[0])
+    assert rate_limit.report() == []
@@ -0,0 +1,78 @@
+# system imports
+import sys
+import json
+import subprocess
+
+# local imports
+import src.engine
+from src.engine import PresetStore
+from src.main import bank_format, main, parse_args, run_headless
+from tests.helpers import PRESET, data_rows, make_rows, write_export
+
+
+def _settings(tmp_path, **settings) -> str:
+    """Writes settings.json with the test preset next to it and returns its path."""
+    with open(tmp_path / "test.json", "w") as f:
+        json.dump(PRESET, f)
+    with open(tmp_path / "settings.json", "w") as f:
+        json.dump({"preset_menu": {"presets": ["test"], "selected_preset": "test"}, **settings}, f)
+    return str(tmp_path / "settings.json")
+
+
+def test_bank_format_falls_back_to_the_preset():
+    assert bank_format(parse_args([]), {"bank_format": "DKB"}) == "DKB"
+    assert bank_format(parse_args(["--bank", "ING"]), {"bank_format": "DKB"}) == "ING"
+    assert bank_format(parse_args([]), {}) == "auto"
+
+
+def test_category_memo_turned_off_in_the_settings(tmp_path):
+    settings_path = _settings(tmp_path, category_memo_size=0)
+    write_export(tmp_path / "in.csv", make_rows(50))
+    args = parse_args(["--headless", "--settings", settings_path, "--input", str(tmp_path / "in.csv"), "--output", str(tmp_path / "out.csv"), "--category-memo"])
+    assert run_headless(args) == 0
+    assert len(data_rows(tmp_path / "out.csv")) == 50
+    assert not (tmp_path / "test.category_memo.json").exists()
+
+
+def test_preset_store_is_opened_once_and_closed(tmp_path, monkeypatch):
+    settings_path = _settings(tmp_path, preset_store="presets.db")
+    assert main(["--settings", settings_path, "--import-presets", str(tmp_path / "presets.db")]) == 0
+    write_export(tmp_path / "in.csv", make_rows(10))
+    opened, closed = [], []
+
+    class CountingStore(PresetStore):
+        def __init__(self, path):
+            opened.append(path)
+            super().__init__(path)
+
+        def close(self):
+            closed.append(self.path)
+            super().close()
+
+    monkeypatch.setattr(src.engine, "PresetStore", CountingStore)
+    args = parse_args(["--headless", "--settings", settings_path, "--input", str(tmp_path / "in.csv"), "--output", str(tmp_path / "out.csv")])
+    assert run_headless(args) == 0
+    assert len(data_rows(tmp_path / "out.csv")) == 10
+    assert len(opened) == 1 and closed == opened
+
+
+def test_broken_preset_store_fails_cleanly(tmp_path):
+    settings_path = _settings(tmp_path, preset_store="presets.db")
+    (tmp_path / "presets.db").write_bytes(b"no SQLite database" * 100)
+    write_export(tmp_path / "in.csv", make_rows(10))
+    args = parse_args(["--headless", "--settings", settings_path, "--input", str(tmp_path / "in.csv"), "--output", str(tmp_path / "out.csv")])
+    assert run_headless(args) == 1
+    assert main(["--settings", settings_path, "--export-presets", str(tmp_path / "presets.db")]) == 1
+
+
+def test_headless_run_skips_the_mode_specific_modules(tmp_path):
+    settings_path = _settings(tmp_path)
+    write_export(tmp_path / "in.csv", make_rows(10))
+    code = (
+        "import sys; from src.main import main; "
+        f"main(['--headless', '--settings', {settings_path!r}, '--input', {str(tmp_path / 'in.csv')!r}, '--output', {str(tmp_path / 'out.csv')!r}]); "
+        "print([m for m in ('sqlite3', 'multiprocessing', 'src.engine.batch', 'src.engine.watch', 'src.engine.worker') if m in sys.modules])"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+    assert len(data_rows(tmp_path / "out.csv")) == 10
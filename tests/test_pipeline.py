@@ -0,0 +1,204 @@
+# system imports
+import threading
+import numpy as np
+import pytest
+
+# local imports
+from src.engine import CancelledError, Categorizer, CategoryMemo, Pipeline, RuleSet, RuleStats, Transactions
+from tests.helpers import PRESET, append_rows, make_rows, write_export
+
+ROWS = make_rows(1000)
+
+
+def _read(path) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _run(input_path, output_path, chunk_size=128, preset=PRESET, **options) -> Pipeline:
+    """Categorizes one file and returns the pipeline."""
+    pipeline = Pipeline(RuleSet.from_preset(preset), chunk_size, bank_format="Generisch", **options)
+    pipeline.run(str(input_path), str(output_path))
+    return pipeline
+
+
+def _fail_on_chunk(number: int):
+    """Returns a progress callback that raises after `number` chunks."""
+    chunks = []
+
+    def progress(*args):
+        chunks.append(args)
+        if len(chunks) == number:
+            raise OSError("disk full")
+    return progress
+
+
+@pytest.fixture
+def full_output(tmp_path):
+    """Output of a plain run over all rows."""
+    write_export(tmp_path / "full.csv", ROWS)
+    _run(tmp_path / "full.csv", tmp_path / "full_out.csv")
+    return _read(tmp_path / "full_out.csv")
+
+
+def test_incremental_runs_match_a_full_run(tmp_path, full_output):
+    write_export(tmp_path / "in.csv", ROWS[:300])
+    _run(tmp_path / "in.csv", tmp_path / "out.csv", incremental=True)
+    append_rows(tmp_path / "in.csv", ROWS[300:701])
+    _run(tmp_path / "in.csv", tmp_path / "out.csv", incremental=True)
+    _run(tmp_path / "in.csv", tmp_path / "out.csv", incremental=True)  # Nothing new
+    append_rows(tmp_path / "in.csv", ROWS[701:])
+    _run(tmp_path / "in.csv", tmp_path / "out.csv", incremental=True)
+    assert _read(tmp_path / "out.csv") == full_output
+
+
+def test_incremental_run_resumes_after_a_cancel(tmp_path, full_output):
+    write_export(tmp_path / "in.csv", ROWS)
+    pipeline = Pipeline(RuleSet.from_preset(PRESET), 128, incremental=True, bank_format="Generisch")
+    cancel_event = threading.Event()
+    with pytest.raises(CancelledError):
+        pipeline.run(str(tmp_path / "in.csv"), str(tmp_path / "out.csv"), progress=lambda *args: cancel_event.set(), cancel_event=cancel_event)
+    _run(tmp_path / "in.csv", tmp_path / "out.csv", incremental=True)
+    assert _read(tmp_path / "out.csv") == full_output
+
+
+def test_incremental_run_after_a_failed_resume(tmp_path, full_output):
+    write_export(tmp_path / "in.csv", ROWS[:300])
+    _run(tmp_path / "in.csv", tmp_path / "out.csv", incremental=True)
+    append_rows(tmp_path / "in.csv", ROWS[300:])
+    pipeline = Pipeline(RuleSet.from_preset(PRESET), 128, incremental=True, bank_format="Generisch")
+    with pytest.raises(OSError):
+        pipeline.run(str(tmp_path / "in.csv"), str(tmp_path / "out.csv"), progress=_fail_on_chunk(3))
+    _run(tmp_path / "in.csv", tmp_path / "out.csv", incremental=True)
+    assert _read(tmp_path / "out.csv") == full_output
+
+
+def test_rewritten_input_falls_back_to_a_full_run(tmp_path, full_output):
+    write_export(tmp_path / "in.csv", make_rows(500, seed=1))
+    _run(tmp_path / "in.csv", tmp_path / "out.csv", incremental=True)
+    write_export(tmp_path / "in.csv", ROWS)
+    _run(tmp_path / "in.csv", tmp_path / "out.csv", incremental=True)
+    assert _read(tmp_path / "out.csv") == full_output
+
+
+def test_columnar_cache_matches_an_uncached_run(tmp_path, full_output):
+    write_export(tmp_path / "full.csv", ROWS)
+    _run(tmp_path / "full.csv", tmp_path / "built.csv", columnar_cache=True)  # Builds the cache
+    _run(tmp_path / "full.csv", tmp_path / "cached.csv", columnar_cache=True)  # Reads from it
+    assert (tmp_path / "full.csv.colcache").exists()
+    assert _read(tmp_path / "built.csv") == full_output
+    assert _read(tmp_path / "cached.csv") == full_output
+
+
+def test_changed_input_invalidates_the_columnar_cache(tmp_path):
+    write_export(tmp_path / "in.csv", ROWS[:500])
+    _run(tmp_path / "in.csv", tmp_path / "out.csv", columnar_cache=True)
+    write_export(tmp_path / "in.csv", ROWS)
+    _run(tmp_path / "in.csv", tmp_path / "out.csv", columnar_cache=True)
+    _run(tmp_path / "in.csv", tmp_path / "plain.csv")
+    assert _read(tmp_path / "out.csv") == _read(tmp_path / "plain.csv")
+
+
+def test_category_memo_matches_the_rules(tmp_path, full_output):
+    write_export(tmp_path / "full.csv", ROWS)
+    memo_path = str(tmp_path / "memo.json")
+    for run in range(3):
+        pipeline = _run(tmp_path / "full.csv", tmp_path / "out.csv", memo=CategoryMemo(memo_path))
+        assert _read(tmp_path / "out.csv") == full_output
+    assert pipeline.categorizer.memo.hits > 0
+
+
+def test_adaptive_order_matches_the_declared_order(tmp_path, full_output):
+    write_export(tmp_path / "full.csv", ROWS)
+    rule_stats = RuleStats(str(tmp_path / "rule_stats.json"))
+    for run in range(3):
+        pipeline = _run(tmp_path / "full.csv", tmp_path / "out.csv", rule_stats=rule_stats)
+        assert _read(tmp_path / "out.csv") == full_output
+    assert pipeline.categorizer.order is not None  # Learned from the earlier runs
+
+
+_KEYWORDS = ["rewe", "rewe markt", "markt", "edeka", "miete", "lohn", "netflix", "tank", "tankstelle", "amazon", "ref", ""]
+
+
+def _random_preset(rng) -> dict:
+    """Returns a preset of overlapping random rules (nested search terms, open and closed windows)."""
+    def rule():
+        low = int(rng.integers(0, 500))
+        return {
+            "category": f"K{rng.integers(0, 6)}",
+            "filters": _KEYWORDS[rng.integers(0, len(_KEYWORDS))],
+            "dateFrom": "" if rng.random() < 0.5 else f"01.{rng.integers(1, 13):02d}.2023",
+            "dateTo": "" if rng.random() < 0.5 else f"28.{rng.integers(1, 13):02d}.2024",
+            "minValue": "" if rng.random() < 0.5 else low,
+            "maxValue": "" if rng.random() < 0.5 else low + int(rng.integers(1, 3000)),
+        }
+    return {"input_categories": [rule() for _ in range(rng.integers(1, 12))], "output_categories": [rule() for _ in range(rng.integers(1, 25))]}
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_adaptive_order_matches_for_random_rules(seed):
+    rng = np.random.default_rng(seed)
+    rule_set = RuleSet.from_preset(_random_preset(rng))
+    count = 2000
+    days = rng.integers(19000, 19900, count)
+    amounts = rng.integers(-300000, 300000, count)
+    descriptions = [" ".join(rng.choice(["REWE", "Markt", "EDEKA", "Miete", "Lohn", "Netflix", "Tankstelle", "Amazon", "Ref", "x"], rng.integers(1, 4))) for _ in range(count)]
+    transactions = Transactions(days.astype("datetime64[D]"), amounts, descriptions)
+
+    expected = Categorizer(rule_set).categorize(transactions)
+    hits = np.bincount(rng.integers(0, len(rule_set), 500), minlength=len(rule_set)).astype(float) * rng.random(len(rule_set))
+    rule_stats = RuleStats()
+    rule_stats.record(rule_set, hits)
+    categorizer = Categorizer(rule_set, rule_stats=rule_stats)
+    categorizer.start_run()
+    assert np.array_equal(categorizer.categorize(transactions), expected)
+
+
+def test_failed_run_keeps_the_previous_output(tmp_path, full_output):
+    write_export(tmp_path / "in.csv", ROWS)
+    _run(tmp_path / "in.csv", tmp_path / "out.csv")
+    write_export(tmp_path / "in.csv", make_rows(500, seed=1))
+    pipeline = Pipeline(RuleSet.from_preset(PRESET), 128, bank_format="Generisch")
+    with pytest.raises(OSError):
+        pipeline.run(str(tmp_path / "in.csv"), str(tmp_path / "out.csv"), progress=_fail_on_chunk(2))
+    assert _read(tmp_path / "out.csv") == full_output
+    assert not (tmp_path / "out.csv.part").exists()
+
+
+def test_cancelled_run_keeps_the_previous_output(tmp_path, full_output):
+    write_export(tmp_path / "in.csv", ROWS)
+    _run(tmp_path / "in.csv", tmp_path / "out.csv")
+    pipeline = Pipeline(RuleSet.from_preset(PRESET), 128, bank_format="Generisch")
+    cancel_event = threading.Event()
+    with pytest.raises(CancelledError):
+        pipeline.run(str(tmp_path / "in.csv"), str(tmp_path / "out.csv"), progress=lambda *args: cancel_event.set(), cancel_event=cancel_event)
+    assert _read(tmp_path / "out.csv") == full_output
+    assert not (tmp_path / "out.csv.part").exists()
+
+
+def test_export_matches_the_output_after_an_incremental_cancel(tmp_path):
+    from src.engine import Exporter
+    from src.engine.export import read_columnar
+
+    write_export(tmp_path / "in.csv", ROWS)
+    rule_set = RuleSet.from_preset(PRESET)
+    pipeline = Pipeline(rule_set, 128, incremental=True, bank_format="Generisch")
+    cancel_event = threading.Event()
+    with pytest.raises(CancelledError):
+        pipeline.run(str(tmp_path / "in.csv"), str(tmp_path / "out.csv"), progress=lambda *args: cancel_event.set(), cancel_event=cancel_event, export=Exporter(str(tmp_path / "export"), "in", rule_set.categories, ["columnar"]))
+    pipeline.run(str(tmp_path / "in.csv"), str(tmp_path / "out.csv"), export=Exporter(str(tmp_path / "export"), "in", rule_set.categories, ["columnar"]))
+    exported = read_columnar(str(tmp_path / "export" / "in.col"))
+    assert exported["descriptions"].tolist() == [row.split(";")[1] for row in ROWS]
+    assert not (tmp_path / "export" / "in.col.part").exists()
+
+
+def test_full_export_ignores_leftover_part_files(tmp_path):
+    from src.engine import Exporter
+    from src.engine.export import read_columnar
+
+    write_export(tmp_path / "in.csv", ROWS[:500])
+    (tmp_path / "export").mkdir()
+    (tmp_path / "export" / "in.col.part").write_bytes(b"left over by a killed run")
+    rule_set = RuleSet.from_preset(PRESET)
+    Pipeline(rule_set, 128, bank_format="Generisch").run(str(tmp_path / "in.csv"), str(tmp_path / "out.csv"), export=Exporter(str(tmp_path / "export"), "in", rule_set.categories, ["columnar"]))
+    assert len(read_columnar(str(tmp_path / "export" / "in.col"))["dates"]) == 500
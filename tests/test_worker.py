@@ -0,0 +1,14 @@
+# local imports
+from src.engine import CategorizeWorker, RuleSet
+
+
+def test_unexpected_errors_are_reported(tmp_path):
+    worker = CategorizeWorker(RuleSet.from_preset({}), str(tmp_path / "in.csv"), str(tmp_path / "out.csv"))
+
+    def fail(*args, **kwargs):
+        raise KeyError("category")
+
+    worker.pipeline.run = fail
+    worker.start()
+    worker.join()
+    assert worker.messages.get_nowait() == ("error", "KeyError: 'category'")